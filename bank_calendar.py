@@ -0,0 +1,127 @@
+# bank_calendar.py
+import csv
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# 입금일 캘린더 - 일본 은행 휴업일(토/일, 공휴일, 12/31, 1/2, 1/3) 기준 영업일 조정
+
+HOLIDAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'jp_bank_holidays.csv')
+
+# 입금일이 휴업일일 때의 처리 (None은 조정 없음)
+DATE_CONVENTIONS = ('following', 'modified_following')
+DATE_CONVENTION_LABELS = {
+    None: "調整なし / No adjustment",
+    'following': "翌営業日 / Following business day",
+    'modified_following': "翌営業日 (月末は前営業日) / Modified following"
+}
+_NUMPY_ROLLS = {'following': 'following', 'modified_following': 'modifiedfollowing'}
+
+
+@lru_cache(maxsize=1)
+def load_bank_holidays(path=HOLIDAY_FILE):
+    """휴업일 테이블 로드 - (정렬된 날짜 배열, 이름 튜플), 프로세스당 한 번만 읽음"""
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = sorted((row['date'], row['name']) for row in csv.DictReader(f))
+    dates = np.array([day for day, _ in rows], dtype='datetime64[D]')
+    dates.flags.writeable = False
+    return dates, tuple(name for _, name in rows)
+
+
+@lru_cache(maxsize=1)
+def _business_calendar():
+    holidays, _ = load_bank_holidays()
+    return np.busdaycalendar(weekmask='1111100', holidays=holidays)
+
+
+def holiday_table_range():
+    """휴업일 테이블이 포함하는 기간 (첫날, 마지막 날) - 테이블의 첫 연도 1/1부터 마지막 연도 12/31까지"""
+    holidays, _ = load_bank_holidays()
+    first = holidays[0].astype('datetime64[Y]').astype('datetime64[D]')
+    end = (holidays[-1].astype('datetime64[Y]') + 1).astype('datetime64[D]')
+    return first, end - 1
+
+
+def _check_coverage(dates):
+    """휴업일 테이블이 없는 연도의 날짜는 조정할 수 없으므로 오류"""
+    first, last = holiday_table_range()
+    if dates.size and (dates.min() < first or dates.max() > last):
+        raise ValueError(f"date outside the bank holiday table ({first} - {last})")
+
+
+def holiday_name(day):
+    """휴업일 이름 (공휴일/은행 휴업일이 아니면 None)"""
+    holidays, names = load_bank_holidays()
+    day = np.datetime64(day, 'D')
+    index = int(np.searchsorted(holidays, day))
+    if index < len(holidays) and holidays[index] == day:
+        return names[index]
+    return None
+
+
+def is_business_day(dates):
+    """은행 영업일 여부 (벡터 연산)"""
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    _check_coverage(dates)
+    return np.is_busday(dates, busdaycal=_business_calendar())
+
+
+def roll_business_days(dates, convention):
+    """휴업일인 날짜를 영업일로 조정 (벡터 연산)"""
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    if convention is None:
+        return dates
+    if convention not in _NUMPY_ROLLS:
+        raise ValueError(f"unknown date convention: {convention}")
+    _check_coverage(dates)
+    rolled = np.busday_offset(dates, 0, roll=_NUMPY_ROLLS[convention], busdaycal=_business_calendar())
+    _check_coverage(rolled)
+    return rolled
+
+
+def monthly_payment_dates(start_dates, max_months):
+    """시작일 기준 월별 명목 입금일 (relativedelta와 동일하게 월말 보정)"""
+    start = np.asarray(start_dates, dtype='datetime64[D]').reshape(-1)
+    start_month = start.astype('datetime64[M]')
+    day_offset = (start - start_month.astype('datetime64[D]')).astype(np.int64)
+
+    months = start_month[:, None] + np.arange(max_months)
+    month_start = months.astype('datetime64[D]')
+    month_len = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+    return month_start + np.minimum(day_offset[:, None], month_len - 1)
+
+
+@lru_cache(maxsize=4096)
+def _cached_calendar(start_day, months, convention):
+    dates = roll_business_days(monthly_payment_dates([start_day], months)[0], convention)
+    dates.flags.writeable = False
+    return dates
+
+
+def payment_calendar(start_date, months, convention=None):
+    """단일 플랜의 영업일 조정 입금일 - (시작일, 개월 수, 조정 방식)별로 캐시, 읽기 전용 배열"""
+    return _cached_calendar(np.datetime64(start_date, 'D'), int(months), convention)
+
+
+def calendar_covers(start_date, months, convention=None):
+    """영업일 조정 입금일을 휴업일 테이블 안에서 만들 수 있는지 (조정 없음은 항상 가능)"""
+    if convention is None:
+        return True
+    try:
+        payment_calendar(start_date, months, convention)
+    except ValueError:
+        return False
+    return True
+
+
+def payment_calendar_matrix(start_dates, max_months, convention=None):
+    """플랜 x 월 입금일 행렬 - 시작일이 같은 플랜은 캐시된 캘린더를 공유"""
+    start = np.asarray(start_dates, dtype='datetime64[D]').reshape(-1)
+    if convention is None:
+        return monthly_payment_dates(start, max_months)
+    unique_starts, inverse = np.unique(start, return_inverse=True)
+    calendars = np.empty((len(unique_starts), max_months), dtype='datetime64[D]')
+    for row, start_day in enumerate(unique_starts):
+        calendars[row] = payment_calendar(start_day, max_months, convention)
+    return calendars[inverse.reshape(-1)]
@@ -0,0 +1,482 @@
+# bank_storage.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from savings_engine import get_schedule
+
+# 적금 플랜/스케줄/조정/급여 명세서 영속 저장소 - SQLite(WAL), 스레드별 연결, 페이지는 이 저장소 API로만 읽고 씀
+
+DATABASE_PATH = os.environ.get(
+    'BANK_DATABASE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'bank.sqlite3')
+)
+# 스케줄은 플랜당 한 행에 컬럼별 배열 바이트로 저장 (엔진의 컬럼형 스케줄과 같은 dtype)
+SCHEDULE_COLUMNS = {
+    'payment_date': 'datetime64[D]',
+    'amount': np.int64,
+    'interest': np.int64,
+    'balance': np.int64,
+    'paid_to_date': np.int64,
+    'adjusted': np.bool_
+}
+PLAN_FIELDS = (
+    'name', 'customer_name', 'employee_number', 'account_number', 'monthly_amount', 'period', 'interest_rate',
+    'start_date', 'rounding', 'compounding', 'date_convention', 'created_at'
+)
+CALCULATION_FIELDS = ('total_months', 'total_payment', 'total_interest', 'final_balance')
+BUSY_TIMEOUT_SECONDS = 30
+# IN 절 하나에 넣는 ID 수 (SQLite 바인딩 변수 상한 999 이하)
+MAX_BIND_IDS = 900
+# 목록 화면 한 페이지의 행 수
+PAGE_SIZE = 20
+# 전 소유자 일괄 작업(금리 개정)에서 한 번에 메모리에 올리는 플랜 수
+STORAGE_CHUNK_SIZE = 10000
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    customer_name TEXT,
+    employee_number TEXT,
+    account_number TEXT,
+    monthly_amount INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    interest_rate REAL NOT NULL,
+    start_date TEXT NOT NULL,
+    rounding TEXT,
+    compounding TEXT NOT NULL DEFAULT 'monthly',
+    date_convention TEXT,
+    created_at TEXT,
+    rules TEXT NOT NULL DEFAULT '[]',
+    rate_changes TEXT NOT NULL DEFAULT '[]',
+    total_months INTEGER NOT NULL,
+    total_payment INTEGER NOT NULL,
+    total_interest INTEGER NOT NULL,
+    final_balance INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plans_owner ON plans (owner, id);
+CREATE TABLE IF NOT EXISTS schedules (
+    plan_id INTEGER PRIMARY KEY REFERENCES plans (id) ON DELETE CASCADE,
+    {', '.join(f'{column} BLOB NOT NULL' for column in SCHEDULE_COLUMNS)}
+);
+CREATE TABLE IF NOT EXISTS adjustments (
+    plan_id INTEGER NOT NULL REFERENCES plans (id) ON DELETE CASCADE,
+    month INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (plan_id, month)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS payslips (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    employee_number TEXT NOT NULL,
+    name TEXT,
+    pay_date TEXT NOT NULL,
+    salary_data TEXT NOT NULL,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS payslips_employee ON payslips (employee_number, id);
+CREATE INDEX IF NOT EXISTS payslips_date ON payslips (pay_date);
+CREATE TABLE IF NOT EXISTS pricing_stage (
+    job TEXT NOT NULL,
+    plan_id INTEGER NOT NULL,
+    expected_final_balance INTEGER NOT NULL,
+    staged_at REAL NOT NULL,
+    rate_changes TEXT NOT NULL,
+    {', '.join(f'{field} INTEGER NOT NULL' for field in CALCULATION_FIELDS)},
+    {', '.join(f'{column} BLOB NOT NULL' for column in SCHEDULE_COLUMNS)},
+    PRIMARY KEY (job, plan_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rate_change_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    actor TEXT NOT NULL,
+    interest_rate REAL NOT NULL,
+    effective_date TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    plans INTEGER NOT NULL,
+    repriced INTEGER NOT NULL,
+    conflicts INTEGER NOT NULL
+);
+"""
+
+_local = threading.local()
+_initialized = set()
+_initialize_lock = threading.Lock()
+
+
+def _json_default(value):
+    """numpy 스칼라/날짜를 JSON 값으로"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.datetime64):
+        return str(value)
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def _dumps(value):
+    return json.dumps(value, default=_json_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def connection(path=None):
+    """현재 스레드의 연결 - 스레드마다 경로별로 한 번만 열고 재사용 (sqlite3 연결은 스레드 간 공유 불가)"""
+    path = path or DATABASE_PATH
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        initialize_database(path)
+        conn = connections[path] = _connect(path)
+    return conn
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL에서는 NORMAL로도 커밋된 트랜잭션이 손상되지 않음 (정전 시 마지막 트랜잭션만 유실 가능)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def initialize_database(path=None):
+    """스키마 생성 - 프로세스당 경로별 한 번"""
+    path = path or DATABASE_PATH
+    if path in _initialized:
+        return
+    with _initialize_lock:
+        if path in _initialized:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = _connect(path)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+        _initialized.add(path)
+
+
+@contextmanager
+def transaction(path=None):
+    """쓰기 트랜잭션 - 묶음 쓰기는 한 트랜잭션으로 (WAL 쓰기 잠금을 처음부터 잡아 교착 방지)"""
+    conn = connection(path)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _encode_schedule(schedule):
+    return [np.ascontiguousarray(schedule[column], dtype=dtype).tobytes() for column, dtype in SCHEDULE_COLUMNS.items()]
+
+
+def _decode_schedule(row, columns=SCHEDULE_COLUMNS):
+    """저장된 배열 바이트를 읽기 전용 배열로 (복사 없음)"""
+    return {column: np.frombuffer(row[column], dtype=SCHEDULE_COLUMNS[column]) for column in columns}
+
+
+def _plan_values(plan):
+    calculation = plan['calculation']
+    return (
+        *(plan.get(field) for field in PLAN_FIELDS),
+        _dumps(plan.get('rules') or []),
+        _dumps(plan.get('rate_changes') or []),
+        *(int(calculation[field]) for field in CALCULATION_FIELDS)
+    )
+
+
+def _write_schedules(conn, plan_ids, plans):
+    conn.executemany(
+        f"INSERT OR REPLACE INTO schedules (plan_id, {', '.join(SCHEDULE_COLUMNS)}) "
+        f"VALUES (?, {', '.join('?' * len(SCHEDULE_COLUMNS))})",
+        [(plan_id, *_encode_schedule(get_schedule(plan))) for plan_id, plan in zip(plan_ids, plans)]
+    )
+
+
+def _write_details(conn, plan_ids, plans, replace):
+    """스케줄/조정 내역 묶음 쓰기"""
+    ids = [(plan_id,) for plan_id in plan_ids]
+    if replace:
+        conn.executemany("DELETE FROM adjustments WHERE plan_id = ?", ids)
+    _write_schedules(conn, plan_ids, plans)
+    conn.executemany(
+        "INSERT INTO adjustments (plan_id, month, amount) VALUES (?, ?, ?)",
+        [(plan_id, int(month), int(amount))
+         for plan_id, plan in zip(plan_ids, plans) for month, amount in (plan.get('adjustments') or {}).items()]
+    )
+
+
+def save_plans(plans, owner, path=None):
+    """새 플랜 묶음 저장 - 한 트랜잭션, 할당된 ID 목록 반환"""
+    columns = ('owner', *PLAN_FIELDS, 'rules', 'rate_changes', *CALCULATION_FIELDS)
+    sql = f"INSERT INTO plans ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    with transaction(path) as conn:
+        plan_ids = [conn.execute(sql, (owner, *_plan_values(plan))).lastrowid for plan in plans]
+        _write_details(conn, plan_ids, plans, replace=False)
+    return plan_ids
+
+
+def save_plan(plan, owner, path=None):
+    """새 플랜 저장 - 할당된 ID 반환"""
+    return save_plans([plan], owner, path)[0]
+
+
+def update_plans(plans, path=None):
+    """기존 플랜의 조건/계산 결과/조정 내역 묶음 갱신 (금리 일괄 개정, 입금 조정)"""
+    assignments = ', '.join(f"{column} = ?" for column in (*PLAN_FIELDS, 'rules', 'rate_changes', *CALCULATION_FIELDS))
+    with transaction(path) as conn:
+        conn.executemany(
+            f"UPDATE plans SET {assignments} WHERE id = ?", [(*_plan_values(plan), plan['id']) for plan in plans]
+        )
+        _write_details(conn, [plan['id'] for plan in plans], plans, replace=True)
+
+
+def update_plan(plan, path=None):
+    update_plans([plan], path)
+
+
+def stage_plan_pricing(job, changes, path=None):
+    """금리 개정 결과를 준비 테이블에 기록 - changes는 (기존 플랜, 새 플랜) 목록, 실제 플랜은 apply_staged_pricing에서 한 번에 교체"""
+    columns = ('job', 'plan_id', 'expected_final_balance', 'staged_at', 'rate_changes', *CALCULATION_FIELDS, *SCHEDULE_COLUMNS)
+    now = time.time()
+    with transaction(path) as conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO pricing_stage ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [(job, old['id'], int(old['calculation']['final_balance']), now, _dumps(new.get('rate_changes') or []),
+              *(int(new['calculation'][field]) for field in CALCULATION_FIELDS), *_encode_schedule(get_schedule(new)))
+             for old, new in changes]
+        )
+
+
+def apply_staged_pricing(job, audit, path=None):
+    """준비된 금리 개정 결과를 한 트랜잭션으로 교체하고 실행 기록 저장 - (갱신된 소유자 집합, 갱신 수, 충돌 수)"""
+    # 준비 후 다른 사람이 고친 플랜(최종 잔액이 달라짐)이나 삭제된 플랜은 덮어쓰지 않고 충돌로 집계
+    with transaction(path) as conn:
+        conflicts = conn.execute(
+            "DELETE FROM pricing_stage WHERE job = ? AND NOT EXISTS ("
+            "SELECT 1 FROM plans p WHERE p.id = pricing_stage.plan_id AND p.final_balance = pricing_stage.expected_final_balance)",
+            (job,)
+        ).rowcount
+        conn.execute(
+            f"INSERT OR REPLACE INTO schedules (plan_id, {', '.join(SCHEDULE_COLUMNS)}) "
+            f"SELECT plan_id, {', '.join(SCHEDULE_COLUMNS)} FROM pricing_stage WHERE job = ?",
+            (job,)
+        )
+        fields = ('rate_changes', *CALCULATION_FIELDS)
+        repriced = conn.execute(
+            f"UPDATE plans SET ({', '.join(fields)}) = (SELECT {', '.join(fields)} FROM pricing_stage s "
+            f"WHERE s.job = ? AND s.plan_id = plans.id) WHERE id IN (SELECT plan_id FROM pricing_stage WHERE job = ?)",
+            (job, job)
+        ).rowcount
+        owners = {row[0] for row in conn.execute(
+            "SELECT DISTINCT owner FROM plans WHERE id IN (SELECT plan_id FROM pricing_stage WHERE job = ?)", (job,)
+        )}
+        conn.execute("DELETE FROM pricing_stage WHERE job = ?", (job,))
+        conn.execute(
+            "INSERT INTO rate_change_log (actor, interest_rate, effective_date, started_at, finished_at, plans, repriced, conflicts) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (audit['actor'], audit['interest_rate'], audit['effective_date'], audit['started_at'],
+             datetime.now().isoformat(timespec='seconds'), audit['plans'], repriced, conflicts)
+        )
+    return owners, repriced, conflicts
+
+
+def discard_staged_pricing(job, path=None):
+    """실패/중단된 작업의 준비 결과 삭제 (하루 넘게 남은 다른 작업의 잔여 행도 함께 정리)"""
+    with transaction(path) as conn:
+        conn.execute("DELETE FROM pricing_stage WHERE job = ? OR staged_at < ?", (job, time.time() - 24 * 60 * 60))
+
+
+def rate_change_history(limit=20, path=None):
+    """금리 개정 실행 기록 (최근순)"""
+    rows = connection(path).execute("SELECT * FROM rate_change_log ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def delete_plan(plan_id, path=None):
+    """플랜 삭제 - 스케줄/조정 내역은 외래 키로 함께 삭제"""
+    with transaction(path) as conn:
+        conn.execute("DELETE FROM plans WHERE id = ?", (plan_id,))
+
+
+def count_plans(owner, path=None):
+    return connection(path).execute("SELECT COUNT(*) FROM plans WHERE owner = ?", (owner,)).fetchone()[0]
+
+
+def count_all_plans(path=None):
+    return connection(path).execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+
+
+def _plan_from_row(row, schedule, adjustments):
+    calculation = {'schedule': schedule, **{field: row[field] for field in CALCULATION_FIELDS}}
+    return {
+        'id': row['id'],
+        **{field: row[field] for field in PLAN_FIELDS},
+        'adjustments': adjustments,
+        'rules': json.loads(row['rules']),
+        'rate_changes': json.loads(row['rate_changes']),
+        'calculation': calculation
+    }
+
+
+def _plans_from_rows(conn, rows):
+    """plans 행에 스케줄/조정 내역을 붙여 플랜 dict로"""
+    if not rows:
+        return []
+    ids = [row['id'] for row in rows]
+    marks = ', '.join('?' * len(ids))
+    schedules = {row['plan_id']: _decode_schedule(row)
+                 for row in conn.execute(f"SELECT * FROM schedules WHERE plan_id IN ({marks})", ids)}
+    adjustments = {plan_id: {} for plan_id in ids}
+    for plan_id, month, amount in conn.execute(
+            f"SELECT plan_id, month, amount FROM adjustments WHERE plan_id IN ({marks}) ORDER BY plan_id, month", ids):
+        adjustments[plan_id][month] = amount
+    return [_plan_from_row(row, schedules[row['id']], adjustments[row['id']]) for row in rows]
+
+
+def _chunks(ids):
+    """IN 절 바인딩 변수 상한 이하로 나누기 - 정렬해서 나눠야 묶음별 결과를 이어도 ID순"""
+    ids = sorted(set(ids))
+    return (ids[i:i + MAX_BIND_IDS] for i in range(0, len(ids), MAX_BIND_IDS))
+
+
+def load_plans(owner, limit=None, offset=0, path=None):
+    """소유자의 플랜을 생성순으로 - limit/offset으로 화면에 보이는 행만 로드"""
+    conn = connection(path)
+    rows = conn.execute(
+        "SELECT * FROM plans WHERE owner = ? ORDER BY id LIMIT ? OFFSET ?",
+        (owner, -1 if limit is None else limit, offset)
+    ).fetchall()
+    return _plans_from_rows(conn, rows)
+
+
+def iter_all_plans(chunk_size=STORAGE_CHUNK_SIZE, path=None):
+    """모든 소유자의 플랜을 ID순으로 chunk_size개씩 (플랜에 'owner' 포함) - 마지막 ID 기준으로 이어 읽어 뒤쪽 묶음도 인덱스로 바로 찾음"""
+    conn = connection(path)
+    last_id = 0
+    while True:
+        rows = conn.execute("SELECT * FROM plans WHERE id > ? ORDER BY id LIMIT ?", (last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        plans = []
+        for start in range(0, len(rows), MAX_BIND_IDS):
+            plans.extend(_plans_from_rows(conn, rows[start:start + MAX_BIND_IDS]))
+        for plan, row in zip(plans, rows):
+            plan['owner'] = row['owner']
+        yield plans
+        last_id = rows[-1]['id']
+
+
+def load_plans_by_id(plan_ids, path=None):
+    """ID 목록의 플랜 (ID순, 없는 ID는 제외)"""
+    conn = connection(path)
+    plans = []
+    for chunk in _chunks(plan_ids):
+        rows = conn.execute(
+            f"SELECT * FROM plans WHERE id IN ({', '.join('?' * len(chunk))}) ORDER BY id", chunk
+        ).fetchall()
+        plans.extend(_plans_from_rows(conn, rows))
+    return plans
+
+
+def load_plan(plan_id, path=None):
+    """ID로 플랜 1건 (없으면 None)"""
+    plans = load_plans_by_id([plan_id], path)
+    return plans[0] if plans else None
+
+
+def plan_ids(owner, path=None):
+    """소유자의 플랜 ID (생성순) - 인덱스만 읽음"""
+    return [row[0] for row in connection(path).execute("SELECT id FROM plans WHERE owner = ? ORDER BY id", (owner,))]
+
+
+def plan_summaries(owner, schedule_columns=(), path=None):
+    """홈 화면 집계용 가벼운 플랜 목록 - 필요한 스케줄 컬럼만 함께 로드 (스케줄은 다른 플랜처럼 get_schedule로 읽음)"""
+    selected = ', '.join(f"s.{column}" for column in schedule_columns)
+    rows = connection(path).execute(
+        f"SELECT p.id, p.name, p.monthly_amount, p.period, p.total_months, p.total_payment, p.final_balance"
+        f"{', ' + selected if selected else ''} FROM plans p "
+        f"{'JOIN schedules s ON s.plan_id = p.id ' if selected else ''}WHERE p.owner = ? ORDER BY p.id",
+        (owner,)
+    ).fetchall()
+    return [{
+        'id': row['id'],
+        'name': row['name'],
+        'monthly_amount': row['monthly_amount'],
+        'period': row['period'],
+        'calculation': {
+            **{field: row[field] for field in ('total_months', 'total_payment', 'final_balance')},
+            'schedule': _decode_schedule(row, schedule_columns)
+        }
+    } for row in rows]
+
+
+def save_payslips(payslips, path=None):
+    """급여 명세서 묶음 저장 - 할당된 ID 목록 반환"""
+    with transaction(path) as conn:
+        payslip_ids = [conn.execute(
+            "INSERT INTO payslips (employee_number, name, pay_date, salary_data, created_at) VALUES (?, ?, ?, ?, ?)",
+            (payslip['employee_number'], payslip.get('name'), payslip['date'], _dumps(payslip['salary_data']),
+             payslip.get('created_at'))
+        ).lastrowid for payslip in payslips]
+    return payslip_ids
+
+
+def save_payslip(payslip, path=None):
+    return save_payslips([payslip], path)[0]
+
+
+def _payslip_from_row(row):
+    return {
+        'id': row['id'],
+        'date': row['pay_date'],
+        'employee_number': row['employee_number'],
+        'name': row['name'],
+        'salary_data': json.loads(row['salary_data']),
+        'created_at': row['created_at']
+    }
+
+
+def list_payslips(employee_number, limit=None, offset=0, path=None):
+    """직원의 급여 명세서를 생성순으로"""
+    rows = connection(path).execute(
+        "SELECT * FROM payslips WHERE employee_number = ? ORDER BY id LIMIT ? OFFSET ?",
+        (employee_number, -1 if limit is None else limit, offset)
+    ).fetchall()
+    return [_payslip_from_row(row) for row in rows]
+
+
+def load_payslips_by_id(payslip_ids, path=None):
+    """ID 목록의 급여 명세서 (ID순, 없는 ID는 제외)"""
+    conn = connection(path)
+    payslips = []
+    for chunk in _chunks(payslip_ids):
+        rows = conn.execute(
+            f"SELECT * FROM payslips WHERE id IN ({', '.join('?' * len(chunk))}) ORDER BY id", chunk
+        ).fetchall()
+        payslips.extend(_payslip_from_row(row) for row in rows)
+    return payslips
+
+
+def payslip_ids(employee_number, path=None):
+    """직원의 급여 명세서 ID (생성순) - 인덱스만 읽음"""
+    return [row[0] for row in connection(path).execute(
+        "SELECT id FROM payslips WHERE employee_number = ? ORDER BY id", (employee_number,)
+    )]
+
+
+def delete_payslip(payslip_id, path=None):
+    with transaction(path) as conn:
+        conn.execute("DELETE FROM payslips WHERE id = ?", (payslip_id,))
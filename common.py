@@ -1,12 +1,22 @@
 # common.py
 import streamlit as st
+import streamlit.components.v1 as components
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 import pandas as pd
 import numpy as np
 import time
 import base64
+import hashlib
+import json
+import os
 import random
+from bank_storage import initialize_database
+from record_store import open_store, sync_store
+from credentials import begin_authentication, check_new_password, poll_authentication, set_password
+from employee_directory import employee_by_login, employee_by_number
+from shared_state import SESSION_MAX_AGE_SECONDS, create_session, end_session, rotate_session, touch_session, update_session
+from document_downloads import cached_download, empty_download_cache, prepare_download
 
 # 다국어 지원
 LANGUAGES = {
@@ -17,6 +27,12 @@ LANGUAGES = {
         'password': 'Password',
         'login': 'Login',
         'login_error': 'Incorrect Login ID or Password',
+        'login_throttled': 'Too many login attempts. Please try again in {} seconds',
+        'password_reset_required': 'Your password is a one-time password. Please set a new password',
+        'new_password': 'New Password',
+        'confirm_password': 'Confirm New Password',
+        'change_password': 'Change Password',
+        'verifying': 'Verifying...',
         'welcome': 'Welcome, {}',
         'logout': 'Logout',
         'no_capture': '⚠️ SCREEN CAPTURE AND PHOTOGRAPHY PROHIBITED',
@@ -76,6 +92,12 @@ LANGUAGES = {
         'password': 'パスワード',
         'login': 'ログイン',
         'login_error': 'ログインIDまたはパスワードが正しくありません',
+        'login_throttled': 'ログイン試行回数が多すぎます。{}秒後に再度お試しください',
+        'password_reset_required': '仮パスワードでログインしました。新しいパスワードを設定してください',
+        'new_password': '新しいパスワード',
+        'confirm_password': '新しいパスワード (確認)',
+        'change_password': 'パスワード変更',
+        'verifying': '確認中...',
         'welcome': 'ようこそ、{}様',
         'logout': 'ログアウト',
         'no_capture': '⚠️ この画面のスクリーンショット・撮影は禁止されています',
@@ -130,6 +152,18 @@ LANGUAGES = {
     }
 }
 
+# 로그인 세션 토큰 쿠키 (URL에는 싣지 않음) - 평문 HTTP 사내망에서는 BANK_COOKIE_SECURE=0
+SESSION_COOKIE = 'bank_session'
+SESSION_COOKIE_SECURE = os.environ.get('BANK_COOKIE_SECURE', '1') != '0'
+# 사용 중인 세션의 유휴 만료를 연장하는 간격
+SESSION_REFRESH_SECONDS = 5 * 60
+# 이전 버전이 URL에 싣던 세션 파라미터 (남아 있으면 제거)
+LEGACY_SESSION_PARAM = 'session'
+# 로그아웃 후에도 남기는 세션 상태 - 나머지(직원 정보, 업로드한 급여 대장, 작성 중인 조정, 위젯 값 등)는 모두 삭제
+GLOBAL_SESSION_KEYS = ('logged_in', 'language')
+# 비밀번호 검증 결과 확인 간격
+LOGIN_POLL_SECONDS = 0.2
+
 def get_text(key):
     """텍스트를 현재 언어로 반환"""
     return LANGUAGES[st.session_state.language].get(key, LANGUAGES['EN'].get(key, key))
@@ -141,22 +175,62 @@ def initialize_session_state():
     if 'language' not in st.session_state:
         st.session_state.language = 'JP'
     
-    # 사용자 데이터
-    if 'user_data' not in st.session_state:
-        st.session_state.user_data = {
-            "name": "山田 太郎",
-            "account": "098-96586-6521",
-            "emp_num": "12345678",
-            "department": "IT事業部"
-        }
-    
-    # 적금 데이터 저장소
-    if 'savings_list' not in st.session_state:
-        st.session_state.savings_list = []
-    
-    # 급여 데이터 저장소
-    if 'payroll_list' not in st.session_state:
-        st.session_state.payroll_list = []
+    # 사용자 데이터는 로그인 시 직원 디렉터리에서 로그인한 직원의 레코드만 세션에 보관
+    
+    # 적금/급여 데이터는 세션이 아닌 영속 저장소(bank_storage)에 보관 - 페이지가 필요한 행만 로드
+    initialize_database()
+    
+    if LEGACY_SESSION_PARAM in st.query_params:
+        del st.query_params[LEGACY_SESSION_PARAM]
+    
+    # 다른 서버 프로세스/새로 고침 전에 시작된 로그인 세션 복원 (쿠키의 세션 토큰, 복원할 때마다 토큰 교체)
+    if not st.session_state.logged_in:
+        restored = rotate_session(st.context.cookies.get(SESSION_COOKIE), _client_fingerprint())
+        # 직원 정보는 토큰에 복사하지 않고 디렉터리에서 다시 조회 (퇴직 등으로 없으면 복원하지 않음)
+        employee = None if restored is None else employee_by_number(restored[1]['emp_num'])
+        if employee is not None:
+            token, session = restored
+            st.session_state.session_token = token
+            st.session_state.session_refreshed_at = time.time()
+            st.session_state.session_cookie_pending = token
+            st.session_state.user_data = employee
+            st.session_state.language = session['language']
+            st.session_state.logged_in = True
+        elif restored is not None:
+            end_session(restored[0])
+
+def _client_fingerprint():
+    """세션 토큰을 묶는 클라이언트 지문 - 다른 브라우저로 옮긴 토큰은 받지 않음"""
+    return hashlib.sha256(st.context.headers.get('User-Agent', '').encode()).hexdigest()
+
+def _shared_session_data():
+    return {'emp_num': st.session_state.user_data['emp_num'], 'language': st.session_state.language}
+
+def start_shared_session():
+    """로그인 세션을 공유 상태에 저장하고 토큰은 다음 화면에서 쿠키로 기록"""
+    st.session_state.session_token = create_session(_shared_session_data(), _client_fingerprint())
+    st.session_state.session_refreshed_at = time.time()
+    st.session_state.session_cookie_pending = st.session_state.session_token
+
+def flush_session_cookie():
+    """기록 대기 중인 세션 쿠키를 브라우저에 기록 (빈 토큰은 삭제) - 높이 0 컴포넌트의 스크립트가 앱 문서의 쿠키를 설정"""
+    token = st.session_state.pop('session_cookie_pending', None)
+    if token is None:
+        return
+    # Streamlit 스크립트는 응답 헤더를 설정할 수 없어 HttpOnly는 불가 - SameSite=Strict와 짧은 수명, 클라이언트 바인딩으로 보완
+    max_age = SESSION_MAX_AGE_SECONDS if token else 0
+    cookie = f"{SESSION_COOKIE}={token}; Path=/; Max-Age={max_age}; SameSite=Strict{'; Secure' if SESSION_COOKIE_SECURE else ''}"
+    components.html(f"<script>window.parent.document.cookie = {json.dumps(cookie)};</script>", height=0)
+
+def keep_shared_session():
+    """쿠키 기록과 유휴 만료 연장 - 다른 곳에서 세션이 끝났으면 False"""
+    flush_session_cookie()
+    token = st.session_state.get('session_token')
+    if token and time.time() - st.session_state.get('session_refreshed_at', 0) >= SESSION_REFRESH_SECONDS:
+        if not touch_session(token, _client_fingerprint()):
+            return False
+        st.session_state.session_refreshed_at = time.time()
+    return True
 
 # CSS를 항상 적용하는 함수 (페이지마다 호출해야 함)
 def load_css():
@@ -453,6 +527,7 @@ def load_css():
 def login():
     """로그인 페이지"""
     load_css()
+    flush_session_cookie()
     
     st.markdown(f"""
     <div class="bank-header">
@@ -475,20 +550,87 @@ def login():
         st.markdown('<div style="height: 2rem"></div>', unsafe_allow_html=True)
         
         with st.container():
+            # 임시 비밀번호로 로그인한 직원은 새 비밀번호를 설정해야 로그인 완료
+            reset_login = st.session_state.get('password_reset_login')
+            if reset_login is not None:
+                st.markdown(f"### 🔑 {get_text('change_password')}")
+                st.info(get_text('password_reset_required'))
+                with st.form("password_reset_form"):
+                    new_password = st.text_input(get_text('new_password'), type="password")
+                    confirmation = st.text_input(get_text('confirm_password'), type="password")
+                    if st.form_submit_button(get_text('change_password'), use_container_width=True, type="primary"):
+                        problem = check_new_password(new_password, confirmation, reset_login)
+                        employee = employee_by_login(reset_login)
+                        if problem:
+                            st.error(" / ".join(problem))
+                        elif employee is not None:
+                            set_password(reset_login, new_password)
+                            del st.session_state.password_reset_login
+                            _complete_login(employee)
+                return
+
             st.markdown("### 🔐 ログイン")
+            # 해시 검증은 검증 풀에서 진행 - 끝날 때까지 확인 조각만 주기적으로 재실행
+            attempt = st.session_state.get('login_attempt')
+            if attempt is not None:
+                result = poll_authentication(attempt)
+                if result is None:
+                    _login_pending()
+                    return
+                del st.session_state.login_attempt
+                employee = employee_by_login(attempt['login']) if result['ok'] else None
+                if employee is not None and result['must_reset']:
+                    st.session_state.password_reset_login = employee['login_id']
+                    st.rerun()
+                elif employee is not None:
+                    _complete_login(employee)
+                elif result['throttled']:
+                    st.error(get_text('login_throttled').format(int(result['retry_after']) + 1))
+                else:
+                    st.error(get_text('login_error'))
+
             with st.form("login_form"):
-                user_id = st.text_input(get_text('login_id'), placeholder="otsuka")
-                password = st.text_input(get_text('password'), type="password", placeholder="bank1234")
+                user_id = st.text_input(get_text('login_id'))
+                password = st.text_input(get_text('password'), type="password")
                 
                 if st.form_submit_button(get_text('login'), use_container_width=True, type="primary"):
-                    if user_id == "otsuka" and password == "bank1234":
-                        st.session_state.logged_in = True
-                        st.rerun()
-                    else:
-                        st.error(get_text('login_error'))
+                    st.session_state.login_attempt = begin_authentication(user_id, password)
+                    st.rerun()
+
+@st.fragment(run_every=LOGIN_POLL_SECONDS)
+def _login_pending():
+    """검증 중 표시 - 이 조각만 주기적으로 재실행하다가 결과가 나오면 화면 전체를 재실행"""
+    attempt = st.session_state.get('login_attempt')
+    if attempt is not None and poll_authentication(attempt) is None:
+        st.info(get_text('verifying'))
+        return
+    st.rerun()
+
+def _complete_login(employee):
+    st.session_state.user_data = employee
+    st.session_state.logged_in = True
+    start_shared_session()
+    st.rerun()
+
+def logout():
+    """로그아웃 - 공유 세션 종료, 직원별 세션 상태와 세션 쿠키 삭제"""
+    if st.session_state.get('session_token'):
+        end_session(st.session_state.session_token)
+    # 같은 브라우저에서 다음에 로그인하는 직원에게 이전 직원의 데이터가 보이지 않도록 전역 키 외에는 모두 삭제
+    for key in list(st.session_state.keys()):
+        if key not in GLOBAL_SESSION_KEYS:
+            del st.session_state[key]
+    st.session_state.logged_in = False
+    st.session_state.session_cookie_pending = ''
 
 def main_layout():
     """메인 레이아웃 - 모든 페이지에서 호출"""
+    initialize_session_state()
+    # 유휴/절대 만료 또는 다른 탭에서 로그아웃한 세션은 이 화면에서도 로그아웃
+    if st.session_state.logged_in and not keep_shared_session():
+        logout()
+    if not st.session_state.logged_in:
+        st.switch_page("app.py")
     load_css()
     
     user_name_jp = st.session_state.user_data['name']
@@ -544,12 +686,14 @@ def main_layout():
             lang_text = "EN" if current_lang == 'JP' else "JP"
             if st.button(f"🌐 {lang_text}", key="lang_switcher", use_container_width=True):
                 st.session_state.language = 'EN' if current_lang == 'JP' else 'JP'
+                if st.session_state.get('session_token'):
+                    update_session(st.session_state.session_token, _shared_session_data(), _client_fingerprint())
                 st.rerun()
         
         with col6:
             # 로그아웃 버튼
             if st.button("🚪", key="logout_btn", use_container_width=True, help=get_text('logout')):
-                st.session_state.logged_in = False
+                logout()
                 st.rerun()
         
         with col1, col4, col7:
@@ -558,6 +702,26 @@ def main_layout():
     # 구분선 추가
     st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
 
+def record_store(kind):
+    """세션 공용 ID 키 저장소 ('plans' / 'payslips') - 로그인 직원 기준으로 열고 모든 페이지가 같은 객체를 사용"""
+    owner = st.session_state.user_data['emp_num']
+    store = st.session_state.get(f"{kind}_store")
+    if store is None or store['owner'] != owner:
+        store = st.session_state[f"{kind}_store"] = open_store(kind, owner)
+    return sync_store(store)
+
+def lazy_download_button(key, version, render, file_name, label, compress=False):
+    """문서 다운로드 버튼 - 준비 버튼을 누른 문서만 생성하고, 같은 버전은 세션 캐시에서 재사용"""
+    if 'download_cache' not in st.session_state:
+        st.session_state.download_cache = empty_download_cache()
+    cache = st.session_state.download_cache
+    entry = cached_download(cache, key, version, compress)
+    if entry is None and st.button(f"📄 {label} (準備 / Prepare)", key=f"prepare_{key}", use_container_width=True):
+        entry = prepare_download(cache, key, version, render, file_name, compress)
+    if entry is not None:
+        st.download_button(f"📥 {label}", entry['data'], entry['file_name'], entry['mime'], key=f"download_{key}",
+                           use_container_width=True)
+
 def show_security_warnings():
     """보안 경고 표시 - 캡처 경고만 플래시, 둘 다 일반 네모도형"""
     st.markdown(f'<div class="capture-warning">{get_text("no_capture")}</div>', unsafe_allow_html=True)
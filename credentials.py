@@ -0,0 +1,284 @@
+# credentials.py
+import argparse
+import base64
+import csv
+import getpass
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from employee_directory import employee_directory, normalize_login_id
+from shared_state import shared_state
+
+# 자격 증명 - 솔트를 넣은 scrypt/PBKDF2 해시 저장, 해시 검증은 스레드 풀에서 비동기로, 계정별 토큰 버킷으로 시도 횟수 제한
+
+CREDENTIAL_FILE = os.environ.get(
+    'BANK_CREDENTIAL_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'credentials.csv')
+)
+# scrypt 비용 (n=2^14, r=8 -> 16MB 메모리, 약 50~70ms)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600000
+# 공통 기본 비밀번호는 두지 않음 - 관리자가 계정마다 임시 비밀번호를 발급하고(must_reset), 첫 로그인에서 본인이 변경
+PASSWORD_MIN_LENGTH = 10
+TEMPORARY_PASSWORD_BYTES = 12
+SALT_BYTES = 16
+HASH_BYTES = 32
+# 동시에 계산하는 해시 수 - 9시 로그인 폭주 때 CPU/메모리를 넘지 않도록 고정하고 나머지는 대기열에서 순서대로 처리
+# (로그인 화면은 계산을 맡기고 바로 돌아와 재실행 때마다 결과만 확인하므로 스크립트 스레드가 해시를 기다리지 않음)
+VERIFY_WORKERS = max(1, min(4, os.cpu_count() or 1))
+VERIFY_TIMEOUT_SECONDS = 30
+# 검증 성공 캐시 - 같은 계정/비밀번호로 짧은 시간 안에 다시 로그인하면(다른 탭, 재접속) 해시를 다시 계산하지 않음
+VERIFIED_TTL_SECONDS = 300
+VERIFIED_CACHE_ENTRIES = 10000
+# 계정별 토큰 버킷 - 최대 5회 연속 시도, 12초마다 1회 회복
+THROTTLE_CAPACITY = 5
+THROTTLE_REFILL_SECONDS = 12
+THROTTLE_NAMESPACE = 'login_throttle'
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def hash_password(password, method='scrypt'):
+    """비밀번호 해시 문자열 - 'scrypt$n$r$p$salt$hash' 또는 'pbkdf2_sha256$iterations$salt$hash'"""
+    salt = secrets.token_bytes(SALT_BYTES)
+    if method == 'scrypt':
+        digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=HASH_BYTES)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    if method == 'pbkdf2_sha256':
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, PBKDF2_ITERATIONS, HASH_BYTES)
+        return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(digest)}"
+    raise ValueError(f"unknown hash method: {method}")
+
+
+def verify_password(password, encoded):
+    """해시 문자열과 비밀번호 비교 (상수 시간 비교)"""
+    method, *fields = encoded.split('$')
+    if method == 'scrypt':
+        n, r, p, salt, expected = fields
+        expected = base64.b64decode(expected)
+        digest = hashlib.scrypt(
+            password.encode(), salt=base64.b64decode(salt), n=int(n), r=int(r), p=int(p), dklen=len(expected)
+        )
+    elif method == 'pbkdf2_sha256':
+        iterations, salt, expected = fields
+        expected = base64.b64decode(expected)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), base64.b64decode(salt), int(iterations), len(expected))
+    else:
+        raise ValueError(f"unknown hash method: {method}")
+    return hmac.compare_digest(digest, expected)
+
+
+def _truthy(value):
+    return (value or '').strip().casefold() in ('1', 'true', 'yes')
+
+
+def _read_rows(path):
+    """{로그인 ID: (해시 문자열, 변경 필요 여부)} - must_reset 열이 없는 예전 파일은 변경 불필요"""
+    with open(path, encoding='utf-8', newline='') as f:
+        return {row['login_id']: (row['password_hash'], _truthy(row.get('must_reset'))) for row in csv.DictReader(f)}
+
+
+@lru_cache(maxsize=1)
+def _load_credentials(path, mtime):
+    return {normalize_login_id(login): entry for login, entry in _read_rows(path).items()}
+
+
+def credential_table(path=None):
+    """{정규화된 로그인 ID: (해시 문자열, 변경 필요 여부)} - 파일이 바뀌었을 때만 다시 읽음"""
+    path = path or CREDENTIAL_FILE
+    return _load_credentials(path, os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash():
+    """없는 계정에도 같은 비용의 해시를 계산해 응답 시간으로 계정 존재 여부가 드러나지 않게 함 (어떤 비밀번호와도 불일치)"""
+    salt, digest = secrets.token_bytes(SALT_BYTES), secrets.token_bytes(HASH_BYTES)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+@lru_cache(maxsize=1)
+def _verify_pool():
+    return ThreadPoolExecutor(max_workers=VERIFY_WORKERS, thread_name_prefix='credential-verify')
+
+
+# 검증 성공 캐시 - 키는 프로세스 비밀키로 만든 HMAC이라 메모리에 비밀번호가 남지 않음
+_verified_key = secrets.token_bytes(32)
+_verified = OrderedDict()
+_verified_lock = threading.Lock()
+
+
+def _verified_cache_key(login, password, encoded):
+    # 해시가 바뀌면(비밀번호 변경) 키도 바뀌어 이전 캐시는 쓰이지 않음
+    return hmac.new(_verified_key, "\0".join((login, password, encoded)).encode(), hashlib.sha256).digest()
+
+
+def _recently_verified(key):
+    with _verified_lock:
+        expires_at = _verified.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del _verified[key]
+            return False
+        return True
+
+
+def _remember_verified(key):
+    with _verified_lock:
+        _verified[key] = time.monotonic() + VERIFIED_TTL_SECONDS
+        _verified.move_to_end(key)
+        while len(_verified) > VERIFIED_CACHE_ENTRIES:
+            _verified.popitem(last=False)
+
+
+def take_login_token(login_id, now=None):
+    """계정 버킷에서 시도 1회 차감 - (허용 여부, 다음 시도까지 남은 초), 버킷은 프로세스 간 공유되고 차감은 원자적"""
+    login = normalize_login_id(login_id)
+
+    def take(bucket):
+        current = time.time() if now is None else now
+        tokens, updated = bucket or (THROTTLE_CAPACITY, current)
+        tokens = min(THROTTLE_CAPACITY, tokens + max(current - updated, 0) / THROTTLE_REFILL_SECONDS)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        ttl = (THROTTLE_CAPACITY - tokens) * THROTTLE_REFILL_SECONDS
+        return (tokens, current), max(ttl, 1), (allowed, 0.0 if allowed else (1 - tokens) * THROTTLE_REFILL_SECONDS)
+
+    return shared_state().update(THROTTLE_NAMESPACE, login, take)
+
+
+def reset_login_throttle(login_id):
+    """로그인 성공 시 버킷 초기화"""
+    shared_state().delete(THROTTLE_NAMESPACE, normalize_login_id(login_id))
+
+
+def begin_authentication(login_id, password, path=None):
+    """로그인 검증 시작 - 해시 계산은 검증 스레드 풀에 넘기고 바로 반환, 결과는 poll_authentication으로 확인"""
+    login = normalize_login_id(login_id)
+    attempt = {'login': login, 'future': None, 'result': None, 'key': None, 'must_reset': False}
+    allowed, retry_after = take_login_token(login)
+    if not allowed:
+        attempt['result'] = {'ok': False, 'throttled': True, 'retry_after': retry_after, 'must_reset': False}
+        return attempt
+
+    encoded, attempt['must_reset'] = credential_table(path).get(login, (None, False))
+    if encoded is not None:
+        attempt['key'] = _verified_cache_key(login, password, encoded)
+        if _recently_verified(attempt['key']):
+            reset_login_throttle(login)
+            attempt['result'] = {'ok': True, 'throttled': False, 'retry_after': 0.0, 'must_reset': attempt['must_reset']}
+            return attempt
+    attempt['future'] = _verify_pool().submit(verify_password, password, encoded or _dummy_hash())
+    return attempt
+
+
+def poll_authentication(attempt, wait=False):
+    """검증 결과 {'ok', 'throttled', 'retry_after', 'must_reset'} - 아직 계산 중이면 None (wait이면 끝날 때까지 대기)"""
+    if attempt['result'] is None:
+        future = attempt['future']
+        if not wait and not future.done():
+            return None
+        ok = future.result(VERIFY_TIMEOUT_SECONDS) and attempt['key'] is not None
+        if ok:
+            _remember_verified(attempt['key'])
+            reset_login_throttle(attempt['login'])
+        attempt['result'] = {'ok': ok, 'throttled': False, 'retry_after': 0.0, 'must_reset': ok and attempt['must_reset']}
+    return attempt['result']
+
+
+def authenticate(login_id, password, path=None):
+    """로그인 검증 (결과가 나올 때까지 대기) - Streamlit 화면은 begin/poll_authentication 사용"""
+    return poll_authentication(begin_authentication(login_id, password, path), wait=True)
+
+
+def check_new_password(password, confirmation, login_id=None, path=None):
+    """새 비밀번호 규칙 - 문제가 있으면 (일본어, 영어) 메시지, 없으면 None (login_id를 주면 현재 비밀번호 재사용도 거부)"""
+    if len(password) < PASSWORD_MIN_LENGTH:
+        return (f"パスワードは{PASSWORD_MIN_LENGTH}文字以上にしてください", f"Use at least {PASSWORD_MIN_LENGTH} characters")
+    if password != confirmation:
+        return ("確認用パスワードが一致しません", "Passwords do not match")
+    if login_id is not None:
+        encoded, _ = credential_table(path).get(normalize_login_id(login_id), (None, False))
+        if encoded is not None and verify_password(password, encoded):
+            return ("現在のパスワードとは別のパスワードにしてください", "Choose a password different from the current one")
+    return None
+
+
+def set_passwords(passwords, path=None, method='scrypt', must_reset=False):
+    """자격 증명 파일의 해시 추가/교체 ({로그인 ID: 비밀번호}) - 임시 파일에 쓰고 교체"""
+    path = path or CREDENTIAL_FILE
+    rows = _read_rows(path) if os.path.exists(path) else {}
+    replaced = {normalize_login_id(login) for login in passwords}
+    rows = {login: entry for login, entry in rows.items() if normalize_login_id(login) not in replaced}
+    for login_id, password in passwords.items():
+        rows[login_id.strip()] = (hash_password(password, method), must_reset)
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('login_id', 'password_hash', 'must_reset'))
+        writer.writerows((login, encoded, int(reset)) for login, (encoded, reset) in sorted(rows.items()))
+    os.replace(temporary, path)
+
+
+def set_password(login_id, password, path=None, method='scrypt', must_reset=False):
+    """계정 1개의 비밀번호 설정 - must_reset이면 다음 로그인에서 변경 요구"""
+    set_passwords({login_id: password}, path, method, must_reset)
+
+
+def issue_temporary_passwords(login_ids, path=None, method='scrypt'):
+    """계정마다 서로 다른 임시 비밀번호 발급 (첫 로그인 시 변경 필요) - {로그인 ID: 임시 비밀번호}, 발급 후 다시 볼 수 없음"""
+    passwords = {login_id: secrets.token_urlsafe(TEMPORARY_PASSWORD_BYTES) for login_id in login_ids}
+    if passwords:
+        set_passwords(passwords, path, method, must_reset=True)
+    return passwords
+
+
+def accounts_without_password(path=None):
+    """직원 디렉터리에는 있지만 비밀번호가 없는 로그인 ID"""
+    path = path or CREDENTIAL_FILE
+    table = credential_table(path) if os.path.exists(path) else {}
+    return [employee['login_id'] for login, employee in employee_directory()['by_login'].items() if login not in table]
+
+
+def main(argv=None):
+    """CLI: python credentials.py otsuka (비밀번호 입력) / otsuka --temporary (임시 발급) / --provision (비밀번호 없는 전원 임시 발급)"""
+    parser = argparse.ArgumentParser(description="パスワード設定 / Set an employee password")
+    parser.add_argument('login_id', nargs='?')
+    parser.add_argument('--temporary', action='store_true', help="issue a one-time password that must be changed at first login")
+    parser.add_argument('--provision', action='store_true', help="issue one-time passwords for every employee without one")
+    parser.add_argument('--method', choices=('scrypt', 'pbkdf2_sha256'), default='scrypt')
+    parser.add_argument('--file', default=None, help="credential file (default: data/credentials.csv)")
+    args = parser.parse_args(argv)
+    if args.provision or args.temporary:
+        login_ids = accounts_without_password(args.file) if args.provision else [args.login_id] if args.login_id else []
+        if not login_ids:
+            print("no accounts to provision" if args.provision else "login_id is required", file=sys.stderr)
+            return 0 if args.provision else 1
+        for login_id, password in issue_temporary_passwords(login_ids, args.file, args.method).items():
+            print(f"{login_id}\t{password}")
+        return 0
+    if not args.login_id:
+        parser.error("login_id is required")
+    password = getpass.getpass("Password: ")
+    problem = check_new_password(password, getpass.getpass("Confirm: "))
+    if problem:
+        print(problem[1], file=sys.stderr)
+        return 1
+    set_password(args.login_id, password, args.file, args.method)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# document_charts.py
+import numpy as np
+
+# 문서용 서버 측 SVG 차트 - 자바스크립트/외부 폰트 없이 인라인, 긴 시계열은 LTTB로 점 개수 상한 유지
+
+# 시리즈당 최대 점 수 (이보다 긴 스케줄은 LTTB로 축약)
+CHART_MAX_POINTS = 240
+CHART_WIDTH = 860
+CHART_HEIGHT = 300
+CHART_MARGIN = {'left': 96, 'right': 20, 'top': 20, 'bottom': 56}
+CHART_Y_TICKS = 5
+CHART_X_TICKS = 6
+BALANCE_COLOR = '#2c5282'
+PAYMENT_COLOR = '#f59e0b'
+# 시스템 폰트만 사용 (네트워크 폰트 없음)
+CHART_FONT = "'Hiragino Sans', 'Noto Sans JP', sans-serif"
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets - 모양을 유지하며 threshold개 점으로 줄인 인덱스 (처음/끝 점 포함)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # 처음/끝을 제외한 점을 threshold - 2개 버킷으로 균등 분할
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # 다음 버킷의 평균점 (마지막 버킷은 끝점)
+        following = slice(stop, edges[bucket + 2]) if bucket + 2 < len(edges) else slice(n - 1, n)
+        avg_x, avg_y = x[following].mean(), y[following].mean()
+        ax, ay = x[anchor], y[anchor]
+        area = np.abs((ax - avg_x) * (y[start:stop] - ay) - (ax - x[start:stop]) * (avg_y - ay))
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def _nice_step(span, ticks):
+    """축 눈금 간격 - 1, 2, 5 × 10^k 중 span/ticks 이상인 최솟값"""
+    if span <= 0:
+        return 1.0
+    raw = span / ticks
+    magnitude = 10 ** np.floor(np.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if factor * magnitude >= raw:
+            return float(factor * magnitude)
+
+
+def _polyline(px, py, color, width=2.5, dash=None):
+    points = " ".join(f"{a:.1f},{b:.1f}" for a, b in zip(px.tolist(), py.tolist()))
+    dash_attr = f' stroke-dasharray="{dash}"' if dash else ''
+    return f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="{width}"{dash_attr} stroke-linejoin="round"/>'
+
+
+def schedule_chart_svg(schedule, max_points=CHART_MAX_POINTS, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """스케줄의 잔액/누적 입금액 추이 인라인 SVG - 시리즈마다 LTTB로 max_points개 이하"""
+    balance = np.asarray(schedule['balance'], dtype=np.float64)
+    paid = np.asarray(schedule['paid_to_date'], dtype=np.float64)
+    n = len(balance)
+    if n == 0:
+        return ''
+    months = np.arange(1, n + 1, dtype=np.float64)
+
+    left, top = CHART_MARGIN['left'], CHART_MARGIN['top']
+    plot_width = width - left - CHART_MARGIN['right']
+    plot_height = height - top - CHART_MARGIN['bottom']
+    step = _nice_step(max(balance.max(), paid.max()), CHART_Y_TICKS)
+    y_max = step * max(1, np.ceil(max(balance.max(), paid.max()) / step))
+
+    def scale_x(values):
+        return left + (values - 1) / max(n - 1, 1) * plot_width
+
+    def scale_y(values):
+        return top + plot_height - values / y_max * plot_height
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="100%" role="img" '
+        f'font-family="{CHART_FONT}" font-size="12">',
+        '<title>残高推移 / Balance History</title>'
+    ]
+    # Y축 눈금/격자
+    for value in np.arange(0, y_max + step / 2, step):
+        y = scale_y(value)
+        parts.append(f'<line x1="{left}" y1="{y:.1f}" x2="{left + plot_width}" y2="{y:.1f}" stroke="#e2e8f0"/>')
+        parts.append(f'<text x="{left - 8}" y="{y + 4:.1f}" text-anchor="end" fill="#64748b">¥{value:,.0f}</text>')
+    # X축 눈금 - 입금일(연/월)
+    payment_dates = schedule['payment_date']
+    for index in np.unique(np.linspace(0, n - 1, min(CHART_X_TICKS, n)).round().astype(np.int64)).tolist():
+        x = scale_x(months[index])
+        label = str(np.datetime64(payment_dates[index], 'M')).replace('-', '/')
+        parts.append(f'<line x1="{x:.1f}" y1="{top + plot_height}" x2="{x:.1f}" y2="{top + plot_height + 5}" stroke="#94a3b8"/>')
+        parts.append(f'<text x="{x:.1f}" y="{top + plot_height + 20}" text-anchor="middle" fill="#64748b">{label}</text>')
+    parts.append(f'<line x1="{left}" y1="{top + plot_height}" x2="{left + plot_width}" y2="{top + plot_height}" stroke="#94a3b8"/>')
+
+    # 시리즈 - 각각 LTTB 축약
+    balance_index = lttb_indices(months, balance, max_points)
+    paid_index = lttb_indices(months, paid, max_points)
+    bx, by = scale_x(months[balance_index]), scale_y(balance[balance_index])
+    area = " ".join(f"{a:.1f},{b:.1f}" for a, b in zip(bx.tolist(), by.tolist()))
+    baseline = top + plot_height
+    parts.append(f'<polygon points="{bx[0]:.1f},{baseline} {area} {bx[-1]:.1f},{baseline}" fill="{BALANCE_COLOR}" fill-opacity="0.12"/>')
+    parts.append(_polyline(bx, by, BALANCE_COLOR))
+    parts.append(_polyline(scale_x(months[paid_index]), scale_y(paid[paid_index]), PAYMENT_COLOR, dash='6 4'))
+
+    # 범례
+    legend_y = height - 12
+    parts.append(f'<line x1="{left}" y1="{legend_y - 4}" x2="{left + 24}" y2="{legend_y - 4}" stroke="{BALANCE_COLOR}" stroke-width="2.5"/>')
+    parts.append(f'<text x="{left + 30}" y="{legend_y}" fill="#374151">残高 / Balance</text>')
+    parts.append(f'<line x1="{left + 170}" y1="{legend_y - 4}" x2="{left + 194}" y2="{legend_y - 4}" stroke="{PAYMENT_COLOR}" stroke-width="2.5" stroke-dasharray="6 4"/>')
+    parts.append(f'<text x="{left + 200}" y="{legend_y}" fill="#374151">累計入金額 / Total Paid</text>')
+    parts.append('</svg>')
+    return "".join(parts)
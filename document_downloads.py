@@ -0,0 +1,65 @@
+# document_downloads.py
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import date
+
+# 문서 다운로드 지연 생성 - 사용자가 요청한 문서만 만들고, 문서 버전(내용 지문)별로 세션 캐시에 보관
+
+# 세션당 보관하는 생성 문서 수 (오래 쓰지 않은 것부터 제거)
+DOWNLOAD_CACHE_ENTRIES = 32
+HTML_MIME = 'text/html'
+GZIP_MIME = 'application/gzip'
+
+
+def empty_download_cache():
+    """세션별 다운로드 캐시 - {문서 키: 생성된 항목} (최근 사용 순)"""
+    return OrderedDict()
+
+
+def document_version(*parts):
+    """문서 내용을 결정하는 값들의 지문 - 값이 같으면 같은 문서"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def savings_document_version(savings, user_data, as_of=None):
+    """적금 증명서 버전 - 플랜 조건/조정/금리 변경/계산 결과와 기준일(진행 상황)이 바뀌면 새 버전"""
+    calculation = savings['calculation']
+    return document_version(
+        savings['id'], savings['name'], savings['start_date'], savings['period'], savings['monthly_amount'],
+        savings['interest_rate'], savings.get('compounding'), savings.get('date_convention'),
+        sorted((int(month), amount) for month, amount in savings['adjustments'].items()),
+        savings.get('rules'), savings.get('rate_changes'),
+        calculation['total_payment'], calculation['total_interest'], calculation['final_balance'],
+        user_data['name'], user_data['emp_num'], as_of or date.today()
+    )
+
+
+def _entry(version, content, file_name, compress):
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    if compress:
+        # mtime 고정 - 같은 문서는 같은 바이트
+        return {'version': version, 'compress': True, 'data': gzip.compress(data, mtime=0),
+                'file_name': f"{file_name}.gz", 'mime': GZIP_MIME}
+    return {'version': version, 'compress': False, 'data': data, 'file_name': file_name, 'mime': HTML_MIME}
+
+
+def cached_download(cache, key, version, compress=False):
+    """이미 생성된 현재 버전의 문서 - 없거나 버전/압축 여부가 다르면 None"""
+    entry = cache.get(key)
+    if entry is None or entry['version'] != version or entry['compress'] != compress:
+        return None
+    cache.move_to_end(key)
+    return entry
+
+
+def prepare_download(cache, key, version, render, file_name, compress=False):
+    """문서를 생성해 캐시에 저장 - render는 HTML 문자열을 반환하는 호출 가능 객체 (현재 버전이 있으면 재사용)"""
+    entry = cached_download(cache, key, version, compress)
+    if entry is None:
+        entry = cache[key] = _entry(version, render(), file_name, compress)
+        while len(cache) > DOWNLOAD_CACHE_ENTRIES:
+            cache.popitem(last=False)
+    return entry
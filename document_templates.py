@@ -0,0 +1,325 @@
+# document_templates.py
+import re
+import string
+import time
+from datetime import datetime
+from functools import lru_cache
+
+# 문서 HTML 템플릿 - 정적 CSS와 골격은 프로세스당 한 번만 만들고, 문서마다 작은 동적 본문만 채움
+
+CERTIFICATE_CSS = """
+body {
+    font-family: 'Hiragino Sans', 'Noto Sans JP', sans-serif;
+    margin: 0;
+    padding: 0;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+}
+.certificate-container {
+    max-width: 1000px;
+    margin: 20px auto;
+    background: white;
+    padding: 40px;
+    box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+    border-radius: 20px;
+    border: 15px double #2c5282;
+    position: relative;
+}
+.watermark {
+    position: absolute;
+    top: 50%;
+    left: 50%;
+    transform: translate(-50%, -50%) rotate(-45deg);
+    font-size: 120px;
+    color: rgba(30, 58, 138, 0.1);
+    font-weight: bold;
+    z-index: 0;
+}
+.header {
+    text-align: center;
+    border-bottom: 3px solid #2c5282;
+    padding-bottom: 25px;
+    margin-bottom: 30px;
+    position: relative;
+    z-index: 1;
+}
+.certificate-title {
+    font-size: 32px;
+    font-weight: bold;
+    color: #2c5282;
+    margin-bottom: 10px;
+    text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
+}
+.subtitle { color: #666; font-size: 18px; margin-bottom: 10px; }
+.subtitle-small { color: #94a3b8; font-size: 14px; }
+.info-grid {
+    display: grid;
+    grid-template-columns: 1fr 1fr;
+    gap: 25px;
+    margin-bottom: 30px;
+    position: relative;
+    z-index: 1;
+}
+.info-card {
+    background: linear-gradient(135deg, #f8fafc, #f1f5f9);
+    padding: 25px;
+    border-radius: 15px;
+    border-left: 5px solid #2c5282;
+    box-shadow: 0 5px 15px rgba(0,0,0,0.1);
+}
+.info-card h3 { color: #374151; border-bottom: 2px solid #e2e8f0; padding-bottom: 10px; }
+.info-row { margin: 15px 0; }
+.calculation-section {
+    background: linear-gradient(135deg, #dbeafe, #e0f2fe);
+    padding: 30px;
+    border-radius: 15px;
+    margin: 30px 0;
+    border: 2px solid #3b82f6;
+    position: relative;
+    z-index: 1;
+}
+.calculation-section h3 { color: #1e40af; margin-bottom: 25px; }
+.chart-section {
+    background: white;
+    padding: 25px;
+    border-radius: 15px;
+    margin: 25px 0;
+    border: 2px solid #e2e8f0;
+    position: relative;
+    z-index: 1;
+}
+.chart-section h3 { color: #374151; margin-bottom: 15px; }
+.progress-section {
+    background: linear-gradient(135deg, #f0fdf4, #dcfce7);
+    padding: 25px;
+    border-radius: 15px;
+    margin: 25px 0;
+    border: 2px solid #22c55e;
+    position: relative;
+    z-index: 1;
+}
+.progress-section h3 { color: #166534; margin-bottom: 20px; }
+.two-columns { display: grid; grid-template-columns: 1fr 1fr; gap: 20px; }
+.progress-bar {
+    width: 100%;
+    height: 20px;
+    background: #e2e8f0;
+    border-radius: 10px;
+    overflow: hidden;
+    margin: 15px 0;
+}
+.progress-fill {
+    height: 100%;
+    background: linear-gradient(90deg, #10b981, #22c55e);
+    transition: width 1s ease;
+}
+.result-card {
+    text-align: center;
+    padding: 15px;
+    background: white;
+    border-radius: 10px;
+    box-shadow: 0 3px 10px rgba(0,0,0,0.1);
+}
+.result-label { font-size: 14px; color: #64748b; }
+.result-value { font-size: 24px; font-weight: bold; }
+.footer {
+    text-align: center;
+    margin-top: 40px;
+    padding-top: 20px;
+    border-top: 2px solid #e2e8f0;
+    color: #666;
+    font-size: 14px;
+    position: relative;
+    z-index: 1;
+}
+.footer-note { font-size: 12px; color: #94a3b8; }
+.value {
+    font-size: 18px;
+    font-weight: bold;
+    color: #1e40af;
+}
+.highlight {
+    background: linear-gradient(135deg, #fef3c7, #fde68a);
+    padding: 5px 10px;
+    border-radius: 5px;
+    font-weight: bold;
+}
+"""
+
+PAYSLIP_CSS = """
+body {
+    font-family: 'Hiragino Sans', 'Noto Sans JP', sans-serif;
+    margin: 0;
+    padding: 20px;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+}
+.payslip-container {
+    max-width: 900px;
+    margin: 0 auto;
+    background: white;
+    padding: 40px;
+    box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+    border-radius: 20px;
+    border: 10px double #2c5282;
+}
+.header {
+    text-align: center;
+    border-bottom: 3px solid #2c5282;
+    padding-bottom: 25px;
+    margin-bottom: 30px;
+}
+.company-name {
+    font-size: 28px;
+    font-weight: bold;
+    color: #2c5282;
+    margin-bottom: 10px;
+    text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
+}
+.document-title { font-size: 24px; color: #333; margin-bottom: 15px; font-weight: 600; }
+.pay-date { font-size: 18px; color: #666; background: #f8fafc; padding: 10px; border-radius: 8px; display: inline-block; }
+.info-section {
+    display: grid;
+    grid-template-columns: 1fr 1fr;
+    gap: 25px;
+    margin-bottom: 30px;
+}
+.info-card {
+    background: linear-gradient(135deg, #f8fafc, #f1f5f9);
+    padding: 20px;
+    border-radius: 12px;
+    border-left: 5px solid #2c5282;
+    box-shadow: 0 5px 15px rgba(0,0,0,0.1);
+}
+.info-card h3 { color: #374151; margin-bottom: 15px; }
+.info-value { font-weight: 600; }
+.amount-section {
+    display: grid;
+    grid-template-columns: 1fr 1fr;
+    gap: 30px;
+    margin-bottom: 30px;
+}
+.income-box {
+    background: linear-gradient(135deg, #f0fff4, #dcfce7);
+    padding: 25px;
+    border-radius: 15px;
+    border: 2px solid #22c55e;
+    box-shadow: 0 8px 25px rgba(34, 197, 94, 0.2);
+}
+.deduction-box {
+    background: linear-gradient(135deg, #fef2f2, #fee2e2);
+    padding: 25px;
+    border-radius: 15px;
+    border: 2px solid #ef4444;
+    box-shadow: 0 8px 25px rgba(239, 68, 68, 0.2);
+}
+.income-box .section-title, .income-box .amount { color: #166534; }
+.deduction-box .section-title, .deduction-box .amount { color: #dc2626; }
+.subtotal { border-top: 3px solid; padding-top: 15px; margin-top: 10px; }
+.income-box .subtotal { border-color: #22c55e; }
+.deduction-box .subtotal { border-color: #ef4444; }
+.subtotal strong { font-size: 18px; }
+.subtotal .amount { font-size: 20px; }
+.total-section {
+    background: linear-gradient(135deg, #1e3a8a, #3730a3);
+    color: white;
+    padding: 30px;
+    border-radius: 15px;
+    text-align: center;
+    margin-top: 30px;
+    box-shadow: 0 10px 30px rgba(30, 58, 138, 0.4);
+}
+.net-label { font-size: 20px; margin-bottom: 10px; }
+.net-amount { font-size: 42px; font-weight: bold; margin: 15px 0; text-shadow: 2px 2px 4px rgba(0,0,0,0.3); }
+.transfer-date { font-size: 14px; opacity: 0.9; }
+.detail-row {
+    display: flex;
+    justify-content: space-between;
+    padding: 12px 0;
+    border-bottom: 1px solid #e2e8f0;
+}
+.amount {
+    font-weight: bold;
+    font-size: 16px;
+}
+.section-title {
+    font-size: 20px;
+    font-weight: bold;
+    margin-bottom: 20px;
+    color: #374151;
+    border-bottom: 2px solid;
+    padding-bottom: 10px;
+}
+.footer { text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #e2e8f0; color: #64748b; font-size: 12px; }
+"""
+
+WITHHOLDING_SLIP_CSS = """
+body { font-family: 'Hiragino Sans', 'Noto Sans JP', sans-serif; margin: 0; padding: 20px; background: #f1f5f9; }
+.slip-container { max-width: 800px; margin: 0 auto; background: white; padding: 40px; border: 6px double #2c5282; border-radius: 12px; }
+.header { text-align: center; border-bottom: 3px solid #2c5282; padding-bottom: 20px; margin-bottom: 25px; }
+.company-name { font-size: 24px; font-weight: bold; color: #2c5282; }
+.document-title { font-size: 22px; margin-top: 10px; font-weight: 600; }
+table { width: 100%; border-collapse: collapse; margin-bottom: 25px; }
+th, td { border: 1px solid #cbd5e1; padding: 10px 12px; text-align: left; }
+th { background: #e2e8f0; width: 45%; }
+.amount { text-align: right; font-weight: bold; }
+.section-title { font-size: 18px; font-weight: bold; color: #374151; margin: 20px 0 10px; }
+.footer { text-align: center; margin-top: 30px; color: #64748b; font-size: 12px; }
+"""
+
+STYLESHEETS = {
+    'certificate': CERTIFICATE_CSS,
+    'payslip': PAYSLIP_CSS,
+    'withholding_slip': WITHHOLDING_SLIP_CSS
+}
+
+
+def compile_template(template, **blocks):
+    """본문 템플릿을 서식 문자열로 사전 컴파일 - 들여쓰기/빈 줄 제거, 고정 블록은 미리 삽입, 나머지 자리표시자는 키워드 인수"""
+    # 템플릿과 고정 블록은 이 저장소의 상수만 사용 (블록 안의 자리표시자도 키워드 인수가 됨)
+    for name, block in blocks.items():
+        template = template.replace("{" + name + "}", block)
+    text = "\n".join(line.strip() for line in template.splitlines() if line.strip())
+    fields = frozenset(field for _, field, _, _ in string.Formatter().parse(text) if field)
+    format_map = text.format_map
+
+    def render(**values):
+        if values.keys() != fields:
+            raise TypeError(f"template fields mismatch: missing {sorted(fields - values.keys())}, unexpected {sorted(values.keys() - fields)}")
+        return format_map(values)
+    return render
+
+
+@lru_cache(maxsize=None)
+def stylesheet(kind):
+    """문서 종류별 최소화된 CSS"""
+    css = re.sub(r'\s+', ' ', STYLESHEETS[kind]).strip()
+    return re.sub(r'\s*([{};:,])\s*', r'\1', css).replace(';}', '}')
+
+
+@lru_cache(maxsize=None)
+def document_shell(kind, stylesheet_href=None):
+    """문서 골격의 (제목 앞, 제목~본문 사이, 본문 뒤) 조각 - CSS 인라인 또는 공유 스타일시트 링크"""
+    if stylesheet_href:
+        style = f'<link rel="stylesheet" href="{stylesheet_href}">'
+    else:
+        style = f"<style>{stylesheet(kind)}</style>"
+    return (
+        '<!DOCTYPE html>\n<html lang="ja">\n<head>\n<meta charset="UTF-8">\n<title>',
+        f"</title>\n{style}\n</head>\n<body>\n",
+        "\n</body>\n</html>\n"
+    )
+
+
+def render_document(kind, title, body, stylesheet_href=None):
+    """골격 + 동적 본문 조립"""
+    head, middle, tail = document_shell(kind, stylesheet_href)
+    return "".join((head, title, middle, body, tail))
+
+
+@lru_cache(maxsize=1)
+def _issued_at(minute):
+    return datetime.fromtimestamp(minute * 60).strftime('%Y年%m月%d日 %H:%M / %Y/%m/%d %H:%M')
+
+
+def issued_timestamp():
+    """발행 일시 문자열 - 분 단위로 같으므로 일괄 발행 중에는 분마다 한 번만 포맷"""
+    return _issued_at(int(time.time() // 60))
@@ -0,0 +1,84 @@
+# employee_directory.py
+import csv
+import os
+from functools import lru_cache
+
+# 직원 디렉터리 - 로그인 ID/사원번호/부서 인덱스, 파일을 프로세스당 한 번만 읽고 조회는 dict O(1)
+
+EMPLOYEE_FILE = os.environ.get(
+    'BANK_EMPLOYEE_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'employees.csv')
+)
+EMPLOYEE_FIELDS = ('login_id', 'emp_num', 'name', 'department', 'account')
+# 권한 (선택 컬럼, 비어 있으면 staff) - admin만 은행 전체 작업(금리 개정 등) 실행 가능
+EMPLOYEE_ROLES = ('staff', 'admin')
+DEFAULT_ROLE = 'staff'
+
+
+def normalize_login_id(login_id):
+    """로그인 ID 비교용 정규화 (앞뒤 공백 제거, 대소문자 무시)"""
+    return (login_id or '').strip().casefold()
+
+
+def _build_directory(rows):
+    """직원 행에서 인덱스 생성 - 로그인 ID/사원번호 중복은 오류"""
+    by_login, by_emp_num, by_department = {}, {}, {}
+    for line, row in enumerate(rows, start=2):
+        missing = [field for field in EMPLOYEE_FIELDS if not (row.get(field) or '').strip()]
+        if missing:
+            raise ValueError(f"employee file line {line}: missing {', '.join(missing)}")
+        employee = {field: row[field].strip() for field in EMPLOYEE_FIELDS}
+        employee['role'] = (row.get('role') or '').strip() or DEFAULT_ROLE
+        if employee['role'] not in EMPLOYEE_ROLES:
+            raise ValueError(f"employee file line {line}: unknown role {employee['role']}")
+        login = normalize_login_id(employee['login_id'])
+        if login in by_login:
+            raise ValueError(f"employee file line {line}: duplicate login_id {employee['login_id']}")
+        if employee['emp_num'] in by_emp_num:
+            raise ValueError(f"employee file line {line}: duplicate emp_num {employee['emp_num']}")
+        by_login[login] = employee
+        by_emp_num[employee['emp_num']] = employee
+        by_department.setdefault(employee['department'], []).append(employee['emp_num'])
+    return {
+        'by_login': by_login,
+        'by_emp_num': by_emp_num,
+        'by_department': {department: tuple(members) for department, members in by_department.items()}
+    }
+
+
+@lru_cache(maxsize=1)
+def _load_directory(path, mtime):
+    with open(path, encoding='utf-8', newline='') as f:
+        return _build_directory(csv.DictReader(f))
+
+
+def employee_directory(path=None):
+    """직원 디렉터리 인덱스 - 파일이 바뀌었을 때만 다시 읽음"""
+    path = path or EMPLOYEE_FILE
+    return _load_directory(path, os.stat(path).st_mtime_ns)
+
+
+def employee_by_login(login_id, path=None):
+    """로그인 ID로 직원 조회 (없으면 None) - 세션에 넣을 수 있도록 사본 반환"""
+    employee = employee_directory(path)['by_login'].get(normalize_login_id(login_id))
+    return None if employee is None else dict(employee)
+
+
+def employee_by_number(emp_num, path=None):
+    """사원번호로 직원 조회 (없으면 None)"""
+    employee = employee_directory(path)['by_emp_num'].get(str(emp_num).strip())
+    return None if employee is None else dict(employee)
+
+
+def is_admin(employee):
+    """은행 전체 작업 권한 여부"""
+    return bool(employee) and employee.get('role') == 'admin'
+
+
+def department_members(department, path=None):
+    """부서 소속 사원번호 (파일 순서)"""
+    return employee_directory(path)['by_department'].get(department, ())
+
+
+def departments(path=None):
+    """부서 목록 (이름순)"""
+    return sorted(employee_directory(path)['by_department'])
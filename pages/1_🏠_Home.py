@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 
 # common에서 필요한 함수들만 import
 from common import get_text, show_security_warnings, show_announcement, main_layout
+from savings_engine import evaluate_as_of, get_schedule
+from bank_storage import plan_summaries
 
 # 페이지 설정
 st.set_page_config(
@@ -65,11 +67,15 @@ def main():
     
     total_savings = 0
     monthly_payment = 0
-    active_plans = len(st.session_state.savings_list)
-    
-    for savings in st.session_state.savings_list:
-        calc = savings['calculation']
-        total_savings += calc['final_balance']
+    paid_to_date = 0
+    # 집계에 필요한 컬럼만 저장소에서 로드
+    savings_list = plan_summaries(st.session_state.user_data['emp_num'], ('payment_date', 'paid_to_date', 'balance'))
+    active_plans = len(savings_list)
+    
+    for savings in savings_list:
+        schedule = get_schedule(savings)
+        total_savings += int(schedule['balance'][-1])
+        paid_to_date += evaluate_as_of(schedule)['total_paid']
         monthly_payment += savings['monthly_amount']
     
     total_assets = total_savings + 12500000
@@ -109,7 +115,7 @@ def main():
         <div class="metric-card">
             <div style="font-size: 0.85rem; opacity: 0.8; margin-bottom: 1rem;">実行中プラン / Active Plans</div>
             <div style="font-size: 1.8rem; font-weight: 700; margin-bottom: 0.5rem; color: #1e40af;">{active_plans}</div>
-            <div style="font-size: 0.75rem; opacity: 0.6;">総プラン数</div>
+            <div style="font-size: 0.75rem; opacity: 0.6;">総プラン数 / 入金済 ¥{paid_to_date:,.0f}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -146,9 +152,9 @@ def main():
     
     with col2:
         st.markdown(f"### 🎯 {get_text('savings_distribution')}")
-        if st.session_state.savings_list:
-            labels = [savings['name'] for savings in st.session_state.savings_list]
-            values = [savings['monthly_amount'] * savings['period'] * 12 for savings in st.session_state.savings_list]
+        if savings_list:
+            labels = [savings['name'] for savings in savings_list]
+            values = [savings['monthly_amount'] * savings['period'] * 12 for savings in savings_list]
             chart_data = pd.DataFrame({
                 'カテゴリ': labels,
                 '金額': values
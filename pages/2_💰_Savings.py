@@ -1,10 +1,23 @@
 import streamlit as st
 import pandas as pd
-import base64
+import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta
-from common import get_text, show_security_warnings, show_announcement, main_layout
+from common import get_text, show_security_warnings, show_announcement, main_layout, lazy_download_button, record_store
+from savings_engine import (
+    COMPOUNDING_LABELS, describe_rule, evaluate_as_of, get_schedule, recalculate_savings_schedule, schedule_frame,
+    solve_interest_rate, solve_monthly_amount
+)
+from savings_cache import cached_savings_schedule
+from savings_documents import create_savings_certificate_html
+from document_downloads import savings_document_version
+from bank_calendar import DATE_CONVENTION_LABELS, calendar_covers, holiday_table_range
+from savings_scenarios import sweep_pivot, sweep_savings_grid
+from savings_projection import project_savings
+from repricing import reprice_stored_plans
+from bank_storage import PAGE_SIZE, rate_change_history
+from employee_directory import is_admin
+from record_store import invalidate_stores, store_add, store_count, store_delete, store_page, store_update, sync_store
 
 # 페이지 제목 설정
 st.set_page_config(
@@ -13,271 +26,6 @@ st.set_page_config(
     layout="wide"
 )
 
-# 적금 계산 함수들 - 오류 수정 버전
-def calculate_savings_schedule(monthly_amount, period_years, interest_rate, start_date, adjustments=None):
-    total_months = period_years * 12
-    monthly_interest_rate = interest_rate / 100 / 12
-    today = datetime.now().date()
-    
-    schedule = []
-    current_balance = 0
-    total_paid = 0
-    
-    for month in range(1, total_months + 1):
-        payment_date = start_date + relativedelta(months=month-1)
-        
-        actual_amount = monthly_amount
-        adjustment_note = ""
-        if adjustments and month in adjustments:
-            actual_amount = adjustments[month]
-            adjustment_note = f"調整済 / Adjusted: ¥{adjustments[month]:,}"
-        
-        monthly_interest = round(current_balance * monthly_interest_rate)
-        current_balance += actual_amount + monthly_interest
-        
-        # 상태 설정 로직 수정
-        if payment_date < today:
-            status = "✅ 入金完了 / Payment Completed"
-            total_paid += actual_amount
-        elif payment_date == today:
-            status = "⏳ 本日入金 / Payment Today"
-            total_paid += actual_amount
-        else:
-            status = "📅 入金予定 / Scheduled Payment"
-        
-        schedule.append({
-            'month': month,
-            'payment_date': payment_date,
-            'amount': actual_amount,
-            'interest': monthly_interest,
-            'balance': current_balance,
-            'status': status,
-            'notes': adjustment_note
-        })
-    
-    total_payment = monthly_amount * total_months
-    total_interest = current_balance - total_payment
-    
-    return {
-        'schedule': schedule,
-        'total_months': total_months,
-        'total_payment': total_payment,
-        'total_interest': total_interest,
-        'final_balance': current_balance,
-        'total_paid': total_paid,
-        'remaining_months': len([x for x in schedule if x['payment_date'] > today]),
-        'completion_rate': (len([x for x in schedule if x['payment_date'] <= today]) / total_months) * 100
-    }
-
-def create_savings_certificate_html(savings_data, user_data):
-    """더 전문적인 적금 증명서 생성"""
-    
-    # 차트 데이터 준비
-    schedule = savings_data['calculation']['schedule']
-    months = [f"{item['month']}回" for item in schedule]
-    balances = [item['balance'] for item in schedule]
-    payments = [item['amount'] for item in schedule]
-    
-    # 진행 상황 계산
-    today = datetime.now().date()
-    completed = len([x for x in schedule if x['payment_date'] <= today])
-    total = len(schedule)
-    progress_percent = (completed / total) * 100
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="ja">
-    <head>
-        <meta charset="UTF-8">
-        <title>積立証明書 - {savings_data['name']}</title>
-        <style>
-            body {{ 
-                font-family: 'Hiragino Sans', 'Noto Sans JP', sans-serif; 
-                margin: 0; 
-                padding: 0; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            }}
-            .certificate-container {{ 
-                max-width: 1000px; 
-                margin: 20px auto; 
-                background: white; 
-                padding: 40px; 
-                box-shadow: 0 20px 60px rgba(0,0,0,0.3); 
-                border-radius: 20px; 
-                border: 15px double #2c5282;
-                position: relative;
-            }}
-            .watermark {{
-                position: absolute;
-                top: 50%;
-                left: 50%;
-                transform: translate(-50%, -50%) rotate(-45deg);
-                font-size: 120px;
-                color: rgba(30, 58, 138, 0.1);
-                font-weight: bold;
-                z-index: 0;
-            }}
-            .header {{ 
-                text-align: center; 
-                border-bottom: 3px solid #2c5282; 
-                padding-bottom: 25px; 
-                margin-bottom: 30px;
-                position: relative;
-                z-index: 1;
-            }}
-            .certificate-title {{ 
-                font-size: 32px; 
-                font-weight: bold; 
-                color: #2c5282; 
-                margin-bottom: 10px;
-                text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-            }}
-            .info-grid {{ 
-                display: grid; 
-                grid-template-columns: 1fr 1fr; 
-                gap: 25px; 
-                margin-bottom: 30px;
-                position: relative;
-                z-index: 1;
-            }}
-            .info-card {{ 
-                background: linear-gradient(135deg, #f8fafc, #f1f5f9);
-                padding: 25px; 
-                border-radius: 15px; 
-                border-left: 5px solid #2c5282;
-                box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            }}
-            .calculation-section {{ 
-                background: linear-gradient(135deg, #dbeafe, #e0f2fe);
-                padding: 30px; 
-                border-radius: 15px; 
-                margin: 30px 0; 
-                border: 2px solid #3b82f6;
-                position: relative;
-                z-index: 1;
-            }}
-            .progress-section {{
-                background: linear-gradient(135deg, #f0fdf4, #dcfce7);
-                padding: 25px;
-                border-radius: 15px;
-                margin: 25px 0;
-                border: 2px solid #22c55e;
-                position: relative;
-                z-index: 1;
-            }}
-            .progress-bar {{
-                width: 100%;
-                height: 20px;
-                background: #e2e8f0;
-                border-radius: 10px;
-                overflow: hidden;
-                margin: 15px 0;
-            }}
-            .progress-fill {{
-                height: 100%;
-                background: linear-gradient(90deg, #10b981, #22c55e);
-                width: {progress_percent}%;
-                transition: width 1s ease;
-            }}
-            .footer {{ 
-                text-align: center; 
-                margin-top: 40px; 
-                padding-top: 20px; 
-                border-top: 2px solid #e2e8f0; 
-                color: #666; 
-                font-size: 14px;
-                position: relative;
-                z-index: 1;
-            }}
-            .value {{
-                font-size: 18px;
-                font-weight: bold;
-                color: #1e40af;
-            }}
-            .highlight {{
-                background: linear-gradient(135deg, #fef3c7, #fde68a);
-                padding: 5px 10px;
-                border-radius: 5px;
-                font-weight: bold;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="certificate-container">
-            <div class="watermark">OTS UKA BANK</div>
-            
-            <div class="header">
-                <div class="certificate-title">積立貯蓄証明書</div>
-                <div style="color: #666; font-size: 18px; margin-bottom: 10px;">Savings Certificate</div>
-                <div style="color: #94a3b8; font-size: 14px;">Certificate of Savings Plan</div>
-            </div>
-            
-            <div class="info-grid">
-                <div class="info-card">
-                    <h3 style="color: #374151; border-bottom: 2px solid #e2e8f0; padding-bottom: 10px;">基本情報 / Basic Information</h3>
-                    <div style="margin: 15px 0;"><strong>積立名:</strong> <span class="value">{savings_data['name']}</span></div>
-                    <div style="margin: 15px 0;"><strong>顧客名:</strong> <span class="value">{user_data['name']}</span></div>
-                    <div style="margin: 15px 0;"><strong>社員番号:</strong> <span class="highlight">{user_data['emp_num']}</span></div>
-                </div>
-                
-                <div class="info-card">
-                    <h3 style="color: #374151; border-bottom: 2px solid #e2e8f0; padding-bottom: 10px;">積立詳細 / Savings Details</h3>
-                    <div style="margin: 15px 0;"><strong>開始日:</strong> <span class="value">{savings_data['start_date']}</span></div>
-                    <div style="margin: 15px 0;"><strong>積立期間:</strong> <span class="value">{savings_data['period']}年 / years</span></div>
-                    <div style="margin: 15px 0;"><strong>月間積立額:</strong> <span class="value">¥{savings_data['monthly_amount']:,.0f}</span></div>
-                    <div style="margin: 15px 0;"><strong>年利率:</strong> <span class="value">{savings_data['interest_rate']}%</span></div>
-                </div>
-            </div>
-            
-            <div class="progress-section">
-                <h3 style="color: #166534; margin-bottom: 20px;">📊 積立進捗状況 / Savings Progress</h3>
-                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin-bottom: 20px;">
-                    <div>
-                        <div>完了回数 / Completed: <span class="value">{completed}回</span></div>
-                        <div>残り回数 / Remaining: <span class="value">{total - completed}回</span></div>
-                    </div>
-                    <div>
-                        <div>総回数 / Total: <span class="value">{total}回</span></div>
-                        <div>進捗率 / Progress: <span class="value">{progress_percent:.1f}%</span></div>
-                    </div>
-                </div>
-                <div class="progress-bar">
-                    <div class="progress-fill"></div>
-                </div>
-            </div>
-            
-            <div class="calculation-section">
-                <h3 style="color: #1e40af; margin-bottom: 25px;">💰 計算結果 / Calculation Results</h3>
-                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 20px;">
-                    <div style="text-align: center; padding: 15px; background: white; border-radius: 10px; box-shadow: 0 3px 10px rgba(0,0,0,0.1);">
-                        <div style="font-size: 14px; color: #64748b;">総支払額 / Total Payment</div>
-                        <div style="font-size: 24px; font-weight: bold; color: #1e40af;">¥{savings_data['calculation']['total_payment']:,.0f}</div>
-                    </div>
-                    <div style="text-align: center; padding: 15px; background: white; border-radius: 10px; box-shadow: 0 3px 10px rgba(0,0,0,0.1);">
-                        <div style="font-size: 14px; color: #64748b;">総利息 / Total Interest</div>
-                        <div style="font-size: 24px; font-weight: bold; color: #10b981;">¥{savings_data['calculation']['total_interest']:,.0f}</div>
-                    </div>
-                    <div style="text-align: center; padding: 15px; background: white; border-radius: 10px; box-shadow: 0 3px 10px rgba(0,0,0,0.1);">
-                        <div style="font-size: 14px; color: #64748b;">現在までの支払額 / Paid to Date</div>
-                        <div style="font-size: 24px; font-weight: bold; color: #f59e0b;">¥{savings_data['calculation']['total_paid']:,.0f}</div>
-                    </div>
-                    <div style="text-align: center; padding: 15px; background: white; border-radius: 10px; box-shadow: 0 3px 10px rgba(0,0,0,0.1);">
-                        <div style="font-size: 14px; color: #64748b;">最終残高 / Final Balance</div>
-                        <div style="font-size: 24px; font-weight: bold; color: #ef4444;">¥{savings_data['calculation']['final_balance']:,.0f}</div>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="footer">
-                <div style="margin-bottom: 10px;">発行日時 / Issued: {datetime.now().strftime('%Y年%m月%d日 %H:%M / %Y/%m/%d %H:%M')}</div>
-                <div style="font-size: 12px; color: #94a3b8;">大塚銀行 / Otsuka Bank - 従業員バンキングポータル / Employee Banking Portal</div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return html_content
-
 def main():
     main_layout()
     show_security_warnings()
@@ -285,7 +33,7 @@ def main():
     
     st.markdown(f"## 💰 {get_text('savings_management')}")
     
-    tab1, tab2 = st.tabs(["🆕 新規積立作成 / New Savings Creation", "📋 積立一覧 / Savings List"])
+    tab1, tab2, tab3 = st.tabs(["🆕 新規積立作成 / New Savings Creation", "📋 積立一覧 / Savings List", "🔍 シナリオ比較 / Scenario Sweep"])
     
     with tab1:
         st.markdown('<div class="content-card">', unsafe_allow_html=True)
@@ -304,6 +52,24 @@ def main():
             period = st.selectbox(get_text('savings_period'), [3, 5], index=0, format_func=lambda x: f"{x}年 / {x} years")
             interest_rate = st.number_input(get_text('interest_rate'), min_value=0.1, value=2.5, step=0.1, format="%.1f")
             start_date = st.date_input(get_text('start_date'), date(2025, 1, 1))
+            rounding_options = {
+                None: "標準 / Standard",
+                'half_up': "整数計算・四捨五入 / Fixed-point, half up",
+                'floor': "整数計算・切り捨て / Fixed-point, floor",
+                'bankers': "整数計算・銀行丸め / Fixed-point, banker's"
+            }
+            rounding = st.selectbox("利息端数処理 / Interest Rounding", list(rounding_options), format_func=rounding_options.get)
+            compounding = st.selectbox("利息計算方式 / Compounding", list(COMPOUNDING_LABELS), format_func=COMPOUNDING_LABELS.get)
+            date_convention = st.selectbox("休日の入金日 / Holiday Payment Dates", list(DATE_CONVENTION_LABELS), format_func=DATE_CONVENTION_LABELS.get)
+        
+        # 휴업일 테이블 밖의 입금일은 영업일 조정을 할 수 없으므로 계산 전에 막음
+        calendar_ok = calendar_covers(start_date, period * 12, date_convention)
+        if not calendar_ok:
+            first_day, last_day = holiday_table_range()
+            st.error(
+                f"入金日が休日カレンダーの対象期間 ({first_day} 〜 {last_day}) 外です。開始日または休日の扱いを変更してください / "
+                f"Payment dates fall outside the bank holiday calendar ({first_day} – {last_day}). Change the start date or the holiday setting."
+            )
         
         if 'adjustments' not in st.session_state:
             st.session_state.adjustments = []
@@ -334,19 +100,116 @@ def main():
                         st.session_state.adjustments.pop(i)
                         st.rerun()
         
-        if st.button(f"🚀 {get_text('create_savings_plan')}", use_container_width=True, type="primary"):
+        # 반복 조정 규칙 (보너스 월 증액, 일시 정지 등)
+        if 'adjustment_rules' not in st.session_state:
+            st.session_state.adjustment_rules = []
+        
+        st.markdown("#### 🔁 繰り返し調整 / Recurring Adjustments")
+        rule_kinds = {
+            'month_of_year': "毎年指定月 / Months of year",
+            'every_n': "Nヶ月ごと / Every N months",
+            'range': "期間指定 / Month range"
+        }
+        col1, col2, col3 = st.columns([2, 3, 2])
+        with col1:
+            rule_kind = st.selectbox("種類 / Type", list(rule_kinds), format_func=rule_kinds.get, key="rule_kind")
+        with col2:
+            if rule_kind == 'month_of_year':
+                rule_target = {'months': st.multiselect("対象月 / Months", list(range(1, 13)), default=[6, 12], key="rule_months")}
+            elif rule_kind == 'every_n':
+                rule_target = {
+                    'every': st.number_input("間隔 / Every (months)", min_value=1, max_value=period*12, value=3, key="rule_every"),
+                    'start': st.number_input("開始回 / From month", min_value=1, max_value=period*12, value=1, key="rule_start")
+                }
+            else:
+                rule_target = {
+                    'start': st.number_input("開始回 / From month", min_value=1, max_value=period*12, value=13, key="rule_range_start"),
+                    'end': st.number_input("終了回 / To month", min_value=1, max_value=period*12, value=18, key="rule_range_end")
+                }
+        with col3:
+            rule_action = st.radio("調整方法 / Action", ["amount", "percent"], format_func=lambda x: "金額 / Amount" if x == "amount" else "増減率 / Percent", key="rule_action", horizontal=True)
+            if rule_action == "amount":
+                rule_value = st.number_input(get_text('adjustment_amount'), min_value=0, value=0, key="rule_amount")
+            else:
+                rule_value = st.number_input("増減率 (%) / Change (%)", min_value=-100, value=100, key="rule_percent")
+        if st.button("➕ 規則追加 / Add Rule", use_container_width=True):
+            st.session_state.adjustment_rules.append({'kind': rule_kind, **rule_target, rule_action: rule_value})
+        
+        for i, rule in enumerate(st.session_state.adjustment_rules):
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.write(f"🔁 {describe_rule(rule)}")
+            with col2:
+                if st.button("🗑️ 削除 / Delete", key=f"remove_rule_{i}"):
+                    st.session_state.adjustment_rules.pop(i)
+                    st.rerun()
+        
+        # 목표 금액 역산 (현재 입력값과 조정 내역 기준)
+        with st.expander("🎯 目標額シミュレーション / Goal Seek", expanded=False):
+            col1, col2 = st.columns(2)
+            with col1:
+                target_balance = st.number_input("目標最終残高 / Target Final Balance (¥)", min_value=1000, value=200000, step=10000, key="goal_target")
+            with col2:
+                goal_mode = st.radio("求める項目 / Solve for", ['monthly_amount', 'interest_rate'], format_func=lambda x: get_text(x), key="goal_mode", horizontal=True)
+
+            if st.button("🧮 計算 / Solve", key="goal_solve", use_container_width=True, disabled=not calendar_ok):
+                goal_adjustments = {adj['month']: adj['amount'] for adj in st.session_state.adjustments}
+                if goal_mode == 'monthly_amount':
+                    result = solve_monthly_amount(target_balance, period, interest_rate, start_date, goal_adjustments, st.session_state.adjustment_rules, step=1000, rounding=rounding, compounding=compounding, date_convention=date_convention)
+                    if result:
+                        st.success(f"必要な月間積立額 / Required monthly amount: ¥{result['monthly_amount']:,} → {get_text('final_balance')}: ¥{result['final_balance']:,}")
+                else:
+                    result = solve_interest_rate(target_balance, monthly_amount, period, start_date, goal_adjustments, st.session_state.adjustment_rules, rate_step=0.1, rounding=rounding, compounding=compounding, date_convention=date_convention)
+                    if result:
+                        st.success(f"必要な年利率 / Required annual rate: {result['interest_rate']:.1f}% → {get_text('final_balance')}: ¥{result['final_balance']:,}")
+                if not result:
+                    st.warning("この条件では目標額に到達できません / The target cannot be reached with these settings")
+
+        with st.expander("🎲 変動金利シミュレーション / Floating-Rate Projection", expanded=False):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                n_paths = st.number_input("シナリオ数 / Paths", min_value=100, max_value=200000, value=10000, step=1000, key="mc_paths")
+                mc_seed = st.number_input("乱数シード / Seed", min_value=0, value=42, step=1, key="mc_seed")
+            with col2:
+                long_term_rate = st.number_input("長期平均金利 / Long-term Rate (%)", min_value=0.0, value=float(interest_rate), step=0.1, format="%.2f", key="mc_long_term")
+                reversion_speed = st.number_input("回帰速度 / Reversion Speed", min_value=0.0, value=0.5, step=0.1, key="mc_speed")
+            with col3:
+                volatility = st.number_input("ボラティリティ / Volatility (%)", min_value=0.0, value=0.5, step=0.1, key="mc_volatility")
+
+            if st.button("📈 シミュレーション実行 / Run Projection", key="mc_run", use_container_width=True, disabled=not calendar_ok):
+                mc_adjustments = {adj['month']: adj['amount'] for adj in st.session_state.adjustments}
+                projection = project_savings(
+                    monthly_amount, period, interest_rate, start_date, mc_adjustments, st.session_state.adjustment_rules,
+                    rounding, compounding, date_convention, n_paths=int(n_paths), long_term_rate=long_term_rate,
+                    reversion_speed=reversion_speed, volatility=volatility, seed=int(mc_seed)
+                )
+                percentile_table = projection['percentiles'].T.rename(
+                    index={'final_balance': get_text('final_balance'), 'total_interest': get_text('total_interest')}
+                )
+                percentile_table.columns = [f"P{p}" for p in percentile_table.columns]
+                st.dataframe(percentile_table.style.format("¥{:,}"), use_container_width=True)
+                st.caption(f"平均 / Mean: ¥{projection['mean_final_balance']:,.0f} ({projection['n_paths']:,} paths)")
+                fig = go.Figure(go.Histogram(x=projection['final_balance'], nbinsx=60))
+                fig.update_layout(xaxis_title=get_text('final_balance'), yaxis_title="パス数 / Paths", height=350)
+                st.plotly_chart(fig, use_container_width=True)
+
+        if st.button(f"🚀 {get_text('create_savings_plan')}", use_container_width=True, type="primary", disabled=not calendar_ok):
             adjustments_dict = {adj['month']: adj['amount'] for adj in st.session_state.adjustments}
+            rules = list(st.session_state.adjustment_rules)
             
-            calculation = calculate_savings_schedule(
+            calculation = cached_savings_schedule(
                 monthly_amount, 
                 period, 
                 interest_rate, 
                 start_date, 
-                adjustments_dict
+                adjustments_dict,
+                rules,
+                rounding,
+                compounding,
+                date_convention
             )
             
             new_savings = {
-                'id': len(st.session_state.savings_list) + 1,
                 'name': savings_name,
                 'customer_name': customer_name,
                 'employee_number': employee_number,
@@ -356,22 +219,68 @@ def main():
                 'interest_rate': interest_rate,
                 'start_date': start_date.strftime('%Y/%m/%d'),
                 'adjustments': adjustments_dict,
+                'rules': rules,
+                'rounding': rounding,
+                'compounding': compounding,
+                'date_convention': date_convention,
                 'calculation': calculation,
                 'created_at': datetime.now().strftime('%Y/%m/%d %H:%M')
             }
             
-            st.session_state.savings_list.append(new_savings)
+            store_add(record_store('plans'), new_savings)
             st.session_state.adjustments = []
+            st.session_state.adjustment_rules = []
             st.success("🎉 積立プランが正常に作成されました！ / Savings plan created successfully!")
             st.balloons()
         
         st.markdown('</div>', unsafe_allow_html=True)
     
     with tab2:
-        if not st.session_state.savings_list:
+        # 화면에 보이는 페이지의 플랜만 저장소에서 로드
+        plans = record_store('plans')
+        plan_count = store_count(plans)
+        if not plan_count:
             st.info("登録されている積立プランがありません。 / No savings plans registered.")
         else:
-            for savings in st.session_state.savings_list:
+            # 금리 개정 일괄 적용 - 적용일 이후 회차만 재계산, 은행 전체 작업이라 관리자만 실행
+            if is_admin(st.session_state.user_data):
+                with st.expander("🏦 金利改定 / Rate Change", expanded=False):
+                    col1, col2, col3 = st.columns([2, 2, 1])
+                    with col1:
+                        new_rate = st.number_input("新年利率 / New Rate (%)", min_value=0.0, value=2.5, step=0.1, format="%.1f", key="reprice_rate")
+                    with col2:
+                        effective_date = st.date_input("適用日 / Effective Date", datetime.now().date(), key="reprice_date")
+                    with col3:
+                        if st.button("🔄 適用 / Apply", key="reprice_apply", use_container_width=True):
+                            progress_bar = st.progress(0.0)
+                            # 모든 직원의 저장된 플랜이 대상 - 바뀐 플랜만 다시 쓰고 해당 직원의 세션 저장소를 무효화
+                            owners, report = reprice_stored_plans(
+                                new_rate, effective_date, st.session_state.user_data['emp_num'],
+                                progress=lambda done, total: progress_bar.progress(done / total)
+                            )
+                            invalidate_stores('plans', owners)
+                            sync_store(plans)
+                            st.success(
+                                f"{report['repriced']:,}件更新 / Repriced {report['repriced']:,} of {report['plans']:,} plans "
+                                f"({report['plans_per_second']:,.0f} plans/s, {report['seconds']:.2f}s)"
+                            )
+                            if report['conflicts']:
+                                st.warning(f"{report['conflicts']:,}件は実行中に変更されたため未適用 / {report['conflicts']:,} plans changed during the run and were left as is")
+                    for entry in rate_change_history(limit=1):
+                        st.caption(
+                            f"前回 / Last run: {entry['finished_at']} {entry['actor']} → {entry['interest_rate']}% "
+                            f"({entry['effective_date']}〜, {entry['repriced']:,}件 / plans)"
+                        )
+
+            compress_downloads = st.checkbox("📦 gzip圧縮でダウンロード / Download gzip-compressed", key="savings_gzip_downloads")
+
+            page = 1
+            if plan_count > PAGE_SIZE:
+                page = st.number_input(
+                    f"ページ / Page (全{plan_count:,}件 / {plan_count:,} plans)", min_value=1,
+                    max_value=(plan_count - 1) // PAGE_SIZE + 1, value=1, key="savings_page"
+                )
+            for savings in store_page(plans, (page - 1) * PAGE_SIZE, PAGE_SIZE):
                 with st.expander(f"📒 {savings['name']} - {savings['account_number']}", expanded=False):
                     st.markdown('<div class="content-card">', unsafe_allow_html=True)
                     
@@ -390,6 +299,8 @@ def main():
                     with col4:
                         st.markdown("**開始日 / Start Date**")
                         st.write(savings['start_date'])
+                        if savings.get('date_convention'):
+                            st.caption(DATE_CONVENTION_LABELS[savings['date_convention']])
                     
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
@@ -401,8 +312,12 @@ def main():
                     with col3:
                         st.markdown("**年利率 / Interest Rate**")
                         st.write(f"{savings['interest_rate']}%")
+                        st.caption(COMPOUNDING_LABELS[savings.get('compounding', 'monthly')])
+                        for change in savings.get('rate_changes') or []:
+                            st.caption(f"→ {change['interest_rate']}% ({change['effective_date']}〜)")
                     with col4:
-                        completion = savings['calculation']['completion_rate']
+                        progress = evaluate_as_of(get_schedule(savings))
+                        completion = progress['completion_rate']
                         st.markdown(f"**{get_text('progress_rate')}**")
                         st.progress(completion/100)
                         st.write(f"{completion:.1f}%")
@@ -417,51 +332,135 @@ def main():
                     with col2:
                         st.metric(get_text('total_interest'), f"¥{calc['total_interest']:,.0f}")
                     with col3:
-                        st.metric("現在までの支払額 / Paid to Date", f"¥{calc['total_paid']:,.0f}")
+                        st.metric("現在までの支払額 / Paid to Date", f"¥{progress['total_paid']:,.0f}")
                     with col4:
                         st.metric(get_text('final_balance'), f"¥{calc['final_balance']:,.0f}")
                     
                     # 진행 상황 시각화
                     col1, col2 = st.columns(2)
                     with col1:
-                        st.metric("完了回数 / Completed", f"{calc['total_months'] - calc['remaining_months']}回")
+                        st.metric("完了回数 / Completed", f"{progress['completed_months']}回")
                     with col2:
-                        st.metric("残り回数 / Remaining", f"{calc['remaining_months']}回")
+                        st.metric("残り回数 / Remaining", f"{progress['remaining_months']}回")
                     
-                    # 적금 증명서 다운로드
-                    html_content = create_savings_certificate_html(savings, st.session_state.user_data)
-                    b64 = base64.b64encode(html_content.encode()).decode()
-                    href = f'<a href="data:text/html;base64,{b64}" download="積立証明書_{savings["name"]}.html">'
-                    st.markdown(
-                        f'{href}'
-                        f'<button style="background: linear-gradient(135deg, #10b981, #059669); color: white; border: none; padding: 0.8rem 1.5rem; border-radius: 10px; font-weight: 600; cursor: pointer; margin: 1rem 0; width: 100%;">'
-                        f'📥 {get_text("download_certificate")}'
-                        f'</button>'
-                        f'</a>',
-                        unsafe_allow_html=True
+                    # 적금 증명서 다운로드 - 준비 버튼을 누른 플랜만 생성 (플랜 버전별 캐시)
+                    user_data = st.session_state.user_data
+                    lazy_download_button(
+                        f"certificate_{savings['id']}",
+                        savings_document_version(savings, user_data),
+                        lambda: create_savings_certificate_html(savings, user_data),
+                        f"積立証明書_{savings['name']}.html",
+                        get_text("download_certificate"),
+                        compress_downloads
                     )
                     
                     st.markdown(f"#### {get_text('payment_schedule')} (最初の12回 / First 12 months)")
-                    schedule_data = []
-                    for item in savings['calculation']['schedule'][:12]:
-                        schedule_data.append({
-                            '回 / No.': item['month'],
-                            '入金日 / Payment Date': item['payment_date'].strftime('%Y/%m/%d'),
-                            '入金額 / Amount': f"¥{item['amount']:,}",
-                            '利息 / Interest': f"¥{item['interest']:,}",
-                            '残高 / Balance': f"¥{item['balance']:,}",
-                            '状態 / Status': item['status'],
-                            '備考 / Notes': item['notes']
-                        })
-                    
-                    schedule_df = pd.DataFrame(schedule_data)
+                    frame = schedule_frame(get_schedule(savings), stop=12)
+                    schedule_df = pd.DataFrame({
+                        '回 / No.': frame['month'],
+                        '入金日 / Payment Date': frame['payment_date'].dt.strftime('%Y/%m/%d'),
+                        '入金額 / Amount': frame['amount'].map('¥{:,}'.format),
+                        '利息 / Interest': frame['interest'].map('¥{:,}'.format),
+                        '残高 / Balance': frame['balance'].map('¥{:,}'.format),
+                        '状態 / Status': frame['status'],
+                        '備考 / Notes': frame['notes']
+                    })
                     st.dataframe(schedule_df, use_container_width=True, hide_index=True)
-                    
+
+                    # 기존 플랜의 입금 조정 - 변경된 회차 이후만 재계산
+                    st.markdown(f"#### ⚙️ {get_text('payment_adjustment')}")
+                    col1, col2, col3 = st.columns([2, 2, 1])
+                    with col1:
+                        edit_month = st.number_input(get_text('adjustment_month'), min_value=1, max_value=calc['total_months'], value=1, key=f"edit_month_{savings['id']}")
+                    with col2:
+                        edit_amount = st.number_input(get_text('adjustment_amount'), min_value=0, value=int(savings['monthly_amount']), key=f"edit_amount_{savings['id']}")
+                    with col3:
+                        if st.button("💾 保存 / Save", key=f"save_adj_{savings['id']}", use_container_width=True):
+                            adjustments = {**savings['adjustments'], edit_month: edit_amount}
+                            savings['calculation'] = recalculate_savings_schedule(savings, adjustments)
+                            savings['adjustments'] = adjustments
+                            store_update(plans, [savings])
+                            st.rerun()
+
+                    for rule in savings.get('rules') or []:
+                        st.write(f"🔁 {describe_rule(rule)}")
+
+                    for month, amount in sorted(savings['adjustments'].items()):
+                        col1, col2 = st.columns([4, 1])
+                        with col1:
+                            st.write(f"📅 {month}回目 / Month {month}: ¥{amount:,}")
+                        with col2:
+                            if st.button("🗑️ 削除 / Delete", key=f"remove_adj_{savings['id']}_{month}"):
+                                adjustments = {m: a for m, a in savings['adjustments'].items() if m != month}
+                                savings['calculation'] = recalculate_savings_schedule(savings, adjustments)
+                                savings['adjustments'] = adjustments
+                                store_update(plans, [savings])
+                                st.rerun()
+
                     if st.button(f"🗑️ 削除 / Delete", key=f"delete_{savings['id']}"):
-                        st.session_state.savings_list = [s for s in st.session_state.savings_list if s['id'] != savings['id']]
+                        store_delete(plans, savings['id'])
                         st.rerun()
                     
                     st.markdown('</div>', unsafe_allow_html=True)
 
+    with tab3:
+        st.markdown('<div class="content-card">', unsafe_allow_html=True)
+        st.markdown("### 🔍 シナリオ比較 / Scenario Sweep")
+        st.info("月間積立額・期間・年利率の組み合わせを一括で比較します / Compare every combination of amount, period and rate at once")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            amount_min = st.number_input("最小積立額 / Min Amount (¥)", min_value=1000, value=1000, step=1000, key="sweep_amount_min")
+            amount_max = st.number_input("最大積立額 / Max Amount (¥)", min_value=1000, value=50000, step=1000, key="sweep_amount_max")
+            amount_step = st.number_input("積立額刻み / Amount Step (¥)", min_value=100, value=1000, step=100, key="sweep_amount_step")
+        with col2:
+            rate_min = st.number_input("最小年利率 / Min Rate (%)", min_value=0.1, value=0.5, step=0.1, format="%.1f", key="sweep_rate_min")
+            rate_max = st.number_input("最大年利率 / Max Rate (%)", min_value=0.1, value=5.0, step=0.1, format="%.1f", key="sweep_rate_max")
+            rate_step = st.number_input("年利率刻み / Rate Step (%)", min_value=0.1, value=0.1, step=0.1, format="%.1f", key="sweep_rate_step")
+        with col3:
+            sweep_periods = st.multiselect(get_text('savings_period'), [3, 5], default=[3, 5], format_func=lambda x: f"{x}年 / {x} years", key="sweep_periods")
+            sweep_start = st.date_input(get_text('start_date'), date(2025, 1, 1), key="sweep_start")
+            sweep_metric = st.radio("表示項目 / Metric", ['final_balance', 'total_interest'], format_func=lambda x: get_text(x), key="sweep_metric", horizontal=True)
+        
+        amounts = np.arange(amount_min, amount_max + 1, amount_step)
+        rates = np.round(np.arange(rate_min, rate_max + rate_step / 2, rate_step), 1)
+        st.caption(f"計算点数 / Grid points: {len(amounts) * len(rates) * len(sweep_periods):,}")
+        
+        # 버튼을 눌렀을 때만 계산하고 입력값별로 결과를 보관 (다른 탭 조작/표시 항목 변경 시 재계산하지 않음)
+        sweep_inputs = (tuple(amounts.tolist()), tuple(sorted(sweep_periods)), tuple(rates.tolist()), sweep_start)
+        if st.button("🔍 比較実行 / Run Sweep", key="sweep_run", use_container_width=True,
+                     disabled=not (sweep_periods and len(amounts) and len(rates))):
+            st.session_state.sweep_result = {
+                'inputs': sweep_inputs,
+                'sweep': sweep_savings_grid(amounts, sweep_periods, rates, sweep_start)
+            }
+        sweep_result = st.session_state.get('sweep_result')
+        if sweep_result and sweep_result['inputs'] != sweep_inputs:
+            st.info("条件が変更されました。再実行してください / Inputs changed - run the sweep again")
+        elif sweep_result:
+            sweep = sweep_result['sweep']
+            for sweep_period in sweep_result['inputs'][1]:
+                pivot = sweep_pivot(sweep, sweep_period, sweep_metric)
+                fig = go.Figure(go.Heatmap(
+                    z=pivot.values,
+                    x=pivot.columns,
+                    y=pivot.index,
+                    colorscale='Blues',
+                    hovertemplate="¥%{x:,}/月, %{y}%: ¥%{z:,}<extra></extra>"
+                ))
+                fig.update_layout(
+                    title=f"{sweep_period}年 / {sweep_period} years - {get_text(sweep_metric)}",
+                    xaxis_title=get_text('monthly_amount'),
+                    yaxis_title=get_text('interest_rate'),
+                    height=400
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            
+            # 전체 표는 요청했을 때만 전송 (접힌 expander도 내용은 매번 전송됨)
+            if st.checkbox("📋 一覧表を表示 / Show table", key="sweep_show_table"):
+                st.dataframe(sweep, use_container_width=True, hide_index=True)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+# payroll_annual.py
+from payroll_engine import DEDUCTION_ITEMS, INCOME_ITEMS, PAYROLL_COLUMNS, RESULT_COLUMNS
+
+# 연간 급여 집계 - (직원, 연도)별 합계를 명세서 추가 시마다 누적 갱신
+
+ANNUAL_COLUMNS = (*PAYROLL_COLUMNS, *RESULT_COLUMNS)
+SOCIAL_INSURANCE_ITEMS = ('health_insurance', 'pension', 'employment_insurance')
+# 원장 동기화 시 한 번에 읽는 명세서 수
+SYNC_PAGE_SIZE = 500
+
+
+def payslip_key(payslip, default_employee=None):
+    """명세서의 (사원번호, 연도) - 사원번호가 없는 예전 명세서는 기본 사원으로 집계"""
+    return payslip.get('employee_number') or default_employee, int(payslip['date'][:4])
+
+
+def empty_ledger():
+    """집계 원장 - 처리한 명세서 수와 마지막 ID로 이력 변경을 감지"""
+    return {'processed': 0, 'last_id': None, 'totals': {}}
+
+
+def _empty_totals(employee_number, year, name=None):
+    return {
+        'employee_number': employee_number,
+        'name': name,
+        'year': year,
+        'months': 0,
+        'first_date': None,
+        'last_date': None,
+        **{column: 0 for column in ANNUAL_COLUMNS}
+    }
+
+
+def add_payslip(ledger, payslip, default_employee=None, default_name=None):
+    """명세서 1건을 해당 (직원, 연도) 합계에 반영"""
+    key = payslip_key(payslip, default_employee)
+    totals = ledger['totals'].get(key)
+    if totals is None:
+        totals = ledger['totals'][key] = _empty_totals(*key, payslip.get('name') or default_name)
+    salary_data = payslip['salary_data']
+    for column, item in salary_data['income_breakdown'].items():
+        totals[column] += item['amount']
+    for column, item in salary_data['deduction_breakdown'].items():
+        totals[column] += item['amount']
+    for column in RESULT_COLUMNS:
+        totals[column] += salary_data[column]
+    totals['months'] += 1
+    totals['first_date'] = min(filter(None, (totals['first_date'], payslip['date'])))
+    totals['last_date'] = max(filter(None, (totals['last_date'], payslip['date'])))
+    ledger['processed'] += 1
+    ledger['last_id'] = payslip.get('id')
+
+
+def sync_annual_ledger(ledger, payslip_count, load_page, default_employee=None, default_name=None):
+    """명세서 저장소와 원장 동기화 - load_page(offset, limit)로 새로 추가된 명세서만 읽어 반영, 기존 이력이 바뀌었으면 다시 집계"""
+    processed = ledger['processed']
+    if processed > payslip_count or (processed and load_page(processed - 1, 1)[0].get('id') != ledger['last_id']):
+        ledger.update(empty_ledger())
+        processed = 0
+    for offset in range(processed, payslip_count, SYNC_PAGE_SIZE):
+        for payslip in load_page(offset, SYNC_PAGE_SIZE):
+            add_payslip(ledger, payslip, default_employee, default_name)
+    return ledger
+
+
+def annual_years(ledger):
+    """집계된 연도 목록 (최신순)"""
+    return sorted({year for _, year in ledger['totals']}, reverse=True)
+
+
+def annual_summaries(ledger, year):
+    """해당 연도의 직원별 합계 목록 (사원번호순)"""
+    return [totals for (_, total_year), totals in sorted(ledger['totals'].items()) if total_year == year]
+
+
+def withholding_slip(totals):
+    """원천징수표 형식 요약 - 지급 금액, 사회보험료 등, 원천징수세액"""
+    return {
+        'employee_number': totals['employee_number'],
+        'name': totals['name'],
+        'year': totals['year'],
+        'months': totals['months'],
+        'payment_amount': totals['total_income'],
+        'income_items': {column: (*INCOME_ITEMS[column], totals[column]) for column in INCOME_ITEMS},
+        'social_insurance': sum(totals[column] for column in SOCIAL_INSURANCE_ITEMS),
+        'withholding_tax': totals['income_tax'],
+        'deduction_items': {column: (*DEDUCTION_ITEMS[column], totals[column]) for column in DEDUCTION_ITEMS},
+        'total_deductions': totals['total_deductions'],
+        'net_salary': totals['net_salary']
+    }
@@ -0,0 +1,159 @@
+# payroll_deductions.py
+import csv
+import json
+import os
+from decimal import Decimal
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from payroll_engine import MAX_PAYROLL_AMOUNT, parse_flags
+
+# 공제액 자동 계산 - 원천징수세액표(월액표 갑란)와 표준보수월액 등급표를 로컬 데이터 파일에서 읽어 구간 탐색
+# 원천징수 테이블 금액은 전산 계산 특례 공식으로 생성한 것이므로 공표 표와 같은 형식의 파일로 교체 가능
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+WITHHOLDING_FILE = os.path.join(DATA_DIR, 'withholding_tax_monthly.csv')
+REMUNERATION_FILE = os.path.join(DATA_DIR, 'standard_remuneration.csv')
+RATES_FILE = os.path.join(DATA_DIR, 'social_insurance_rates.json')
+
+# 요율은 0.001% 단위 정수로 보관 (4.955% -> 4955 / 100000)
+RATE_DENOMINATOR = 100000
+MAX_TABLE_DEPENDENTS = 7
+# 부양가족 7명 초과 시 1명당 감액
+EXTRA_DEPENDENT_REDUCTION = 1610
+DERIVED_DEDUCTIONS = ('income_tax', 'health_insurance', 'pension', 'employment_insurance')
+
+
+def _rate_units(percent):
+    return int(Decimal(percent) * (RATE_DENOMINATOR // 100))
+
+
+def _read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+@lru_cache(maxsize=1)
+def withholding_index():
+    """원천징수 구간 인덱스 - (정렬된 하한, 초과분 한계세율, 부양가족 수별 세액 행렬)"""
+    rows = sorted(_read_csv(WITHHOLDING_FILE), key=lambda row: int(row['lower']))
+    lowers = np.array([int(row['lower']) for row in rows], dtype=np.int64)
+    marginal = np.array([_rate_units(row['marginal_rate']) for row in rows], dtype=np.int64)
+    taxes = np.array(
+        [[int(row[f'dependents_{d}']) for d in range(MAX_TABLE_DEPENDENTS + 1)] for row in rows], dtype=np.int64
+    )
+    for array in (lowers, marginal, taxes):
+        array.flags.writeable = False
+    return lowers, marginal, taxes
+
+
+@lru_cache(maxsize=1)
+def remuneration_index():
+    """표준보수월액 등급 인덱스 - (정렬된 보수 하한, 건강보험 표준액, 연금 표준액, 건강보험 등급)"""
+    rows = sorted(_read_csv(REMUNERATION_FILE), key=lambda row: int(row['lower']))
+    columns = tuple(
+        np.array([int(row[key]) for row in rows], dtype=np.int64)
+        for key in ('lower', 'standard_amount', 'pension_standard', 'grade')
+    )
+    for array in columns:
+        array.flags.writeable = False
+    return columns
+
+
+@lru_cache(maxsize=1)
+def insurance_rates():
+    """본인 부담 보험료율 (0.001% 단위 정수)"""
+    with open(RATES_FILE, encoding='utf-8') as f:
+        return {key: _rate_units(value) for key, value in json.load(f).items()}
+
+
+def _bracket(lowers, values):
+    """하한 배열에서 값이 속하는 구간 번호 (이진 탐색)"""
+    return np.searchsorted(lowers, values, side='right') - 1
+
+
+def _scalar_or_array(like, result):
+    """스칼라 입력이면 int, 배열 입력이면 배열 반환"""
+    return int(result) if np.ndim(like) == 0 else result
+
+
+def _premium(base, rate_units):
+    """보험료 본인 부담분 - 급여 공제 시 50전 이하 버림, 50전 초과 올림"""
+    quotient, remainder = np.divmod(base * rate_units, RATE_DENOMINATOR)
+    return quotient + (2 * remainder > RATE_DENOMINATOR)
+
+
+def standard_remuneration(monthly_pay):
+    """보수월액 -> (건강보험 표준보수월액, 후생연금 표준보수월액, 등급)"""
+    lowers, health_standard, pension_standard, grades = remuneration_index()
+    pay = np.asarray(monthly_pay, dtype=np.int64)
+    index = _bracket(lowers, np.maximum(pay, 0))
+    return (
+        _scalar_or_array(monthly_pay, health_standard[index]),
+        _scalar_or_array(monthly_pay, pension_standard[index]),
+        _scalar_or_array(monthly_pay, grades[index])
+    )
+
+
+def social_insurance(monthly_pay, nursing_care=False):
+    """건강보험(40~64세는 개호보험 포함)/후생연금/고용보험 본인 부담분"""
+    rates = insurance_rates()
+    lowers, health_standard, pension_standard, _ = remuneration_index()
+    pay = np.maximum(np.asarray(monthly_pay, dtype=np.int64), 0)
+    index = _bracket(lowers, pay)
+    health_rate = rates['health_insurance'] + np.where(nursing_care, rates['care_insurance'], 0)
+    return {
+        'health_insurance': _scalar_or_array(monthly_pay, _premium(health_standard[index], health_rate)),
+        'pension': _scalar_or_array(monthly_pay, _premium(pension_standard[index], rates['pension'])),
+        # 고용보험은 표준보수가 아니라 실제 지급액 기준
+        'employment_insurance': _scalar_or_array(monthly_pay, _premium(pay, rates['employment_insurance']))
+    }
+
+
+def withholding_tax(taxable_pay, dependents=0):
+    """사회보험료 공제 후 급여와 부양가족 수로 원천징수 소득세 조회"""
+    lowers, marginal, taxes = withholding_index()
+    pay = np.maximum(np.asarray(taxable_pay, dtype=np.int64), 0)
+    dependents = np.maximum(np.asarray(dependents, dtype=np.int64), 0)
+    index = _bracket(lowers, pay)
+    tax = taxes[index, np.minimum(dependents, MAX_TABLE_DEPENDENTS)]
+    # 표 상한 초과 구간은 구간 하한 세액 + 초과분 x 한계세율
+    tax = tax + (pay - lowers[index]) * marginal[index] // RATE_DENOMINATOR
+    extra = np.maximum(dependents - MAX_TABLE_DEPENDENTS, 0) * EXTRA_DEPENDENT_REDUCTION
+    return _scalar_or_array(tax, np.maximum(tax - extra, 0))
+
+
+def derive_deductions(basic_salary, overtime_pay, dependents=0, nursing_care=False):
+    """기본급+잔업수당에서 소득세/건강보험/후생연금/고용보험 계산 (스칼라 또는 배열)"""
+    monthly_pay = np.asarray(basic_salary, dtype=np.int64) + np.asarray(overtime_pay, dtype=np.int64)
+    if np.ndim(basic_salary) == 0 and np.ndim(overtime_pay) == 0:
+        monthly_pay = int(monthly_pay)
+    insurance = social_insurance(monthly_pay, nursing_care)
+    taxable_pay = monthly_pay - insurance['health_insurance'] - insurance['pension'] - insurance['employment_insurance']
+    return {'income_tax': withholding_tax(taxable_pay, dependents), **insurance}
+
+
+def _amount_column(frame, column):
+    """공제 계산용 금액 열 - 잘못된 값은 0으로 두고 검증(validate_payroll)에서 보고"""
+    if column not in frame.columns:
+        return np.zeros(len(frame), dtype=np.int64)
+    values = pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=np.float64)
+    valid = np.isfinite(values) & (values >= 0) & (values <= MAX_PAYROLL_AMOUNT)
+    return np.where(valid, values, 0).astype(np.int64)
+
+
+def fill_payroll_deductions(frame, overwrite=False):
+    """급여 테이블에 자동 계산 공제 열을 채움 - 기존 열은 overwrite일 때만 교체 (dependents/nursing_care 열은 선택)"""
+    dependents = _amount_column(frame, 'dependents')
+    # 'False'/'0'/'no' 같은 문자열이 참이 되지 않도록 허용 표기만 해석 (그 외 값은 거짓으로 두고 validate_payroll에서 보고)
+    nursing_care = parse_flags(frame['nursing_care'])[0] if 'nursing_care' in frame.columns else False
+    derived = derive_deductions(
+        _amount_column(frame, 'basic_salary'), _amount_column(frame, 'overtime_pay'), dependents, nursing_care
+    )
+    result = frame.copy()
+    for column in DERIVED_DEDUCTIONS:
+        if overwrite or column not in result.columns:
+            result[column] = derived[column]
+    return result
@@ -0,0 +1,154 @@
+# payroll_documents.py
+from document_templates import compile_template, issued_timestamp, render_document
+from payroll_engine import DEDUCTION_ITEMS, INCOME_ITEMS
+
+# 급여 관련 문서 HTML 생성 - Streamlit 페이지와 일괄 발행 CLI에서 공용 (CSS/골격은 document_templates)
+
+
+def _detail_rows(items):
+    """항목 행은 라벨이 고정이므로 템플릿 컴파일 시점에 펼쳐 넣음 (금액만 자리표시자)"""
+    return "\n".join(
+        f'<div class="detail-row"><span>{jp} / {en}</span><span class="amount">¥{{{key}:,.0f}}</span></div>'
+        for key, (jp, en) in items.items()
+    )
+
+
+def _slip_rows(items):
+    return "\n".join(
+        f'<tr><td>{jp} / {en}</td><td class="amount">¥{{{key}:,.0f}}</td></tr>' for key, (jp, en) in items.items()
+    )
+
+
+_PAYSLIP_BODY = compile_template("""
+    <div class="payslip-container">
+        <div class="header">
+            <div class="company-name">大塚銀行 / Otsuka Bank</div>
+            <div class="document-title">給与明細書 / Payslip</div>
+            <div class="pay-date">支給日 / Pay Date: {payslip_date}</div>
+        </div>
+        <div class="info-section">
+            <div class="info-card">
+                <h3>👤 個人情報 / Personal Information</h3>
+                <div class="detail-row">
+                    <span><strong>氏名 / Name:</strong></span>
+                    <span class="info-value">{name}</span>
+                </div>
+                <div class="detail-row">
+                    <span><strong>社員番号 / Employee Number:</strong></span>
+                    <span class="info-value">{emp_num}</span>
+                </div>
+            </div>
+            <div class="info-card">
+                <h3>🏢 勤務情報 / Work Information</h3>
+                <div class="detail-row">
+                    <span><strong>所属部署 / Department:</strong></span>
+                    <span class="info-value">{department}</span>
+                </div>
+                <div class="detail-row">
+                    <span><strong>口座番号 / Account Number:</strong></span>
+                    <span class="info-value">{account}</span>
+                </div>
+            </div>
+        </div>
+        <div class="amount-section">
+            <div class="income-box">
+                <div class="section-title">💵 支給内訳 / Income Breakdown</div>
+                {income_rows}
+                <div class="subtotal">
+                    <div class="detail-row">
+                        <strong>総支給額 / Total Income</strong>
+                        <strong class="amount">¥{total_income:,.0f}</strong>
+                    </div>
+                </div>
+            </div>
+            <div class="deduction-box">
+                <div class="section-title">📋 控除内訳 / Deduction Breakdown</div>
+                {deduction_rows}
+                <div class="subtotal">
+                    <div class="detail-row">
+                        <strong>総控除額 / Total Deductions</strong>
+                        <strong class="amount">¥{total_deductions:,.0f}</strong>
+                    </div>
+                </div>
+            </div>
+        </div>
+        <div class="total-section">
+            <div class="net-label">差引支給額 / Net Salary</div>
+            <div class="net-amount">¥{net_salary:,.0f}</div>
+            <div class="transfer-date">振込予定日 / Scheduled Transfer Date: {transfer_date}</div>
+        </div>
+        <div class="footer">
+            発行日時 / Issued: {issued}<br>
+            大塚銀行 給与計算システム / Otsuka Bank Payroll System
+        </div>
+    </div>
+""", income_rows=_detail_rows(INCOME_ITEMS), deduction_rows=_detail_rows(DEDUCTION_ITEMS))
+
+_WITHHOLDING_SLIP_BODY = compile_template("""
+    <div class="slip-container">
+        <div class="header">
+            <div class="company-name">大塚銀行 / Otsuka Bank</div>
+            <div class="document-title">{year}年分 給与所得の源泉徴収票 / Withholding Slip {year}</div>
+        </div>
+        <table>
+            <tr><th>氏名 / Name</th><td>{name}</td></tr>
+            <tr><th>社員番号 / Employee Number</th><td>{employee_number}</td></tr>
+            <tr><th>支給月数 / Months Paid</th><td>{months}</td></tr>
+        </table>
+        <table>
+            <tr><th>支払金額 / Payment Amount</th><td class="amount">¥{payment_amount:,.0f}</td></tr>
+            <tr><th>社会保険料等の金額 / Social Insurance</th><td class="amount">¥{social_insurance:,.0f}</td></tr>
+            <tr><th>源泉徴収税額 / Income Tax Withheld</th><td class="amount">¥{withholding_tax:,.0f}</td></tr>
+        </table>
+        <div class="section-title">💵 支給内訳 / Income Breakdown</div>
+        <table>{income_rows}</table>
+        <div class="section-title">📋 控除内訳 / Deduction Breakdown</div>
+        <table>
+            {deduction_rows}
+            <tr><th>総控除額 / Total Deductions</th><td class="amount">¥{total_deductions:,.0f}</td></tr>
+            <tr><th>差引支給額 / Net Salary</th><td class="amount">¥{net_salary:,.0f}</td></tr>
+        </table>
+        <div class="footer">
+            発行日時 / Issued: {issued}<br>
+            大塚銀行 給与計算システム / Otsuka Bank Payroll System
+        </div>
+    </div>
+""", income_rows=_slip_rows(INCOME_ITEMS), deduction_rows=_slip_rows(DEDUCTION_ITEMS))
+
+
+def create_payslip_html(salary_data, payslip_date, user_data, stylesheet_href=None):
+    """급여 명세서 HTML - stylesheet_href를 주면 CSS를 인라인하지 않고 공유 스타일시트를 참조"""
+    body = _PAYSLIP_BODY(
+        payslip_date=payslip_date,
+        name=user_data['name'],
+        emp_num=user_data['emp_num'],
+        department=user_data['department'],
+        account=user_data['account'],
+        **{key: item['amount'] for key, item in salary_data['income_breakdown'].items()},
+        **{key: item['amount'] for key, item in salary_data['deduction_breakdown'].items()},
+        total_income=salary_data['total_income'],
+        total_deductions=salary_data['total_deductions'],
+        net_salary=salary_data['net_salary'],
+        transfer_date=payslip_date.split(' / ')[0],
+        issued=issued_timestamp()
+    )
+    return render_document('payslip', f"給与明細 - {payslip_date}", body, stylesheet_href)
+
+
+def create_withholding_slip_html(slip, stylesheet_href=None):
+    """원천징수표 HTML"""
+    body = _WITHHOLDING_SLIP_BODY(
+        year=slip['year'],
+        name=slip['name'],
+        employee_number=slip['employee_number'],
+        months=slip['months'],
+        payment_amount=slip['payment_amount'],
+        social_insurance=slip['social_insurance'],
+        withholding_tax=slip['withholding_tax'],
+        **{key: amount for key, (_, _, amount) in slip['income_items'].items()},
+        **{key: amount for key, (_, _, amount) in slip['deduction_items'].items()},
+        total_deductions=slip['total_deductions'],
+        net_salary=slip['net_salary'],
+        issued=issued_timestamp()
+    )
+    return render_document('withholding_slip', f"給与所得の源泉徴収票 - {slip['year']}", body, stylesheet_href)
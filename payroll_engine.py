@@ -0,0 +1,151 @@
+# payroll_engine.py
+import numpy as np
+import pandas as pd
+
+# 급여 계산 엔진 - 1명 계산과 직원 테이블 일괄 계산이 같은 항목 정의를 사용
+
+INCOME_ITEMS = {
+    'basic_salary': ('基本給', 'Basic Salary'),
+    'overtime_pay': ('残業代', 'Overtime Pay')
+}
+DEDUCTION_ITEMS = {
+    'income_tax': ('所得税', 'Income Tax'),
+    'residence_tax': ('住民税', 'Residence Tax'),
+    'health_insurance': ('健康保険', 'Health Insurance'),
+    'pension': ('厚生年金', 'Pension'),
+    'employment_insurance': ('雇用保険', 'Employment Insurance'),
+    'other_deduction': ('控除額', 'Other Deduction')
+}
+PAYROLL_COLUMNS = (*INCOME_ITEMS, *DEDUCTION_ITEMS)
+RESULT_COLUMNS = ('total_income', 'total_deductions', 'net_salary')
+# 항목당 상한 - 합계를 내도 int64를 넘지 않도록 (1조엔)
+MAX_PAYROLL_AMOUNT = 10 ** 12
+# 선택 열(개호보험 대상 nursing_care)의 예/아니오 표기 - 그 외 값은 검증 오류, 빈 칸은 아니오
+FLAG_TRUE_VALUES = frozenset({'true', 't', 'yes', 'y', '1', 'on', 'はい', '有', '○'})
+FLAG_FALSE_VALUES = frozenset({'false', 'f', 'no', 'n', '0', 'off', 'いいえ', '無', '×', ''})
+FLAG_COLUMNS = ('nursing_care',)
+
+
+def _breakdown(items, values):
+    return {key: {'jp': jp, 'en': en, 'amount': values[key]} for key, (jp, en) in items.items()}
+
+
+def salary_breakdown(row):
+    """일괄 계산 결과의 한 행(또는 dict)을 급여 명세 dict로 변환 - 필요한 직원만 호출"""
+    values = {key: int(row[key]) for key in PAYROLL_COLUMNS}
+    total_income = sum(values[key] for key in INCOME_ITEMS)
+    total_deductions = sum(values[key] for key in DEDUCTION_ITEMS)
+    return {
+        'total_income': total_income,
+        'total_deductions': total_deductions,
+        'net_salary': total_income - total_deductions,
+        'income_breakdown': _breakdown(INCOME_ITEMS, values),
+        'deduction_breakdown': _breakdown(DEDUCTION_ITEMS, values)
+    }
+
+
+def calculate_salary(basic_salary, overtime_pay, income_tax, residence_tax, health_insurance, pension, employment_insurance, other_deduction):
+    """1명 급여 계산"""
+    return salary_breakdown({
+        'basic_salary': basic_salary,
+        'overtime_pay': overtime_pay,
+        'income_tax': income_tax,
+        'residence_tax': residence_tax,
+        'health_insurance': health_insurance,
+        'pension': pension,
+        'employment_insurance': employment_insurance,
+        'other_deduction': other_deduction
+    })
+
+
+def _flag_value(value):
+    """예/아니오 한 값 -> True/False, 인식 못 하면 None"""
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return False
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return {0: False, 1: True}.get(value)
+    token = str(value).strip().casefold()
+    if token in FLAG_TRUE_VALUES:
+        return True
+    if token in FLAG_FALSE_VALUES:
+        return False
+    return None
+
+
+def parse_flags(values):
+    """예/아니오 열 파싱 - (bool 배열, 인식 못 한 값 마스크), 고유값만 한 번씩 해석"""
+    series = pd.Series(values, dtype=object)
+    parsed = series.map({value: _flag_value(value) for value in pd.unique(series)}).to_numpy(dtype=object)
+    invalid = np.array([value is None for value in parsed], dtype=bool)
+    return np.where(invalid, False, parsed).astype(bool), invalid
+
+
+def validate_payroll(frame):
+    """급여 테이블 검증 - 누락 열, 숫자 아님, 음수, 소수, 상한 초과, 예/아니오가 아닌 플래그를 (행, 열, 값, 사유) 표로 반환"""
+    issues = []
+    missing = [column for column in PAYROLL_COLUMNS if column not in frame.columns]
+    for column in missing:
+        issues.append(pd.DataFrame({'row': [None], 'column': [column], 'value': [None], 'reason': ['missing column']}))
+
+    for column in PAYROLL_COLUMNS:
+        if column in missing:
+            continue
+        values = pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=np.float64)
+        checks = (
+            (np.isnan(values), 'not a number'),
+            (values < 0, 'negative amount'),
+            (np.isfinite(values) & (values != np.floor(values)), 'not a whole yen amount'),
+            (values > MAX_PAYROLL_AMOUNT, 'amount too large')
+        )
+        for mask, reason in checks:
+            if mask.any():
+                issues.append(pd.DataFrame({
+                    'row': frame.index[mask],
+                    'column': column,
+                    'value': frame[column].to_numpy()[mask],
+                    'reason': reason
+                }))
+
+    for column in FLAG_COLUMNS:
+        if column in frame.columns:
+            _, invalid = parse_flags(frame[column])
+            if invalid.any():
+                issues.append(pd.DataFrame({
+                    'row': frame.index[invalid],
+                    'column': column,
+                    'value': frame[column].to_numpy()[invalid],
+                    'reason': 'not yes/no'
+                }))
+
+    if not issues:
+        return pd.DataFrame(columns=['row', 'column', 'value', 'reason'])
+    return pd.concat(issues, ignore_index=True)
+
+
+def calculate_payroll_batch(frame):
+    """직원 테이블 일괄 급여 계산 - 총지급/총공제/실수령액을 벡터 열로 추가 (내역 dict는 만들지 않음)"""
+    issues = validate_payroll(frame)
+    if len(issues):
+        first = issues.iloc[0]
+        raise ValueError(
+            f"{len(issues)} invalid payroll values (first: row {first['row']}, {first['column']}: {first['reason']})"
+        )
+
+    result = frame.copy()
+    amounts = np.empty((len(frame), len(PAYROLL_COLUMNS)), dtype=np.int64)
+    for i, column in enumerate(PAYROLL_COLUMNS):
+        amounts[:, i] = pd.to_numeric(frame[column]).to_numpy(dtype=np.int64)
+        result[column] = amounts[:, i]
+
+    income_count = len(INCOME_ITEMS)
+    result['total_income'] = amounts[:, :income_count].sum(axis=1)
+    result['total_deductions'] = amounts[:, income_count:].sum(axis=1)
+    result['net_salary'] = result['total_income'] - result['total_deductions']
+    return result
+
+
+def payroll_totals(result):
+    """일괄 계산 결과의 항목별 합계"""
+    return {column: int(result[column].sum()) for column in (*PAYROLL_COLUMNS, *RESULT_COLUMNS)}
@@ -0,0 +1,156 @@
+# payslip_batch.py
+import argparse
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+
+import pandas as pd
+
+from payroll_deductions import fill_payroll_deductions
+from document_templates import stylesheet
+from payroll_documents import create_payslip_html
+from payroll_engine import PAYROLL_COLUMNS, calculate_payroll_batch, salary_breakdown, validate_payroll
+
+# 전 직원 급여 명세서 일괄 발행 - 프로세스 풀에서 HTML을 만들고 ZIP 파일로 순차 기록 (Streamlit 없이 CLI로 실행 가능)
+
+PAYSLIP_CHUNK_SIZE = 200
+# 명세서 1건 생성이 가벼워서 프로세스 시작/피클링 비용을 넘는 규모에서만 풀 사용
+MIN_PARALLEL_PAYSLIPS = 2000
+# ZIP 안의 명세서가 공유하는 스타일시트 (문서마다 CSS를 반복하지 않음)
+SHARED_STYLESHEET = 'payslip.css'
+EMPLOYEE_COLUMNS = {'name': 'name', 'emp_num': 'employee_number', 'department': 'department', 'account': 'account_number'}
+
+
+def _employee(record, row):
+    """명세서 HTML용 직원 정보 - 없는 열은 빈 값"""
+    employee = {key: record.get(column) for key, column in EMPLOYEE_COLUMNS.items()}
+    employee = {key: '' if value is None or pd.isna(value) else value for key, value in employee.items()}
+    if not employee['emp_num']:
+        employee['emp_num'] = f"row{row + 1}"
+    return employee
+
+
+def _render_chunk(rows, records, payslip_date, file_date, stylesheet_href=None):
+    """워커 프로세스에서 한 묶음 렌더링 - (행, 파일명, HTML 바이트) 또는 (행, None, 오류 메시지)"""
+    rendered = []
+    for row, record in zip(rows, records):
+        try:
+            employee = _employee(record, row)
+            html_content = create_payslip_html(salary_breakdown(record), payslip_date, employee, stylesheet_href)
+            rendered.append((row, f"給与明細_{file_date}_{employee['emp_num']}.html", html_content.encode('utf-8')))
+        except Exception as e:
+            rendered.append((row, None, f"{type(e).__name__}: {e}"))
+    return rendered
+
+
+def generate_payslip_archive(frame, pay_date, output_path, workers=None, chunk_size=PAYSLIP_CHUNK_SIZE, progress=None,
+                             inline_css=False):
+    """급여 테이블 전체의 명세서를 ZIP으로 발행 - 처리 리포트 반환 (잘못된 행은 건너뛰고 failures에 기록)"""
+    started = time.perf_counter()
+    frame = fill_payroll_deductions(frame.reset_index(drop=True))
+    total = len(frame)
+
+    failures = {}
+    for issue in validate_payroll(frame).itertuples(index=False):
+        if issue.row is None:
+            raise ValueError(f"missing payroll column: {issue.column}")
+        failures.setdefault(int(issue.row), f"{issue.column}: {issue.reason}")
+    valid = frame.drop(index=list(failures))
+    result = calculate_payroll_batch(valid) if len(valid) else valid
+
+    columns = [column for column in (*PAYROLL_COLUMNS, *EMPLOYEE_COLUMNS.values()) if column in result.columns]
+    rows = result.index.tolist()
+    records = result[columns].to_dict('records')
+    chunks = [(rows[i:i + chunk_size], records[i:i + chunk_size]) for i in range(0, len(rows), chunk_size)]
+    payslip_date = pay_date.strftime('%Y年%m月%d日 / %Y/%m/%d')
+    file_date = pay_date.strftime('%Y%m%d')
+    stylesheet_href = None if inline_css else SHARED_STYLESHEET
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parallel = workers > 1 and len(rows) >= MIN_PARALLEL_PAYSLIPS
+    written = 0
+    done = len(failures)
+    names = set()
+
+    def write(archive, rendered):
+        nonlocal written, done
+        for row, name, content in rendered:
+            if name is None:
+                failures[row] = content
+            else:
+                # 사원번호가 겹치면 행 번호를 붙여 덮어쓰기 방지
+                if name in names:
+                    name = name.replace('.html', f"_row{row + 1}.html")
+                names.add(name)
+                archive.writestr(name, content)
+                written += 1
+        done += len(rendered)
+        if progress:
+            progress(done, total)
+
+    with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        if stylesheet_href:
+            archive.writestr(stylesheet_href, stylesheet('payslip'))
+        if not parallel:
+            for chunk_rows, chunk_records in chunks:
+                write(archive, _render_chunk(chunk_rows, chunk_records, payslip_date, file_date, stylesheet_href))
+        else:
+            # 메모리 상한을 위해 진행 중인 묶음 수를 워커 수의 2배로 제한하고 끝나는 대로 기록
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = set()
+                for chunk_rows, chunk_records in chunks:
+                    if len(pending) >= workers * 2:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            write(archive, future.result())
+                    pending.add(pool.submit(_render_chunk, chunk_rows, chunk_records, payslip_date, file_date, stylesheet_href))
+                for future in wait(pending).done:
+                    write(archive, future.result())
+
+    seconds = time.perf_counter() - started
+    return {
+        'rows': total,
+        'written': written,
+        'failed': len(failures),
+        'failures': sorted(failures.items()),
+        'workers': workers if parallel else 1,
+        'seconds': seconds,
+        'rows_per_second': total / seconds if seconds > 0 else 0.0,
+        'output_path': output_path
+    }
+
+
+def main(argv=None):
+    """CLI: python payslip_batch.py payroll.csv --pay-date 2025-10-25 --output payslips.zip"""
+    parser = argparse.ArgumentParser(description="給与明細一括発行 / Bulk payslip generation")
+    parser.add_argument('input', help="payroll table (CSV or Excel)")
+    parser.add_argument('--pay-date', type=date.fromisoformat, default=date.today(), help="pay date (YYYY-MM-DD)")
+    parser.add_argument('--output', default=None, help="output ZIP path (default: payslips_YYYYMMDD.zip)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=PAYSLIP_CHUNK_SIZE)
+    parser.add_argument('--inline-css', action='store_true', help="embed CSS in every payslip instead of a shared payslip.css")
+    args = parser.parse_args(argv)
+
+    frame = pd.read_csv(args.input) if args.input.endswith('.csv') else pd.read_excel(args.input)
+    output_path = args.output or f"payslips_{args.pay_date.strftime('%Y%m%d')}.zip"
+
+    def progress(done, total):
+        print(f"\r{done:,}/{total:,}", end='', file=sys.stderr, flush=True)
+
+    report = generate_payslip_archive(
+        frame, args.pay_date, output_path, args.workers, args.chunk_size, progress, args.inline_css
+    )
+    print(file=sys.stderr)
+    print(f"{report['written']:,}/{report['rows']:,} payslips -> {report['output_path']} "
+          f"({report['rows_per_second']:,.0f} rows/s, {report['workers']} workers, {report['seconds']:.1f}s)")
+    for row, error in report['failures']:
+        print(f"  row {row + 1}: {error}", file=sys.stderr)
+    return 1 if report['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# record_store.py
+from itertools import islice
+
+from bank_storage import (
+    delete_payslip, delete_plan, load_payslips_by_id, load_plans_by_id, payslip_ids, plan_ids, save_payslip, save_plan,
+    update_plans
+)
+from shared_state import shared_state
+
+# 세션 공용 ID 키 레코드 저장소 - 생성순 ID 인덱스 + 로드한 레코드만 보관, 조회/삭제 O(1)
+# ID는 저장소(SQLite AUTOINCREMENT)가 단조 증가로 할당하므로 삭제 후에도 재사용되지 않고, 인덱스 뒤에 붙이면 생성순 유지
+# 다른 세션/프로세스의 쓰기는 공유 상태의 (종류, 소유자) 세대 번호로 감지해 인덱스를 다시 읽음
+
+# 세션에 보관하는 레코드 수 상한 (오래 쓰지 않은 것부터 제거, 인덱스는 유지)
+STORE_MAX_RECORDS = 500
+
+RECORD_KINDS = {
+    'plans': {
+        'ids': plan_ids,
+        'load': load_plans_by_id,
+        'save': save_plan,
+        'update': update_plans,
+        'delete': delete_plan
+    },
+    'payslips': {
+        'ids': payslip_ids,
+        'load': load_payslips_by_id,
+        'save': lambda payslip, owner: save_payslip(payslip),
+        'update': None,
+        'delete': delete_payslip
+    }
+}
+
+
+def _namespace(kind, owner):
+    return f"{kind}:{owner}"
+
+
+def open_store(kind, owner):
+    """소유자의 ID 인덱스만 읽은 저장소 - 레코드 본문은 요청 시 로드"""
+    store = {'kind': kind, 'owner': owner}
+    _reload(store)
+    return store
+
+
+def _reload(store):
+    # 세대를 먼저 읽어야 그 사이의 쓰기를 다음 동기화에서 놓치지 않음
+    store['generation'] = shared_state().generation(_namespace(store['kind'], store['owner']))
+    # dict를 순서 있는 집합으로 사용 (삽입순 유지, 삭제 O(1))
+    store['index'] = dict.fromkeys(RECORD_KINDS[store['kind']]['ids'](store['owner']))
+    store['records'] = {}
+
+
+def sync_store(store):
+    """다른 세션/프로세스가 쓴 경우에만 인덱스를 다시 읽고 로드한 레코드를 버림"""
+    if shared_state().generation(_namespace(store['kind'], store['owner'])) != store['generation']:
+        _reload(store)
+    return store
+
+
+def invalidate_stores(kind, owners):
+    """저장소를 직접 갱신한 일괄 작업 뒤 - 해당 소유자들의 모든 세션 저장소가 다음 동기화 때 다시 읽도록 세대 증가"""
+    for owner in owners:
+        shared_state().invalidate(_namespace(kind, owner))
+
+
+def _written(store):
+    """쓰기 후 세대 증가 - 그 사이 다른 쓰기가 없었으면 로컬 상태를 그대로 유지"""
+    generation = shared_state().invalidate(_namespace(store['kind'], store['owner']))
+    if generation == store['generation'] + 1:
+        store['generation'] = generation
+    else:
+        _reload(store)
+
+
+def store_count(store):
+    return len(store['index'])
+
+
+def _fetch(store, record_ids):
+    """아직 로드하지 않은 레코드만 한 번에 로드 - 요청한 레코드는 최근 사용으로 옮기고 오래된 것부터 제거"""
+    records = store['records']
+    missing = [record_id for record_id in record_ids if record_id not in records]
+    for record_id in record_ids:
+        if record_id in records:
+            records[record_id] = records.pop(record_id)
+    if missing:
+        for record in RECORD_KINDS[store['kind']]['load'](missing):
+            records[record['id']] = record
+    while len(records) > max(STORE_MAX_RECORDS, len(record_ids)):
+        del records[next(iter(records))]
+
+
+def store_page(store, offset=0, limit=None):
+    """생성순 offset부터 limit개 레코드 - 해당 구간만 로드"""
+    stop = None if limit is None else offset + limit
+    record_ids = list(islice(store['index'], offset, stop))
+    _fetch(store, record_ids)
+    records = store['records']
+    return [records[record_id] for record_id in record_ids if record_id in records]
+
+
+def store_records(store):
+    """모든 레코드 (생성순)"""
+    return store_page(store)
+
+
+def store_get(store, record_id):
+    """ID로 레코드 1건 (없으면 None)"""
+    if record_id not in store['index']:
+        return None
+    _fetch(store, [record_id])
+    return store['records'].get(record_id)
+
+
+def store_add(store, record):
+    """새 레코드 저장 - 할당된 ID를 레코드에 기록하고 반환"""
+    record_id = RECORD_KINDS[store['kind']]['save'](record, store['owner'])
+    record['id'] = record_id
+    store['index'][record_id] = None
+    store['records'][record_id] = record
+    _written(store)
+    return record_id
+
+
+def store_update(store, records):
+    """기존 레코드 묶음 갱신 (한 트랜잭션) - 세션에 로드된 레코드만 교체"""
+    RECORD_KINDS[store['kind']]['update'](records)
+    for record in records:
+        if record['id'] in store['records']:
+            store['records'][record['id']] = record
+    _written(store)
+
+
+def store_delete(store, record_id):
+    """레코드 삭제"""
+    RECORD_KINDS[store['kind']]['delete'](record_id)
+    store['index'].pop(record_id, None)
+    store['records'].pop(record_id, None)
+    _written(store)
@@ -0,0 +1,157 @@
+# repricing.py
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from bank_storage import (
+    STORAGE_CHUNK_SIZE, apply_staged_pricing, count_all_plans, discard_staged_pricing, iter_all_plans, stage_plan_pricing
+)
+from savings_engine import get_schedule, reprice_savings_batch
+
+# 은행 금리 변경 일괄 재계산 작업 - 전체 플랜을 프로세스 풀로 분산
+
+REPRICE_CHUNK_SIZE = 2000
+# 배치 엔진 자체가 초당 수만 건이라 피클링 비용을 넘는 대량 작업에서만 풀 사용
+MIN_PARALLEL_PLANS = 50000
+
+
+def _reprice_chunk(plans, interest_rate, effective_date):
+    """워커 프로세스에서 한 묶음 재계산"""
+    return reprice_savings_batch(plans, interest_rate, effective_date)
+
+
+def _chunk_order(plans, effective_date):
+    """적용 회차가 비슷한 플랜끼리 묶이도록 정렬한 인덱스"""
+    day = np.datetime64(effective_date, 'D')
+    remaining = [int(np.sum(get_schedule(plan)['payment_date'] >= day)) for plan in plans]
+    return sorted(range(len(plans)), key=remaining.__getitem__)
+
+
+def apply_rate_change(plans, interest_rate, effective_date, workers=None, chunk_size=REPRICE_CHUNK_SIZE, progress=None):
+    """모든 플랜에 금리 변경 적용 - 새 플랜 리스트와 처리 리포트 반환"""
+    # 원본 플랜은 수정하지 않고 모든 묶음이 성공한 경우에만 새 리스트를 만든다 (호출 측에서 한 번에 교체)
+    started = time.perf_counter()
+    total = len(plans)
+    order = _chunk_order(plans, effective_date)
+    chunks = [order[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    results = [None] * total
+    done = 0
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or total < MIN_PARALLEL_PLANS:
+        for chunk in chunks:
+            for i, result in zip(chunk, reprice_savings_batch([plans[i] for i in chunk], interest_rate, effective_date)):
+                results[i] = result
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_reprice_chunk, [plans[i] for i in chunk], interest_rate, effective_date): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                chunk = futures[future]
+                for i, result in zip(chunk, future.result()):
+                    results[i] = result
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+
+    repriced_plans = []
+    repriced = 0
+    for plan, result in zip(plans, results):
+        if result is None:
+            repriced_plans.append(plan)
+            continue
+        calculation, rate_changes = result
+        repriced_plans.append({**plan, 'calculation': calculation, 'rate_changes': rate_changes})
+        repriced += 1
+
+    seconds = time.perf_counter() - started
+    return repriced_plans, {
+        'plans': total,
+        'repriced': repriced,
+        'skipped': total - repriced,
+        'workers': workers if total >= MIN_PARALLEL_PLANS else 1,
+        'seconds': seconds,
+        'plans_per_second': total / seconds if seconds > 0 else 0.0
+    }
+
+
+def _reprice_units(plan_chunks, interest_rate, effective_date, workers, chunk_size=REPRICE_CHUNK_SIZE):
+    """저장소 묶음을 재계산 단위로 나눠 (플랜 목록, 결과) 순서대로 반환 - 풀 하나를 전체 묶음에 걸쳐 사용"""
+    def units():
+        for plans in plan_chunks:
+            order = _chunk_order(plans, effective_date)
+            for start in range(0, len(plans), chunk_size):
+                yield [plans[i] for i in order[start:start + chunk_size]]
+
+    if workers <= 1:
+        for unit in units():
+            yield unit, reprice_savings_batch(unit, interest_rate, effective_date)
+        return
+    # 저장소를 다 읽어 두지 않도록 진행 중인 단위를 워커 수의 두 배로 제한
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for unit in units():
+            pending.append((unit, pool.submit(_reprice_chunk, unit, interest_rate, effective_date)))
+            if len(pending) >= workers * 2:
+                unit, future = pending.popleft()
+                yield unit, future.result()
+        while pending:
+            unit, future = pending.popleft()
+            yield unit, future.result()
+
+
+def reprice_stored_plans(interest_rate, effective_date, actor, workers=None, chunk_size=STORAGE_CHUNK_SIZE, progress=None, path=None):
+    """저장소의 모든 소유자 플랜에 금리 변경 적용 - 바뀐 플랜을 준비 테이블에 모은 뒤 한 트랜잭션으로 교체하고 실행자 기록"""
+    # 중간에 실패하면 준비 결과만 버리므로 저장된 플랜은 전부 바뀌거나 전혀 바뀌지 않음
+    started_at = datetime.now().isoformat(timespec='seconds')
+    started = time.perf_counter()
+    total = count_all_plans(path)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if total < MIN_PARALLEL_PLANS:
+        workers = 1
+    job = uuid.uuid4().hex
+    done = 0
+    try:
+        for unit, results in _reprice_units(iter_all_plans(chunk_size, path), interest_rate, effective_date, workers):
+            changes = [
+                (plan, {**plan, 'calculation': result[0], 'rate_changes': result[1]})
+                for plan, result in zip(unit, results) if result is not None
+            ]
+            if changes:
+                stage_plan_pricing(job, changes, path)
+            done += len(unit)
+            if progress:
+                progress(done, max(total, done))
+        owners, repriced, conflicts = apply_staged_pricing(job, {
+            'actor': actor,
+            'interest_rate': interest_rate,
+            'effective_date': str(effective_date),
+            'started_at': started_at,
+            'plans': done
+        }, path)
+    finally:
+        discard_staged_pricing(job, path)
+
+    seconds = time.perf_counter() - started
+    return owners, {
+        'plans': done,
+        'repriced': repriced,
+        'skipped': done - repriced - conflicts,
+        'conflicts': conflicts,
+        'owners': len(owners),
+        'workers': workers,
+        'seconds': seconds,
+        'plans_per_second': done / seconds if seconds > 0 else 0.0
+    }
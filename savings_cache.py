@@ -0,0 +1,133 @@
+# savings_cache.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+from savings_engine import calculate_savings_schedule
+from shared_state import shared_state
+
+# 적금 계산 결과 캐시 - 프로세스 전체에서 공유하는 LRU, 그 뒤에 여러 프로세스가 공유하는 상태 저장소
+
+# 공유 상태 저장소의 계산 결과 네임스페이스 (키는 파라미터 해시라 값이 바뀌지 않으므로 무효화 불필요)
+CALCULATION_NAMESPACE = 'savings_calc'
+# 공유 저장소의 계산 결과 보관 기간 - 만료된 항목은 다음 저장 때 삭제되어 상태 DB가 계속 커지지 않음
+CALCULATION_TTL_SECONDS = 24 * 60 * 60
+
+
+def plan_cache_key(monthly_amount, period_years, interest_rate, start_date, adjustments=None, rules=None, rounding=None,
+                   compounding='monthly', date_convention=None):
+    """계산 파라미터의 정규화된 해시 키"""
+    if isinstance(start_date, datetime):
+        start_date = start_date.date()
+    if isinstance(start_date, date):
+        start_date = start_date.isoformat()
+    adjustment_items = sorted((int(month), int(amount)) for month, amount in (adjustments or {}).items())
+    canonical = "|".join([
+        str(int(monthly_amount)),
+        str(int(period_years)),
+        repr(float(interest_rate)),
+        str(start_date),
+        ",".join(f"{month}:{amount}" for month, amount in adjustment_items),
+        json.dumps(rules or [], sort_keys=True, separators=(',', ':')),
+        str(rounding),
+        compounding,
+        str(date_convention)
+    ])
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _calculation_nbytes(calculation):
+    """캐시 항목의 대략적인 메모리 사용량"""
+    return 512 + sum(column.nbytes for column in calculation['schedule'].values())
+
+
+def _freeze(calculation):
+    """공유되는 배열은 읽기 전용으로 고정"""
+    for column in calculation['schedule'].values():
+        column.flags.writeable = False
+    return calculation
+
+
+class SavingsCache:
+    """항목 수와 메모리 상한이 있는 스레드 안전 LRU 캐시"""
+
+    def __init__(self, max_entries=4096, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, calculation):
+        nbytes = _calculation_nbytes(calculation)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (calculation, nbytes)
+            self.current_bytes += nbytes
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """히트/미스 카운터와 메모리 사용량"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / lookups) * 100 if lookups else 0.0
+            }
+
+
+savings_cache = SavingsCache()
+
+
+def cached_savings_schedule(monthly_amount, period_years, interest_rate, start_date, adjustments=None, rules=None, rounding=None,
+                            compounding='monthly', date_convention=None):
+    """캐시를 거쳐 적금 스케줄 계산 - 같은 파라미터는 재계산하지 않음 (프로세스 LRU -> 공유 저장소 -> 계산)"""
+    key = plan_cache_key(
+        monthly_amount, period_years, interest_rate, start_date, adjustments, rules, rounding, compounding, date_convention
+    )
+    calculation = savings_cache.get(key)
+    if calculation is None:
+        calculation = shared_state().fetch(CALCULATION_NAMESPACE, key)
+        if calculation is None:
+            calculation = calculate_savings_schedule(
+                monthly_amount, period_years, interest_rate, start_date, adjustments, rules, rounding, compounding,
+                date_convention
+            )
+            shared_state().store(CALCULATION_NAMESPACE, key, calculation, CALCULATION_TTL_SECONDS)
+        calculation = _freeze(calculation)
+        savings_cache.put(key, calculation)
+    # 스케줄 배열은 공유하고 바깥 dict만 복사
+    return {**calculation, 'schedule': dict(calculation['schedule'])}
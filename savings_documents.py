@@ -0,0 +1,104 @@
+# savings_documents.py
+from document_charts import schedule_chart_svg
+from document_templates import compile_template, issued_timestamp, render_document
+from savings_engine import evaluate_as_of, get_schedule
+
+# 적금 증명서 HTML 생성 (CSS/골격은 document_templates)
+
+_CERTIFICATE_BODY = compile_template("""
+    <div class="certificate-container">
+        <div class="watermark">OTS UKA BANK</div>
+        <div class="header">
+            <div class="certificate-title">積立貯蓄証明書</div>
+            <div class="subtitle">Savings Certificate</div>
+            <div class="subtitle-small">Certificate of Savings Plan</div>
+        </div>
+        <div class="info-grid">
+            <div class="info-card">
+                <h3>基本情報 / Basic Information</h3>
+                <div class="info-row"><strong>積立名:</strong> <span class="value">{name}</span></div>
+                <div class="info-row"><strong>顧客名:</strong> <span class="value">{customer_name}</span></div>
+                <div class="info-row"><strong>社員番号:</strong> <span class="highlight">{emp_num}</span></div>
+            </div>
+            <div class="info-card">
+                <h3>積立詳細 / Savings Details</h3>
+                <div class="info-row"><strong>開始日:</strong> <span class="value">{start_date}</span></div>
+                <div class="info-row"><strong>積立期間:</strong> <span class="value">{period}年 / years</span></div>
+                <div class="info-row"><strong>月間積立額:</strong> <span class="value">¥{monthly_amount:,.0f}</span></div>
+                <div class="info-row"><strong>年利率:</strong> <span class="value">{interest_rate}%</span></div>
+            </div>
+        </div>
+        <div class="progress-section">
+            <h3>📊 積立進捗状況 / Savings Progress</h3>
+            <div class="two-columns" style="margin-bottom: 20px;">
+                <div>
+                    <div>完了回数 / Completed: <span class="value">{completed}回</span></div>
+                    <div>残り回数 / Remaining: <span class="value">{remaining}回</span></div>
+                </div>
+                <div>
+                    <div>総回数 / Total: <span class="value">{total}回</span></div>
+                    <div>進捗率 / Progress: <span class="value">{progress_percent:.1f}%</span></div>
+                </div>
+            </div>
+            <div class="progress-bar">
+                <div class="progress-fill" style="width: {progress_percent}%;"></div>
+            </div>
+        </div>
+        <div class="chart-section">
+            <h3>📈 残高推移 / Balance History</h3>
+            {chart}
+        </div>
+        <div class="calculation-section">
+            <h3>💰 計算結果 / Calculation Results</h3>
+            <div class="two-columns">
+                <div class="result-card">
+                    <div class="result-label">総支払額 / Total Payment</div>
+                    <div class="result-value" style="color: #1e40af;">¥{total_payment:,.0f}</div>
+                </div>
+                <div class="result-card">
+                    <div class="result-label">総利息 / Total Interest</div>
+                    <div class="result-value" style="color: #10b981;">¥{total_interest:,.0f}</div>
+                </div>
+                <div class="result-card">
+                    <div class="result-label">現在までの支払額 / Paid to Date</div>
+                    <div class="result-value" style="color: #f59e0b;">¥{total_paid:,.0f}</div>
+                </div>
+                <div class="result-card">
+                    <div class="result-label">最終残高 / Final Balance</div>
+                    <div class="result-value" style="color: #ef4444;">¥{final_balance:,.0f}</div>
+                </div>
+            </div>
+        </div>
+        <div class="footer">
+            <div style="margin-bottom: 10px;">発行日時 / Issued: {issued}</div>
+            <div class="footer-note">大塚銀行 / Otsuka Bank - 従業員バンキングポータル / Employee Banking Portal</div>
+        </div>
+    </div>
+""")
+
+
+def create_savings_certificate_html(savings_data, user_data, as_of=None, stylesheet_href=None):
+    """적금 증명서 HTML - 진행 상황은 기준일(기본값 오늘)로 계산, 잔액 추이는 인라인 SVG 차트"""
+    schedule = get_schedule(savings_data)
+    progress = evaluate_as_of(schedule, as_of)
+    calculation = savings_data['calculation']
+    body = _CERTIFICATE_BODY(
+        name=savings_data['name'],
+        customer_name=user_data['name'],
+        emp_num=user_data['emp_num'],
+        start_date=savings_data['start_date'],
+        period=savings_data['period'],
+        monthly_amount=savings_data['monthly_amount'],
+        interest_rate=savings_data['interest_rate'],
+        completed=progress['completed_months'],
+        remaining=progress['total_months'] - progress['completed_months'],
+        total=progress['total_months'],
+        progress_percent=progress['completion_rate'],
+        total_payment=calculation['total_payment'],
+        total_interest=calculation['total_interest'],
+        total_paid=progress['total_paid'],
+        final_balance=calculation['final_balance'],
+        chart=schedule_chart_svg(schedule),
+        issued=issued_timestamp()
+    )
+    return render_document('certificate', f"積立証明書 - {savings_data['name']}", body, stylesheet_href)
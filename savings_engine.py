@@ -0,0 +1,685 @@
+# savings_engine.py
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from bank_calendar import monthly_payment_dates, payment_calendar_matrix
+
+# 적금 계산 엔진 - 여러 플랜을 NumPy 배열로 한 번에 계산
+
+# 입금 상태 코드 (스케줄에는 저장하지 않고 기준일로 계산)
+STATUS_COMPLETED = 0
+STATUS_TODAY = 1
+STATUS_SCHEDULED = 2
+# 고정소수점 모드: 월 이자 = 잔액 x bp / 120000, 일할은 잔액 x bp x 일수 / 3650000 (bp = 0.01%)
+ROUNDING_POLICIES = ('half_up', 'floor', 'bankers')
+BASIS_POINT_MONTHS = 10000 * 12
+BASIS_POINT_DAYS = 10000 * 365
+
+# 이자 계산 방식: 월복리(기본), 일할(actual/365, 월 원가), 반년/연 원가, 단리
+COMPOUNDING_MODES = ('monthly', 'daily', 'semi_annual', 'annual', 'simple')
+COMPOUNDING_LABELS = {
+    'monthly': "月複利 / Monthly compounding",
+    'daily': "日割り (実日数/365) / Daily accrual (actual/365)",
+    'semi_annual': "半年複利 / Semi-annual capitalization",
+    'annual': "年複利 / Annual capitalization",
+    'simple': "単利 / Simple interest"
+}
+CAPITALIZATION_MONTHS = {'semi_annual': 6, 'annual': 12}
+
+STATUS_LABELS = (
+    "✅ 入金完了 / Payment Completed",
+    "⏳ 本日入金 / Payment Today",
+    "📅 入金予定 / Scheduled Payment"
+)
+
+
+def _per_plan(values, n):
+    """플랜별 값 리스트로 정규화 - 단일 조정 dict/규칙 리스트는 모든 플랜에 공통 적용"""
+    if not values:
+        return [None] * n
+    if isinstance(values, dict) or (isinstance(values[0], dict) and 'kind' in values[0]):
+        return [values] * n
+    values = list(values)
+    if len(values) != n:
+        raise ValueError("expected one entry per plan")
+    return values
+
+
+def _rule_mask(rule, months, calendar_months):
+    """규칙이 적용되는 회차 마스크"""
+    kind = rule['kind']
+    if kind == 'every_n':
+        start = rule.get('start', 1)
+        mask = (months >= start) & ((months - start) % rule['every'] == 0)
+    elif kind == 'month_of_year':
+        if calendar_months is None:
+            raise ValueError("month_of_year rules need payment dates")
+        mask = np.isin(calendar_months, rule['months'])
+    elif kind == 'range':
+        mask = (months >= rule['start']) & (months <= rule['end'])
+    else:
+        raise ValueError(f"unknown adjustment rule kind: {kind}")
+    return mask
+
+
+def apply_adjustment_rules(amounts, rules, calendar_months=None):
+    """반복 조정 규칙을 월별 입금액 배열에 한 번에 적용 - 규칙은 순서대로 적용"""
+    amounts = np.array(amounts, dtype=np.int64)
+    touched = np.zeros(amounts.shape, dtype=bool)
+    months = np.arange(1, amounts.shape[-1] + 1)
+    for rule in rules or ():
+        mask = _rule_mask(rule, months, calendar_months)
+        if 'percent' in rule:
+            changed = np.round(amounts * (1 + rule['percent'] / 100)).astype(np.int64)
+        else:
+            changed = rule['amount']
+        amounts = np.where(mask, changed, amounts)
+        touched |= mask
+    return amounts, touched
+
+
+def describe_rule(rule):
+    """조정 규칙 표시용 문자열"""
+    action = f"{rule['percent']:+g}%" if 'percent' in rule else f"¥{rule['amount']:,}"
+    if rule['kind'] == 'every_n':
+        return f"{rule.get('start', 1)}回目から{rule['every']}ヶ月ごと / Every {rule['every']} months from month {rule.get('start', 1)}: {action}"
+    if rule['kind'] == 'month_of_year':
+        months = ", ".join(f"{m}月" for m in rule['months'])
+        return f"毎年 {months} / Every year in months {', '.join(map(str, rule['months']))}: {action}"
+    return f"{rule['start']}〜{rule['end']}回目 / Months {rule['start']}–{rule['end']}: {action}"
+
+
+def _group_by_rules(per_plan_rules):
+    """규칙이 있는 플랜을 규칙 내용별로 묶음 - [(규칙 리스트, 플랜 인덱스 배열)]"""
+    groups = {}
+    keys = {}
+    for i, plan_rules in enumerate(per_plan_rules):
+        if not plan_rules:
+            continue
+        # 같은 리스트 객체(모든 플랜 공통 규칙)는 직렬화를 한 번만
+        key = keys.get(id(plan_rules))
+        if key is None:
+            key = keys[id(plan_rules)] = json.dumps(plan_rules, sort_keys=True, default=str)
+        groups.setdefault(key, (plan_rules, []))[1].append(i)
+    return [(plan_rules, np.array(rows)) for plan_rules, rows in groups.values()]
+
+
+def build_amount_matrix(monthly_amounts, total_months, adjustments=None, rules=None, payment_dates=None):
+    """플랜 x 월 입금액 행렬과 조정 여부 마스크 생성 (기간 밖은 0)"""
+    monthly_amounts = np.asarray(monthly_amounts, dtype=np.int64).reshape(-1)
+    total_months = np.asarray(total_months, dtype=np.int64).reshape(-1)
+    n = len(monthly_amounts)
+    max_months = int(total_months.max()) if n else 0
+
+    active = np.arange(max_months) < total_months[:, None]
+    amounts = np.broadcast_to(monthly_amounts[:, None], (n, max_months)).astype(np.int64)
+    adjusted = np.zeros((n, max_months), dtype=bool)
+
+    calendar_months = None
+    if payment_dates is not None:
+        calendar_months = payment_dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    # 같은 규칙 묶음을 쓰는 플랜끼리 모아 규칙 마스크를 (플랜 묶음 x 월) 행렬에 한 번에 적용
+    for plan_rules, rows in _group_by_rules(_per_plan(rules, n)):
+        amounts[rows], adjusted[rows] = apply_adjustment_rules(
+            amounts[rows], plan_rules, None if calendar_months is None else calendar_months[rows]
+        )
+
+    rows, cols, values = [], [], []
+    for i, adj in enumerate(_per_plan(adjustments, n)):
+        if not adj:
+            continue
+        for month, amount in adj.items():
+            if 1 <= month <= total_months[i]:
+                rows.append(i)
+                cols.append(month - 1)
+                values.append(amount)
+    if rows:
+        amounts[rows, cols] = values
+        adjusted[rows, cols] = True
+
+    return np.where(active, amounts, 0), adjusted & active
+
+
+def rate_to_basis_points(interest_rates):
+    """연이율(%)을 정수 bp로 변환 - 0.01% 단위가 아니면 오류"""
+    rates = np.asarray(interest_rates, dtype=np.float64)
+    basis_points = np.round(rates * 100)
+    if not np.all(np.abs(basis_points - rates * 100) < 1e-6):
+        raise ValueError("interest rate must be a multiple of 0.01% for fixed-point mode")
+    return basis_points.astype(np.int64)
+
+
+def divide_rounded(numerator, denominator, rounding):
+    """정수 나눗셈 + 단수 처리 - Python int와 NumPy int64 배열에서 같은 결과"""
+    if rounding == 'floor':
+        return numerator // denominator
+    if rounding == 'half_up':
+        return (2 * numerator + denominator) // (2 * denominator)
+    if rounding == 'bankers':
+        quotient, remainder = numerator // denominator, numerator % denominator
+        return quotient + ((2 * remainder > denominator) | ((2 * remainder == denominator) & (quotient % 2 == 1)))
+    raise ValueError(f"unknown rounding policy: {rounding}")
+
+
+def fixed_point_interest(balance, rate_bp, rounding):
+    """월 이자 = 잔액 x bp / (10000 x 12) 를 정수 연산으로 계산"""
+    return divide_rounded(balance * rate_bp, BASIS_POINT_MONTHS, rounding)
+
+
+def accumulate_fixed_point(amounts, rate_bp, rounding, opening_balance=0):
+    """단일 플랜 고정소수점 적립 (스칼라 기준 구현) - 월별 이자와 잔액 리스트"""
+    balance = int(opening_balance)
+    interest, balances = [], []
+    for amount in amounts:
+        monthly_interest = int(fixed_point_interest(balance, int(rate_bp), rounding))
+        balance += int(amount) + monthly_interest
+        interest.append(monthly_interest)
+        balances.append(balance)
+    return interest, balances
+
+
+def _day_counts(payment_dates):
+    """직전 입금일부터의 실제 경과 일수 (첫 회차는 0)"""
+    return np.diff(payment_dates, axis=-1, prepend=payment_dates[..., :1]).astype(np.int64)
+
+
+def _restart_month(compounding, month_index):
+    """재계산 시작 회차 - 원가 기간 중간이면 그 기간 첫 회차로 되돌림"""
+    months_per_period = CAPITALIZATION_MONTHS.get(compounding)
+    if months_per_period is None:
+        return month_index
+    return month_index - month_index % months_per_period
+
+
+def _rate_factors(annual_rates, rounding, day_counts=None):
+    """이자 계수 - 부동소수점은 (월/일할 이율, None), 고정소수점은 (정수 분자 계수, 분모)"""
+    if rounding is None:
+        if day_counts is None:
+            return annual_rates / 100 / 12, None
+        return annual_rates / 100 * day_counts / 365, None
+    basis_points = rate_to_basis_points(annual_rates)
+    if day_counts is None:
+        return basis_points, BASIS_POINT_MONTHS
+    return basis_points * day_counts, BASIS_POINT_DAYS
+
+
+def _fixed_product(base, factor, terms=1):
+    """정수 base x 계수 - terms개를 더하고 단수 처리(2배)해도 int64를 넘지 않는지 확인"""
+    limit = np.iinfo(np.int64).max // (2 * terms * max(int(np.abs(factor).max(initial=0)), 1))
+    if np.abs(base).max(initial=0) > limit:
+        raise OverflowError("balance too large for int64 fixed-point interest")
+    return base * factor
+
+
+def _apply_rate(base, factor, denominator, rounding):
+    """base x 계수에 엔 단위 단수 처리를 적용한 이자"""
+    if rounding is None:
+        return np.round(base * factor).astype(np.int64)
+    return divide_rounded(_fixed_product(base, factor), denominator, rounding)
+
+
+def _accumulate_simple(amounts, factor, denominator, active, opening_balance, opening_principal, rounding):
+    """단리 - 이자는 원금(누적 입금액)에만 붙으므로 루프 없이 누적합으로 계산"""
+    paid = np.where(active, amounts, 0)
+    principal_before = opening_principal[:, None] + np.cumsum(paid, axis=1) - paid
+    interest = np.where(active, _apply_rate(principal_before, factor, denominator, rounding), 0)
+    balances = opening_balance[:, None] + np.cumsum(paid + interest, axis=1)
+    return interest, balances, balances[:, -1] if balances.shape[1] else opening_balance.copy()
+
+
+def _accumulate_capitalized(amounts, factor, denominator, active, opening_balance, months_per_period, month_offset, rounding):
+    """반년/연 원가 - 기간 내 월별 이자는 누적합으로 모아 원가 회차(또는 만기)에 한 번에 반영"""
+    n, months = amounts.shape
+    paid = np.where(active, amounts, 0)
+    interest = np.zeros((n, months), dtype=np.int64)
+    balances = np.zeros((n, months), dtype=np.int64)
+    capital = opening_balance.copy()
+    rows = np.arange(n)
+
+    # 원가 기간 단위 루프 (5년 반년 원가도 10회) - 기간 안은 벡터 연산
+    period_index = (np.arange(months) + month_offset) // months_per_period
+    bounds = [0, *(np.flatnonzero(np.diff(period_index)) + 1).tolist(), months]
+    for c0, c1 in zip(bounds[:-1], bounds[1:]):
+        period_paid = paid[:, c0:c1]
+        period_active = active[:, c0:c1]
+        deposits = np.cumsum(period_paid, axis=1)
+        base = np.where(period_active, capital[:, None] + deposits - period_paid, 0)
+        if rounding is None:
+            credited = np.round((base * factor[:, c0:c1]).sum(axis=1)).astype(np.int64)
+        else:
+            accrued = _fixed_product(base, factor[:, c0:c1], terms=c1 - c0).sum(axis=1)
+            credited = divide_rounded(accrued, denominator, rounding)
+        active_months = period_active.sum(axis=1)
+        credited = np.where(active_months > 0, credited, 0)
+
+        credit_column = np.maximum(active_months - 1, 0)
+        interest[rows, c0 + credit_column] += credited
+        credited_by = (np.arange(c1 - c0) >= credit_column[:, None]) & (active_months > 0)[:, None]
+        balances[:, c0:c1] = capital[:, None] + deposits + np.where(credited_by, credited[:, None], 0)
+        capital = capital + deposits[:, -1] + credited
+    return interest, balances, capital
+
+
+def _accumulate_balances(amounts, annual_rates, active, opening_balance, rounding=None, compounding='monthly',
+                         day_counts=None, opening_principal=None, month_offset=0):
+    """입금액 행렬을 월 순서대로 적립 - 이자는 전월 잔액 기준 엔 단위 반올림"""
+    n, months = amounts.shape
+    opening_balance = np.asarray(opening_balance, dtype=np.int64).reshape(n)
+    # 연이율은 플랜별 고정 (n,) 또는 금리 변경 반영 (n, months)
+    annual_rates = np.broadcast_to(np.asarray(annual_rates, dtype=np.float64).reshape(n, -1), (n, months))
+
+    if compounding == 'simple':
+        factor, denominator = _rate_factors(annual_rates, rounding)
+        if opening_principal is None:
+            opening_principal = np.zeros(n, dtype=np.int64)
+        opening_principal = np.asarray(opening_principal, dtype=np.int64).reshape(n)
+        return _accumulate_simple(amounts, factor, denominator, active, opening_balance, opening_principal, rounding)
+    if compounding in CAPITALIZATION_MONTHS:
+        factor, denominator = _rate_factors(annual_rates, rounding)
+        return _accumulate_capitalized(
+            amounts, factor, denominator, active, opening_balance, CAPITALIZATION_MONTHS[compounding], month_offset, rounding
+        )
+    if compounding == 'daily':
+        # 잔액은 입금일 사이에 일정하므로 일별 이자 합 = 잔액 x 연이율 x 경과일수 / 365
+        factor, denominator = _rate_factors(annual_rates, rounding, day_counts)
+    elif compounding == 'monthly':
+        factor, denominator = _rate_factors(annual_rates, rounding)
+    else:
+        raise ValueError(f"unknown compounding mode: {compounding}")
+
+    interest = np.zeros((n, months), dtype=np.int64)
+    balances = np.zeros((n, months), dtype=np.int64)
+    current_balance = opening_balance.copy()
+
+    # 반올림 때문에 월 루프는 남기고 플랜 축만 벡터화
+    for m in range(months):
+        monthly_interest = np.where(active[:, m], _apply_rate(current_balance, factor[:, m], denominator, rounding), 0)
+        current_balance = current_balance + amounts[:, m] + monthly_interest
+        interest[:, m] = monthly_interest
+        balances[:, m] = current_balance
+    return interest, balances, current_balance
+
+
+def calculate_savings_batch(monthly_amounts, periods, interest_rates, start_dates, adjustments=None, rules=None, rounding=None,
+                            compounding='monthly', date_convention=None):
+    """여러 적금 플랜을 한 번에 계산 - 결과는 (플랜 x 월) NumPy 배열 (rounding 지정 시 고정소수점)"""
+    monthly_amounts = np.asarray(monthly_amounts, dtype=np.int64).reshape(-1)
+    n = len(monthly_amounts)
+    total_months = np.broadcast_to(np.asarray(periods, dtype=np.int64) * 12, (n,)).copy()
+    interest_rates = np.broadcast_to(np.asarray(interest_rates, dtype=np.float64), (n,))
+    start_dates = np.broadcast_to(np.asarray(start_dates, dtype='datetime64[D]'), (n,))
+
+    max_months = int(total_months.max()) if n else 0
+    # 월별 규칙은 명목 입금월 기준, 스케줄과 일할 일수는 영업일 조정 후 입금일 기준
+    nominal_dates = monthly_payment_dates(start_dates, max_months)
+    amounts, adjusted = build_amount_matrix(monthly_amounts, total_months, adjustments, rules, nominal_dates)
+    payment_dates = nominal_dates
+    if date_convention is not None:
+        payment_dates = payment_calendar_matrix(start_dates, max_months, date_convention)
+    active = np.arange(max_months) < total_months[:, None]
+
+    interest, balances, current_balance = _accumulate_balances(
+        amounts, interest_rates, active, np.zeros(n, dtype=np.int64), rounding, compounding,
+        day_counts=_day_counts(payment_dates) if compounding == 'daily' else None
+    )
+
+    # 조정/규칙이 반영된 실제 입금액 합계 (기간 밖은 0)
+    total_payment = amounts.sum(axis=1)
+    return {
+        'payment_dates': payment_dates,
+        'amounts': amounts,
+        'adjusted': adjusted,
+        'interest': interest,
+        'balances': balances,
+        'active': active,
+        'total_months': total_months,
+        'total_payment': total_payment,
+        'total_interest': current_balance - total_payment,
+        'final_balance': current_balance
+    }
+
+
+def calculate_savings_schedule(monthly_amount, period_years, interest_rate, start_date, adjustments=None, rules=None, rounding=None,
+                               compounding='monthly', date_convention=None):
+    """단일 적금 플랜 계산 - 배치 엔진과 같은 경로를 사용 (상태는 evaluate_as_of로 별도 계산)"""
+    batch = calculate_savings_batch(
+        [monthly_amount], [period_years], [interest_rate], [start_date], [adjustments], [rules], rounding, compounding,
+        date_convention
+    )
+    total_months = int(batch['total_months'][0])
+    amounts = batch['amounts'][0, :total_months].copy()
+    adjusted = batch['adjusted'][0, :total_months].copy()
+
+    schedule = {
+        'payment_date': batch['payment_dates'][0, :total_months].copy(),
+        'amount': amounts,
+        'interest': batch['interest'][0, :total_months].copy(),
+        'balance': batch['balances'][0, :total_months].copy(),
+        'paid_to_date': np.cumsum(amounts),
+        'adjusted': adjusted
+    }
+
+    return {
+        'schedule': schedule,
+        'total_months': total_months,
+        'total_payment': int(batch['total_payment'][0]),
+        'total_interest': int(batch['total_interest'][0]),
+        'final_balance': int(batch['final_balance'][0])
+    }
+
+
+def plan_monthly_rates(savings, payment_dates, rate_changes=None):
+    """입금일별 적용 연이율 - 금리 변경 이력(적용일 이후 회차부터)을 반영"""
+    rates = np.full(len(payment_dates), savings['interest_rate'], dtype=np.float64)
+    if rate_changes is None:
+        rate_changes = savings.get('rate_changes') or []
+    for change in sorted(rate_changes, key=lambda c: c['effective_date']):
+        rates[payment_dates >= np.datetime64(change['effective_date'], 'D')] = change['interest_rate']
+    return rates
+
+
+def reprice_savings_batch(plans, interest_rate, effective_date):
+    """금리 변경을 여러 플랜에 적용 - 적용일 이후 회차부터만 (플랜 x 월) 벡터로 재계산"""
+    # 결과: 적용일 전에 만기인 플랜은 None, 나머지는 (새 calculation, 새 rate_changes)
+    change = {'effective_date': np.datetime64(effective_date, 'D').item().isoformat(), 'interest_rate': interest_rate}
+    day = np.datetime64(change['effective_date'], 'D')
+    schedules = [get_schedule(plan) for plan in plans]
+    totals = np.array([len(schedule['amount']) for schedule in schedules], dtype=np.int64)
+    starts = np.array([np.searchsorted(schedule['payment_date'], day) for schedule in schedules], dtype=np.int64)
+    results = [None] * len(plans)
+    affected = np.flatnonzero(starts < totals)
+    if len(affected) == 0:
+        return results
+
+    # 영향받는 가장 이른 회차부터 공통 열로 정렬해 한 번에 누적 (원가 기간 중간이면 연초 회차부터)
+    modes = [(plans[i].get('rounding'), plans[i].get('compounding', 'monthly')) for i in affected]
+    first = int(starts[affected].min())
+    if any(compounding in CAPITALIZATION_MONTHS for _, compounding in modes):
+        first = _restart_month('annual', first)
+    width = int(totals[affected].max()) - first
+    amounts = np.zeros((len(affected), width), dtype=np.int64)
+    annual_rates = np.zeros((len(affected), width), dtype=np.float64)
+    active = np.zeros((len(affected), width), dtype=bool)
+    day_counts = np.zeros((len(affected), width), dtype=np.int64)
+    opening_balance = np.zeros(len(affected), dtype=np.int64)
+    opening_principal = np.zeros(len(affected), dtype=np.int64)
+    rate_changes = []
+    for row, i in enumerate(affected):
+        schedule, length = schedules[i], totals[i] - first
+        plan_changes = [c for c in plans[i].get('rate_changes') or [] if c['effective_date'] != change['effective_date']] + [change]
+        rate_changes.append(plan_changes)
+        amounts[row, :length] = schedule['amount'][first:]
+        annual_rates[row, :length] = plan_monthly_rates(plans[i], schedule['payment_date'][first:], plan_changes)
+        active[row, :length] = True
+        day_counts[row, :length] = _day_counts(schedule['payment_date'])[first:]
+        opening_balance[row] = schedule['balance'][first - 1] if first else 0
+        opening_principal[row] = schedule['paid_to_date'][first - 1] if first else 0
+
+    # 단수 처리/이자 계산 방식이 같은 플랜끼리 묶어서 누적
+    interest = np.zeros((len(affected), width), dtype=np.int64)
+    balances = np.zeros((len(affected), width), dtype=np.int64)
+    closing = np.zeros(len(affected), dtype=np.int64)
+    for rounding, compounding in set(modes):
+        rows = np.array([mode == (rounding, compounding) for mode in modes])
+        interest[rows], balances[rows], closing[rows] = _accumulate_balances(
+            amounts[rows], annual_rates[rows], active[rows], opening_balance[rows], rounding, compounding,
+            day_counts=day_counts[rows], opening_principal=opening_principal[rows], month_offset=first
+        )
+
+    for row, i in enumerate(affected):
+        schedule, length = schedules[i], totals[i] - first
+        calculation = plans[i]['calculation']
+        final_balance = int(closing[row])
+        total_payment = int(schedule['paid_to_date'][-1])
+        results[i] = ({
+            **calculation,
+            'schedule': {
+                **schedule,
+                'interest': np.concatenate([schedule['interest'][:first], interest[row, :length]]),
+                'balance': np.concatenate([schedule['balance'][:first], balances[row, :length]])
+            },
+            'total_payment': total_payment,
+            'final_balance': final_balance,
+            'total_interest': final_balance - total_payment
+        }, rate_changes[row])
+    return results
+
+
+def recalculate_savings_schedule(savings, adjustments, rules=None):
+    """조정 내역/규칙 변경 시 변경 전 구간은 재사용하고 첫 변경 회차부터만 다시 계산"""
+    calculation = savings['calculation']
+    schedule = get_schedule(savings)
+    total_months = calculation['total_months']
+    if rules is None:
+        rules = savings.get('rules')
+
+    # 입금액 전개는 벡터 연산이라 전체를 다시 만들고, 느린 잔액 누적만 변경 회차부터 수행
+    nominal_dates = schedule['payment_date'][None, :]
+    if savings.get('date_convention') is not None:
+        nominal_dates = monthly_payment_dates([savings['start_date'].replace('/', '-')], total_months)
+    amounts, adjusted = build_amount_matrix(
+        [savings['monthly_amount']], [total_months], [adjustments], [rules], nominal_dates
+    )
+    amounts, adjusted = amounts[0], adjusted[0]
+    changed = np.flatnonzero((amounts != schedule['amount']) | (adjusted != schedule['adjusted']))
+    if len(changed) == 0:
+        return calculation
+    compounding = savings.get('compounding', 'monthly')
+    k = _restart_month(compounding, int(changed[0]))
+    suffix_amounts = amounts[k:]
+
+    opening_balance = schedule['balance'][k - 1] if k else 0
+    opening_paid = schedule['paid_to_date'][k - 1] if k else 0
+    annual_rates = plan_monthly_rates(savings, schedule['payment_date'][k:])
+    interest, balances, closing = _accumulate_balances(
+        suffix_amounts[None, :], annual_rates[None, :], np.ones((1, total_months - k), dtype=bool), [opening_balance],
+        savings.get('rounding'), compounding,
+        day_counts=_day_counts(schedule['payment_date'])[None, k:], opening_principal=[opening_paid], month_offset=k
+    )
+
+    final_balance = int(closing[0])
+    total_payment = int(amounts.sum())
+    return {
+        **calculation,
+        'schedule': {
+            'payment_date': schedule['payment_date'],
+            'amount': amounts,
+            'interest': np.concatenate([schedule['interest'][:k], interest[0]]),
+            'balance': np.concatenate([schedule['balance'][:k], balances[0]]),
+            'paid_to_date': np.concatenate([schedule['paid_to_date'][:k], opening_paid + np.cumsum(suffix_amounts)]),
+            'adjusted': adjusted
+        },
+        'total_payment': total_payment,
+        'final_balance': final_balance,
+        'total_interest': final_balance - total_payment
+    }
+
+
+def _schedule_from_rows(rows):
+    """예전 list-of-dict 스케줄을 컬럼형으로 변환"""
+    amounts = np.array([row['amount'] for row in rows], dtype=np.int64)
+    return {
+        'payment_date': np.array([row['payment_date'] for row in rows], dtype='datetime64[D]'),
+        'amount': amounts,
+        'interest': np.array([row['interest'] for row in rows], dtype=np.int64),
+        'balance': np.array([row['balance'] for row in rows], dtype=np.int64),
+        'paid_to_date': np.cumsum(amounts),
+        'adjusted': np.array([bool(row['notes']) for row in rows], dtype=bool)
+    }
+
+
+def get_schedule(savings):
+    """플랜의 컬럼형 스케줄 반환 - 적금 목록, 증명서, 홈 화면 공용 접근자"""
+    calculation = savings['calculation']
+    if isinstance(calculation['schedule'], list):
+        calculation['schedule'] = _schedule_from_rows(calculation['schedule'])
+    schedule = calculation['schedule']
+    if 'paid_to_date' not in schedule:
+        schedule['paid_to_date'] = np.cumsum(schedule['amount'])
+        schedule.pop('status', None)
+    return schedule
+
+
+def _as_day(as_of):
+    """기준일을 datetime64[D]로 변환 (None이면 오늘)"""
+    if as_of is None:
+        as_of = datetime.now().date()
+    return np.datetime64(as_of, 'D')
+
+
+def evaluate_as_of(schedule, as_of=None):
+    """기준일 시점의 진행 상황 - 정렬된 입금일을 이진 탐색하므로 O(log n)"""
+    day = _as_day(as_of)
+    payment_dates = schedule['payment_date']
+    total = len(payment_dates)
+    completed = int(np.searchsorted(payment_dates, day, side='right'))
+    last = completed - 1
+
+    return {
+        'as_of': day,
+        'total_months': total,
+        'completed_months': completed,
+        'remaining_months': total - completed,
+        'total_paid': int(schedule['paid_to_date'][last]) if completed else 0,
+        'balance': int(schedule['balance'][last]) if completed else 0,
+        'completion_rate': (completed / total) * 100 if total else 0.0,
+        'payment_today': bool(completed and payment_dates[last] == day)
+    }
+
+
+def schedule_status(schedule, as_of=None, start=0, stop=None):
+    """기준일 기준 구간별 입금 상태 코드 (완료 / 당일 / 예정)"""
+    payment_dates = schedule['payment_date'][start:stop]
+    day = _as_day(as_of)
+    status = np.full(len(payment_dates), STATUS_SCHEDULED, dtype=np.int8)
+    status[payment_dates == day] = STATUS_TODAY
+    status[payment_dates < day] = STATUS_COMPLETED
+    return status
+
+
+def schedule_frame(schedule, start=0, stop=None, as_of=None):
+    """스케줄의 일부 구간을 표시용 DataFrame으로 변환 (상태는 기준일로 계산)"""
+    stop = len(schedule['amount']) if stop is None else min(stop, len(schedule['amount']))
+    rows = slice(start, stop)
+    amount = schedule['amount'][rows]
+    notes = [f"調整済 / Adjusted: ¥{a:,}" if adjusted else ""
+             for a, adjusted in zip(amount.tolist(), schedule['adjusted'][rows].tolist())]
+    return pd.DataFrame({
+        'month': np.arange(start + 1, stop + 1, dtype=np.int64),
+        'payment_date': schedule['payment_date'][rows],
+        'amount': amount,
+        'interest': schedule['interest'][rows],
+        'balance': schedule['balance'][rows],
+        'status': pd.Categorical.from_codes(schedule_status(schedule, as_of, start, stop), categories=list(STATUS_LABELS)),
+        'notes': notes
+    })
+
+
+def _search_min_int(is_enough, guess, lower, upper):
+    """is_enough(k)를 만족하는 최소 정수 k - 추정값 주변에서 지수 탐색 후 이분 탐색"""
+    k = min(max(guess, lower), upper)
+    if is_enough(k):
+        hi, lo, step = k, k - 1, 1
+        while lo >= lower and is_enough(lo):
+            hi, lo, step = lo, lo - step, step * 2
+        lo = max(lo, lower - 1)
+    else:
+        lo, hi, step = k, k + 1, 1
+        while hi < upper and not is_enough(hi):
+            lo, hi, step = hi, hi + step, step * 2
+        if hi >= upper:
+            hi = upper
+            if hi == lo or not is_enough(hi):
+                return None
+
+    # 하한(lower - 1)은 평가하지 않고 불충분으로 간주
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if is_enough(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def _goal_amounts(monthly_amount, total_months, adjustments, rules, payment_dates):
+    """목표 계산용 단일 플랜 월별 입금액"""
+    amounts, _ = build_amount_matrix([monthly_amount], [total_months], [adjustments], [rules], payment_dates)
+    return amounts[0].astype(np.float64)
+
+
+def solve_monthly_amount(target_balance, period_years, interest_rate, start_date, adjustments=None, rules=None, step=1, rounding=None,
+                         compounding='monthly', date_convention=None):
+    """목표 최종 잔액에 필요한 최소 월 적립액 (step 단위, 도달 불가면 None)"""
+    total_months = period_years * 12
+    monthly_rate = interest_rate / 100 / 12
+    payment_dates = monthly_payment_dates([start_date], total_months)
+    growth = (1 + monthly_rate) ** np.arange(total_months - 1, -1, -1)
+    evaluations = []
+
+    def final_balance(units):
+        batch = calculate_savings_batch(
+            [units * step], [period_years], [interest_rate], [start_date], [adjustments], [rules], rounding, compounding,
+            date_convention
+        )
+        evaluations.append(units)
+        return int(batch['final_balance'][0])
+
+    # 입금액은 월 적립액에 대해 거의 선형이므로 이자 반올림을 무시한 복리 공식으로 초기값 계산
+    probe = 1_000_000
+    fixed = _goal_amounts(0, total_months, adjustments, rules, payment_dates)
+    slope = (_goal_amounts(probe, total_months, adjustments, rules, payment_dates) - fixed) / probe
+    sensitivity = slope @ growth
+    if sensitivity <= 0:
+        return None
+    guess = int(np.ceil((target_balance - fixed @ growth) / sensitivity / step))
+
+    units = _search_min_int(lambda k: final_balance(k) >= target_balance, guess, 0, 10 ** 12 // step)
+    if units is None:
+        return None
+    return {
+        'monthly_amount': units * step,
+        'final_balance': final_balance(units),
+        'evaluations': len(evaluations)
+    }
+
+
+def solve_interest_rate(target_balance, monthly_amount, period_years, start_date, adjustments=None, rules=None,
+                        rate_step=0.01, max_rate=100.0, rounding=None, compounding='monthly', date_convention=None):
+    """목표 최종 잔액에 필요한 최소 연이율 (rate_step % 단위, 도달 불가면 None)"""
+    total_months = period_years * 12
+    payment_dates = monthly_payment_dates([start_date], total_months)
+    amounts = _goal_amounts(monthly_amount, total_months, adjustments, rules, payment_dates)
+    exponents = np.arange(total_months - 1, -1, -1)
+    evaluations = []
+
+    def final_balance(units):
+        rate = round(units * rate_step, 10)
+        batch = calculate_savings_batch(
+            [monthly_amount], [period_years], [rate], [start_date], [adjustments], [rules], rounding, compounding,
+            date_convention
+        )
+        evaluations.append(units)
+        return int(batch['final_balance'][0])
+
+    # 반올림을 무시한 연속 함수 FV(r) = Σ a_m (1 + r)^(n-m) 에 뉴턴법을 몇 번 적용해 초기값 계산
+    monthly_rate = 0.0 if amounts.sum() <= 0 else max(target_balance / amounts.sum() - 1, 0) * 2 / max(total_months, 1)
+    for _ in range(50):
+        growth = (1 + monthly_rate) ** exponents
+        value = amounts @ growth - target_balance
+        derivative = amounts @ (exponents * growth / (1 + monthly_rate))
+        if derivative <= 0 or abs(value) < 0.5:
+            break
+        monthly_rate = max(monthly_rate - value / derivative, 0.0)
+    guess = int(np.ceil(monthly_rate * 12 * 100 / rate_step))
+
+    units = _search_min_int(lambda k: final_balance(k) >= target_balance, guess, 0, int(round(max_rate / rate_step)))
+    if units is None:
+        return None
+    return {
+        'interest_rate': round(units * rate_step, 10),
+        'final_balance': final_balance(units),
+        'evaluations': len(evaluations)
+    }
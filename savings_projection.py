@@ -0,0 +1,80 @@
+# savings_projection.py
+import numpy as np
+import pandas as pd
+
+from bank_calendar import payment_calendar_matrix
+from savings_engine import _accumulate_balances, _day_counts, build_amount_matrix, monthly_payment_dates
+
+# 변동금리 적금 몬테카를로 예측 - 금리 경로 x 월 행렬로 한 번에 적립
+
+PROJECTION_CHUNK_SIZE = 25000
+PROJECTION_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def simulate_rate_paths(initial_rate, months, n_paths, long_term_rate=None, reversion_speed=0.5, volatility=0.5, seed=None,
+                        floor=0.0):
+    """평균 회귀(Vasicek) 연이율 경로 (경로 x 월, %) - 첫 회차는 현재 금리, 이후 월 단위 정확 이산화"""
+    if long_term_rate is None:
+        long_term_rate = initial_rate
+    rng = np.random.default_rng(seed)
+    dt = 1 / 12
+    decay = np.exp(-reversion_speed * dt)
+    if reversion_speed > 0:
+        step_std = volatility * np.sqrt((1 - decay ** 2) / (2 * reversion_speed))
+    else:
+        step_std = volatility * np.sqrt(dt)
+
+    rates = np.empty((n_paths, months), dtype=np.float64)
+    if months == 0:
+        return rates
+    rates[:, 0] = initial_rate
+    shocks = rng.standard_normal((n_paths, months - 1)) * step_std
+    for m in range(1, months):
+        rates[:, m] = long_term_rate + (rates[:, m - 1] - long_term_rate) * decay + shocks[:, m - 1]
+    # 예금 금리는 하한(기본 0%) 아래로 내려가지 않음
+    return np.maximum(rates, floor)
+
+
+def project_savings(monthly_amount, period_years, interest_rate, start_date, adjustments=None, rules=None, rounding=None,
+                    compounding='monthly', date_convention=None, n_paths=10000, long_term_rate=None, reversion_speed=0.5,
+                    volatility=0.5, seed=None, percentiles=PROJECTION_PERCENTILES):
+    """단일 플랜을 n_paths개 금리 경로로 적립해 최종 잔액/이자 분포와 백분위 계산"""
+    total_months = period_years * 12
+    nominal_dates = monthly_payment_dates([start_date], total_months)
+    amounts, _ = build_amount_matrix([monthly_amount], [total_months], [adjustments], [rules], nominal_dates)
+    payment_dates = payment_calendar_matrix([start_date], total_months, date_convention)
+    day_counts = _day_counts(payment_dates) if compounding == 'daily' else None
+
+    final_balance = np.empty(n_paths, dtype=np.int64)
+    # 경로마다 같은 난수열이 나오도록 경로 전체를 한 번에 생성하고, 적립만 메모리 제한을 위해 나눠서 계산
+    rates = simulate_rate_paths(interest_rate, total_months, n_paths, long_term_rate, reversion_speed, volatility, seed)
+    if rounding is not None:
+        # 고정소수점 모드는 0.01% 단위 금리만 허용
+        rates = np.round(rates, 2)
+    for start in range(0, n_paths, PROJECTION_CHUNK_SIZE):
+        chunk = slice(start, start + PROJECTION_CHUNK_SIZE)
+        n = len(rates[chunk])
+        _, _, final_balance[chunk] = _accumulate_balances(
+            np.broadcast_to(amounts, (n, total_months)), rates[chunk], np.ones((n, total_months), dtype=bool),
+            np.zeros(n, dtype=np.int64), rounding, compounding,
+            day_counts=None if day_counts is None else np.broadcast_to(day_counts, (n, total_months))
+        )
+
+    total_payment = int(amounts.sum())
+    total_interest = final_balance - total_payment
+    summary = pd.DataFrame({
+        'final_balance': np.percentile(final_balance, percentiles),
+        'total_interest': np.percentile(total_interest, percentiles)
+    }, index=pd.Index(percentiles, name='percentile')).round().astype(np.int64)
+
+    return {
+        'n_paths': n_paths,
+        'total_months': total_months,
+        'total_payment': total_payment,
+        'final_balance': final_balance,
+        'total_interest': total_interest,
+        'mean_final_balance': float(final_balance.mean()),
+        'mean_total_interest': float(total_interest.mean()),
+        'average_rates': rates.mean(axis=1),
+        'percentiles': summary
+    }
@@ -0,0 +1,49 @@
+# savings_scenarios.py
+import numpy as np
+import pandas as pd
+
+from savings_engine import calculate_savings_batch
+
+# 적금 시나리오 분석 - 여러 조건을 한 번에 비교
+
+SWEEP_CHUNK_SIZE = 20000
+
+
+def sweep_savings_grid(monthly_amounts, periods, interest_rates, start_date, adjustments=None, rules=None):
+    """(월 적립액 x 기간 x 금리) 전체 조합을 배치 엔진으로 한 번에 계산"""
+    amount_grid, period_grid, rate_grid = np.meshgrid(
+        np.asarray(monthly_amounts, dtype=np.int64),
+        np.asarray(periods, dtype=np.int64),
+        np.asarray(interest_rates, dtype=np.float64),
+        indexing='ij'
+    )
+    amount_grid = amount_grid.ravel()
+    period_grid = period_grid.ravel()
+    rate_grid = rate_grid.ravel()
+
+    final_balance = np.empty(len(amount_grid), dtype=np.int64)
+    total_payment = np.empty(len(amount_grid), dtype=np.int64)
+    total_interest = np.empty(len(amount_grid), dtype=np.int64)
+    # 큰 그리드는 (플랜 x 월) 행렬 메모리를 제한하기 위해 나눠서 계산
+    for start in range(0, len(amount_grid), SWEEP_CHUNK_SIZE):
+        chunk = slice(start, start + SWEEP_CHUNK_SIZE)
+        batch = calculate_savings_batch(
+            amount_grid[chunk], period_grid[chunk], rate_grid[chunk], start_date, adjustments, rules
+        )
+        final_balance[chunk] = batch['final_balance']
+        total_payment[chunk] = batch['total_payment']
+        total_interest[chunk] = batch['total_interest']
+
+    return pd.DataFrame({
+        'monthly_amount': amount_grid,
+        'period': period_grid,
+        'interest_rate': rate_grid,
+        'total_payment': total_payment,
+        'total_interest': total_interest,
+        'final_balance': final_balance
+    })
+
+
+def sweep_pivot(sweep, period, value='final_balance'):
+    """특정 기간의 결과를 금리 x 월 적립액 표로 변환 (히트맵용)"""
+    return sweep[sweep['period'] == period].pivot(index='interest_rate', columns='monthly_amount', values=value)
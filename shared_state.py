@@ -0,0 +1,455 @@
+# shared_state.py
+import hashlib
+import hmac
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+# 여러 Streamlit 프로세스가 공유하는 상태 저장소 - 교체 가능한 백엔드 + 프로세스별 read-through 캐시
+# 키마다 버전(쓸 때마다 새로 뽑는 난수)을 두어 덮어쓰거나 지운 키만 다른 프로세스의 로컬 캐시에서 무효화하고,
+# 네임스페이스 세대는 다른 저장소의 변경을 알리는 invalidate()에서만 올림
+
+STATE_BACKEND = os.environ.get('BANK_STATE_BACKEND', 'sqlite')
+STATE_DATABASE = os.environ.get(
+    'BANK_STATE_DATABASE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'state.sqlite3')
+)
+# 프로세스 로컬 캐시 항목 수 상한
+LOCAL_CACHE_ENTRIES = 4096
+BUSY_TIMEOUT_SECONDS = 30
+# 만료된 값 정리 - 쓰기마다 하지 않고 프로세스당 이 간격으로 한 번, 한 번에 최대 SWEEP_BATCH행
+SWEEP_INTERVAL_SECONDS = 60
+SWEEP_BATCH = 1000
+# 로그인 세션 - 프로세스가 바뀌어도(재접속, 로드 밸런서) 쿠키의 토큰으로 복원
+SESSION_NAMESPACE = 'sessions'
+# 마지막 사용 후 만료 (사용 중에는 연장) / 로그인 시각 기준 절대 만료
+SESSION_IDLE_SECONDS = 30 * 60
+SESSION_MAX_AGE_SECONDS = 8 * 60 * 60
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state_values (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS state_values_expiry ON state_values (expires_at) WHERE expires_at IS NOT NULL;
+CREATE TABLE IF NOT EXISTS state_generations (
+    namespace TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _new_version():
+    """키 버전 - 지웠다가 다시 쓴 키도 이전 버전과 겹치지 않도록 순번 대신 난수"""
+    return secrets.randbits(62)
+
+
+class MemoryStateBackend:
+    """단일 프로세스용 백엔드 (개발/테스트) - SQLite 백엔드와 같은 인터페이스"""
+
+    def __init__(self):
+        # {(namespace, key): (값 바이트, 만료 시각, 버전)}
+        self._values = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def _live(self, namespace, key, now):
+        entry = self._values.get((namespace, key))
+        if entry is None or (entry[1] is not None and entry[1] <= now):
+            return None
+        return entry
+
+    def _maybe_sweep(self, now):
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + SWEEP_INTERVAL_SECONDS
+        for item in [item for item, entry in self._values.items() if entry[1] is not None and entry[1] <= now]:
+            del self._values[item]
+
+    def get(self, namespace, key):
+        """(값 바이트, 만료 시각, 버전) - 없거나 만료되었으면 None"""
+        with self._lock:
+            return self._live(namespace, key, time.time())
+
+    def stamp(self, namespace, key):
+        """(네임스페이스 세대, 키 버전) - 키가 없거나 만료되었으면 버전은 None"""
+        with self._lock:
+            entry = self._live(namespace, key, time.time())
+            return self._generations.get(namespace, 0), None if entry is None else entry[2]
+
+    def set(self, namespace, key, value, ttl=None):
+        """저장 - (세대, 새 버전) 반환"""
+        with self._lock:
+            now = time.time()
+            version = _new_version()
+            self._values[(namespace, key)] = (value, None if ttl is None else now + ttl, version)
+            self._maybe_sweep(now)
+            return self._generations.get(namespace, 0), version
+
+    def update(self, namespace, key, function):
+        """원자적 읽기-수정-쓰기 - function(현재 값 바이트 또는 None) -> (새 값 바이트, ttl, 결과), (결과, 세대, 새 버전) 반환"""
+        with self._lock:
+            now = time.time()
+            entry = self._live(namespace, key, now)
+            value, ttl, result = function(None if entry is None else entry[0])
+            version = _new_version()
+            self._values[(namespace, key)] = (value, None if ttl is None else now + ttl, version)
+            self._maybe_sweep(now)
+            return result, self._generations.get(namespace, 0), version
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._values.pop((namespace, key), None)
+
+    def bump(self, namespace):
+        with self._lock:
+            generation = self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            return generation
+
+    def generation(self, namespace):
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+
+class SQLiteStateBackend:
+    """SQLite 파일(WAL) 백엔드 - 같은 호스트의 여러 프로세스가 공유, 연결은 스레드별로 재사용"""
+
+    def __init__(self, path=STATE_DATABASE):
+        self.path = path
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.executescript(STATE_SCHEMA)
+        # 키 버전 도입 전에 만든 DB
+        if 'version' not in {row[1] for row in conn.execute("PRAGMA table_info(state_values)")}:
+            conn.execute("ALTER TABLE state_values ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _maybe_sweep(self, conn, now):
+        """만료된 값 정리 - 프로세스당 SWEEP_INTERVAL_SECONDS에 한 번, 쓰기 잠금을 오래 잡지 않도록 SWEEP_BATCH행씩"""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + SWEEP_INTERVAL_SECONDS
+        conn.execute(
+            "DELETE FROM state_values WHERE (namespace, key) IN "
+            "(SELECT namespace, key FROM state_values WHERE expires_at <= ? LIMIT ?)",
+            (now, SWEEP_BATCH)
+        )
+
+    def get(self, namespace, key):
+        """(값 바이트, 만료 시각, 버전) - 없거나 만료되었으면 None"""
+        row = self._connection().execute(
+            "SELECT value, expires_at, version FROM state_values "
+            "WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, time.time())
+        ).fetchone()
+        return None if row is None else tuple(row)
+
+    def stamp(self, namespace, key):
+        """(네임스페이스 세대, 키 버전) - 키가 없거나 만료되었으면 버전은 None, 조회 한 번"""
+        generation, version = self._connection().execute(
+            "SELECT (SELECT generation FROM state_generations WHERE namespace = ?), "
+            "(SELECT version FROM state_values WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?))",
+            (namespace, namespace, key, time.time())
+        ).fetchone()
+        return generation or 0, version
+
+    def set(self, namespace, key, value, ttl=None):
+        """저장 - (세대, 새 버전) 반환, 한 문장이라 별도 트랜잭션 없이 이 키만 바뀜"""
+        conn = self._connection()
+        now = time.time()
+        # 쓰기 전에 읽은 세대는 그 사이 invalidate()가 있었다면 더 오래된 값이라 로컬 캐시가 한 번 더 읽을 뿐
+        generation = self._generation(conn, namespace)
+        version = _new_version()
+        conn.execute(
+            "INSERT OR REPLACE INTO state_values (namespace, key, value, expires_at, version) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, value, None if ttl is None else now + ttl, version)
+        )
+        self._maybe_sweep(conn, now)
+        return generation, version
+
+    def update(self, namespace, key, function):
+        """원자적 읽기-수정-쓰기 - 쓰기 잠금(BEGIN IMMEDIATE)을 잡은 채 읽고 써서 다른 프로세스의 갱신과 섞이지 않음"""
+        with self._transaction() as conn:
+            now = time.time()
+            row = conn.execute(
+                "SELECT value FROM state_values WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, now)
+            ).fetchone()
+            value, ttl, result = function(None if row is None else row[0])
+            version = _new_version()
+            conn.execute(
+                "INSERT OR REPLACE INTO state_values (namespace, key, value, expires_at, version) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, value, None if ttl is None else now + ttl, version)
+            )
+            generation = self._generation(conn, namespace)
+        self._maybe_sweep(self._connection(), now)
+        return result, generation, version
+
+    def delete(self, namespace, key):
+        self._connection().execute("DELETE FROM state_values WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def bump(self, namespace):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO state_generations (namespace, generation) VALUES (?, 1) "
+                "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+                (namespace,)
+            )
+            return self._generation(conn, namespace)
+
+    @staticmethod
+    def _generation(conn, namespace):
+        row = conn.execute("SELECT generation FROM state_generations WHERE namespace = ?", (namespace,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def generation(self, namespace):
+        return self._generation(self._connection(), namespace)
+
+
+BACKENDS = {
+    'sqlite': SQLiteStateBackend,
+    'memory': MemoryStateBackend
+}
+
+
+class SharedState:
+    """백엔드 앞의 프로세스 로컬 read-through 캐시 - 읽을 때 (네임스페이스 세대, 키 버전)만 확인하고 같으면 로컬 값을 사용"""
+
+    def __init__(self, backend, max_entries=LOCAL_CACHE_ENTRIES):
+        self.backend = backend
+        self.max_entries = max_entries
+        # {(namespace, key): ((세대, 버전), 값, 만료 시각)} - 최근 사용 순
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, namespace, key, stamp, value, expires_at):
+        with self._lock:
+            self._entries[(namespace, key)] = (stamp, value, expires_at)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, namespace, key, default=None):
+        """값 조회 - 로컬 항목의 (세대, 키 버전)이 현재와 같으면 백엔드 값을 읽지 않음"""
+        stamp = self.backend.stamp(namespace, key)
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if stamp[1] is None:
+                # 다른 프로세스가 지웠거나 만료된 키
+                self._entries.pop((namespace, key), None)
+                self.misses += 1
+                return default
+            if entry is not None and entry[0] == stamp and (entry[2] is None or entry[2] > time.time()):
+                self._entries.move_to_end((namespace, key))
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        entry = self.backend.get(namespace, key)
+        if entry is None:
+            return default
+        value = pickle.loads(entry[0])
+        self._remember(namespace, key, (stamp[0], entry[2]), value, entry[1])
+        return value
+
+    def set(self, namespace, key, value, ttl=None):
+        stamp = self.backend.set(namespace, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+        self._remember(namespace, key, stamp, value, None if ttl is None else time.time() + ttl)
+
+    def update(self, namespace, key, function, default=None):
+        """원자적 읽기-수정-쓰기 (모든 프로세스에서 직렬화) - function(현재 값 또는 default) -> (새 값, ttl, 결과), 결과 반환"""
+        written = []
+
+        def apply(raw):
+            value, ttl, result = function(default if raw is None else pickle.loads(raw))
+            written.append((value, ttl))
+            return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl, result
+
+        result, generation, version = self.backend.update(namespace, key, apply)
+        value, ttl = written[-1]
+        self._remember(namespace, key, (generation, version), value, None if ttl is None else time.time() + ttl)
+        return result
+
+    def delete(self, namespace, key):
+        self.backend.delete(namespace, key)
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def fetch(self, namespace, key, default=None):
+        """로컬 캐시를 거치지 않는 조회 - 호출 측에 자체 캐시가 있는 불변 값용"""
+        entry = self.backend.get(namespace, key)
+        return default if entry is None else pickle.loads(entry[0])
+
+    def store(self, namespace, key, value, ttl=None):
+        """로컬 캐시에 남기지 않는 저장"""
+        self.backend.set(namespace, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+
+    def generation(self, namespace):
+        return self.backend.generation(namespace)
+
+    def invalidate(self, namespace):
+        """네임스페이스의 모든 프로세스 로컬 캐시 무효화 (다른 저장소에 쓴 뒤 호출) - 새 세대 반환"""
+        return self.backend.bump(namespace)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': type(self.backend).__name__,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) * 100 if lookups else 0.0
+            }
+
+
+@lru_cache(maxsize=None)
+def shared_state():
+    """프로세스 공용 SharedState - BANK_STATE_BACKEND로 백엔드 선택 (sqlite / memory)"""
+    if STATE_BACKEND not in BACKENDS:
+        raise ValueError(f"unknown state backend: {STATE_BACKEND}")
+    backend = BACKENDS[STATE_BACKEND]()
+    return SharedState(backend)
+
+
+# 세션 = 로그인 1회(family)의 공유 레코드 + 탭마다 발급되는 토큰 레코드
+# 쿠키로 복원할 때마다 같은 family에 새 토큰을 발급하고 이전 토큰은 교체됨으로 표시 - 교체된 토큰으로는 다시 복원할 수 없지만,
+# 그 토큰을 서버 세션에 들고 있는 다른 탭은 family가 살아 있는 동안 계속 사용 (탭끼리 서로의 세션을 끊지 않음)
+
+
+def _session_key(token):
+    """저장소 키는 토큰의 해시 - 상태 DB가 유출되어도 유효한 토큰은 알 수 없음"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _family_key(family):
+    return f"family:{family}"
+
+
+def _remaining(issued_at):
+    """절대 만료까지 남은 초 (최소 1초)"""
+    return max(issued_at + SESSION_MAX_AGE_SECONDS - time.time(), 1)
+
+
+def _token_record(token, client):
+    """토큰 레코드 - 없거나, 만료되었거나, 다른 클라이언트가 제시했으면 None"""
+    if not token:
+        return None
+    record = shared_state().get(SESSION_NAMESPACE, _session_key(token))
+    if record is None or not hmac.compare_digest(record['client'], client):
+        return None
+    return record
+
+
+def _session_family(token, client):
+    """토큰이 속한 세션의 (family ID, 레코드) - 로그아웃/유휴 만료/절대 만료되었으면 None"""
+    record = _token_record(token, client)
+    if record is None:
+        return None
+    family = shared_state().get(SESSION_NAMESPACE, _family_key(record['family']))
+    if family is None or family['issued_at'] + SESSION_MAX_AGE_SECONDS <= time.time():
+        return None
+    return record['family'], family
+
+
+def _save_family(family_id, family):
+    """세션 레코드 저장 - 유휴 만료 연장 (절대 만료를 넘지 않음)"""
+    shared_state().set(
+        SESSION_NAMESPACE, _family_key(family_id), family, min(SESSION_IDLE_SECONDS, _remaining(family['issued_at']))
+    )
+
+
+def _issue_token(family_id, family):
+    token = secrets.token_urlsafe(32)
+    record = {'family': family_id, 'client': family['client'], 'issued_at': family['issued_at'], 'rotated_at': None}
+    shared_state().set(SESSION_NAMESPACE, _session_key(token), record, _remaining(family['issued_at']))
+    return token
+
+
+def create_session(data, client):
+    """로그인 세션 저장 - 클라이언트 지문에 묶인 새 토큰 반환"""
+    family_id = secrets.token_hex(16)
+    family = {'data': data, 'client': client, 'issued_at': time.time()}
+    _save_family(family_id, family)
+    return _issue_token(family_id, family)
+
+
+def load_session(token, client):
+    """토큰의 세션 데이터 (없거나 만료되었거나 다른 클라이언트면 None)"""
+    session = _session_family(token, client)
+    return None if session is None else session[1]['data']
+
+
+def rotate_session(token, client):
+    """쿠키의 토큰으로 세션 복원 - 같은 세션에 새 토큰을 발급해 (새 토큰, 세션 데이터) 반환, 이미 교체된 토큰이면 None"""
+    session = _session_family(token, client)
+    if session is None:
+        return None
+
+    def mark_rotated(record):
+        # 동시에 같은 토큰을 제시해도 한 번만 교체 (다시 제시된 토큰은 도난 토큰일 수 있으므로 거부)
+        if record is None or record['rotated_at'] is not None:
+            return record, 1 if record is None else _remaining(record['issued_at']), False
+        return {**record, 'rotated_at': time.time()}, _remaining(record['issued_at']), True
+
+    if not shared_state().update(SESSION_NAMESPACE, _session_key(token), mark_rotated):
+        return None
+    family_id, family = session
+    _save_family(family_id, family)
+    return _issue_token(family_id, family), family['data']
+
+
+def update_session(token, data, client):
+    """세션 데이터 갱신 (언어 변경 등) - 같은 세션의 모든 탭에 적용, 유휴 만료도 연장"""
+    session = _session_family(token, client)
+    if session is not None:
+        _save_family(session[0], {**session[1], 'data': data})
+
+
+def touch_session(token, client):
+    """사용 중인 세션의 유휴 만료 연장 - 세션이 이미 끝났으면 False (다른 탭이 토큰을 교체한 것은 무관)"""
+    session = _session_family(token, client)
+    if session is None:
+        return False
+    _save_family(*session)
+    return True
+
+
+def end_session(token):
+    """로그아웃 - 세션(family)을 끝내 같은 로그인의 모든 토큰을 무효화"""
+    key = _session_key(token)
+    record = shared_state().get(SESSION_NAMESPACE, key)
+    if record is not None:
+        shared_state().delete(SESSION_NAMESPACE, _family_key(record['family']))
+    shared_state().delete(SESSION_NAMESPACE, key)
@@ -0,0 +1,145 @@
+# tests/test_bank_storage.py
+from datetime import date
+
+import numpy as np
+import pytest
+
+import bank_storage
+import repricing
+from bank_storage import (
+    count_all_plans, iter_all_plans, list_payslips, load_plan, load_plans, load_plans_by_id, plan_summaries,
+    rate_change_history, save_payslips, save_plans, update_plan
+)
+from payroll_engine import calculate_salary
+from repricing import reprice_stored_plans
+from savings_engine import calculate_savings_schedule, get_schedule
+
+# 영속 저장소 - 플랜/명세서 왕복, 묶음 읽기/쓰기, 금리 개정의 준비 후 일괄 교체
+
+
+@pytest.fixture
+def database(tmp_path):
+    return str(tmp_path / 'bank.sqlite3')
+
+
+def make_plan(monthly_amount, adjustments=None, period=2):
+    start_date = date(2024, 1, 25)
+    return {
+        'name': f"plan {monthly_amount}",
+        'customer_name': '山田 太郎',
+        'employee_number': '12345678',
+        'account_number': '098-96586-6521',
+        'monthly_amount': monthly_amount,
+        'period': period,
+        'interest_rate': 2.5,
+        'start_date': start_date.isoformat(),
+        'compounding': 'monthly',
+        'adjustments': adjustments or {},
+        'rules': [],
+        'calculation': calculate_savings_schedule(monthly_amount, period, 2.5, start_date, adjustments)
+    }
+
+
+def test_plan_round_trip(database):
+    plan = make_plan(30000, {3: 0, 7: 90000})
+    plan_id = save_plans([plan], 'owner-a', database)[0]
+    loaded = load_plan(plan_id, database)
+    assert loaded['id'] == plan_id
+    assert loaded['monthly_amount'] == 30000
+    assert loaded['adjustments'] == {3: 0, 7: 90000}
+    for field in bank_storage.CALCULATION_FIELDS:
+        assert loaded['calculation'][field] == plan['calculation'][field]
+    expected, actual = get_schedule(plan), get_schedule(loaded)
+    for column in bank_storage.SCHEDULE_COLUMNS:
+        assert np.array_equal(actual[column], expected[column])
+
+
+def test_update_replaces_adjustments(database):
+    plan_id = save_plans([make_plan(30000, {3: 0})], 'owner-a', database)[0]
+    changed = {**make_plan(30000, {5: 1000}), 'id': plan_id}
+    update_plan(changed, database)
+    loaded = load_plan(plan_id, database)
+    assert loaded['adjustments'] == {5: 1000}
+    assert loaded['calculation']['final_balance'] == changed['calculation']['final_balance']
+
+
+def test_owner_pages_and_summaries(database):
+    save_plans([make_plan(10000 + i) for i in range(5)], 'owner-a', database)
+    save_plans([make_plan(50000)], 'owner-b', database)
+    page = load_plans('owner-a', limit=2, offset=2, path=database)
+    assert [plan['monthly_amount'] for plan in page] == [10002, 10003]
+    summaries = plan_summaries('owner-a', ('payment_date', 'paid_to_date', 'balance'), database)
+    assert len(summaries) == 5
+    schedule = get_schedule(summaries[0])
+    assert int(schedule['balance'][-1]) == summaries[0]['calculation']['final_balance']
+    assert int(schedule['paid_to_date'][-1]) == summaries[0]['calculation']['total_payment']
+
+
+def test_chunked_reads_cover_every_plan(database, monkeypatch):
+    # SQLite 바인드 변수 한도보다 큰 묶음을 작은 한도로 재현
+    monkeypatch.setattr(bank_storage, 'MAX_BIND_IDS', 3)
+    ids = save_plans([make_plan(10000 + i) for i in range(7)], 'owner-a', database)
+    ids += save_plans([make_plan(20000 + i) for i in range(4)], 'owner-b', database)
+    chunks = list(iter_all_plans(chunk_size=4, path=database))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 3]
+    plans = [plan for chunk in chunks for plan in chunk]
+    assert [plan['id'] for plan in plans] == ids
+    assert [plan['owner'] for plan in plans] == ['owner-a'] * 7 + ['owner-b'] * 4
+    assert count_all_plans(database) == 11
+    assert [plan['id'] for plan in load_plans_by_id(list(reversed(ids)) + [999], database)] == ids
+
+
+def test_payslip_round_trip(database):
+    salary_data = calculate_salary(300000, 50000, 8000, 15000, 17000, 32000, 2100, 0)
+    payslips = [
+        {'date': f"2025/{month:02d}/25", 'employee_number': '12345678', 'name': '山田 太郎',
+         'salary_data': salary_data, 'created_at': '2025/10/25 09:00'}
+        for month in range(1, 6)
+    ]
+    ids = save_payslips(payslips, database)
+    assert len(ids) == 5
+    page = list_payslips('12345678', limit=2, offset=3, path=database)
+    assert [payslip['date'] for payslip in page] == ['2025/04/25', '2025/05/25']
+    assert page[0]['salary_data'] == salary_data
+    assert list_payslips('other', path=database) == []
+
+
+def test_reprice_swaps_all_changes_at_once(database):
+    save_plans([make_plan(10000 + i, {4: 0}) for i in range(5)], 'owner-a', database)
+    save_plans([make_plan(30000)], 'owner-b', database)
+    before = {plan['id']: plan['calculation']['final_balance'] for chunk in iter_all_plans(path=database) for plan in chunk}
+    owners, report = reprice_stored_plans(3.5, date(2025, 1, 1), '12345678', chunk_size=4, path=database)
+    assert owners == {'owner-a', 'owner-b'}
+    assert report['repriced'] == 6 and report['conflicts'] == 0
+    for chunk in iter_all_plans(path=database):
+        for plan in chunk:
+            assert plan['rate_changes'] == [{'effective_date': '2025-01-01', 'interest_rate': 3.5}]
+            assert plan['calculation']['final_balance'] > before[plan['id']]
+            assert int(get_schedule(plan)['balance'][-1]) == plan['calculation']['final_balance']
+            if plan['owner'] == 'owner-a':
+                assert plan['adjustments'] == {4: 0}
+    history = rate_change_history(path=database)
+    assert history[0]['actor'] == '12345678'
+    assert history[0]['repriced'] == 6
+
+
+def test_failed_reprice_changes_nothing(database, monkeypatch):
+    save_plans([make_plan(10000 + i) for i in range(6)], 'owner-a', database)
+    before = [plan['calculation']['final_balance'] for chunk in iter_all_plans(path=database) for plan in chunk]
+    calls = []
+    original = repricing.reprice_savings_batch
+
+    def failing_batch(plans, interest_rate, effective_date):
+        calls.append(len(plans))
+        if len(calls) == 2:
+            raise RuntimeError('worker failed')
+        return original(plans, interest_rate, effective_date)
+
+    monkeypatch.setattr(repricing, 'reprice_savings_batch', failing_batch)
+    with pytest.raises(RuntimeError):
+        reprice_stored_plans(3.5, date(2025, 1, 1), '12345678', chunk_size=3, path=database)
+    after = [plan['calculation']['final_balance'] for chunk in iter_all_plans(path=database) for plan in chunk]
+    assert after == before
+    assert rate_change_history(path=database) == []
+    conn = bank_storage.connection(database)
+    assert conn.execute("SELECT COUNT(*) FROM pricing_stage").fetchone()[0] == 0
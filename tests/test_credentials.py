@@ -0,0 +1,125 @@
+# tests/test_credentials.py
+import threading
+
+import pytest
+
+import credentials
+import shared_state
+from credentials import (
+    THROTTLE_CAPACITY, THROTTLE_REFILL_SECONDS, authenticate, begin_authentication, check_new_password, hash_password,
+    issue_temporary_passwords, poll_authentication, set_password, take_login_token, verify_password
+)
+from shared_state import MemoryStateBackend, SharedState
+
+# 자격 증명 - 해시 검증, 임시 비밀번호, 계정별 시도 제한
+
+
+@pytest.fixture(autouse=True)
+def memory_state(monkeypatch):
+    state = SharedState(MemoryStateBackend())
+    monkeypatch.setattr(shared_state, 'shared_state', lambda: state)
+    monkeypatch.setattr(credentials, 'shared_state', lambda: state)
+    return state
+
+
+@pytest.fixture
+def credential_file(tmp_path):
+    path = tmp_path / 'credentials.csv'
+    path.write_text('login_id,password_hash,must_reset\n', encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('method', ['scrypt', 'pbkdf2_sha256'])
+def test_hash_round_trip(method):
+    encoded = hash_password('correct horse', method)
+    assert verify_password('correct horse', encoded)
+    assert not verify_password('wrong horse', encoded)
+    assert hash_password('correct horse', method) != encoded
+
+
+def test_login_with_password(credential_file):
+    set_password('Otsuka', 'a-long-secret', credential_file)
+    assert authenticate(' otsuka ', 'a-long-secret', credential_file)['ok']
+    result = authenticate('otsuka', 'not-the-secret', credential_file)
+    assert not result['ok'] and not result['throttled']
+    assert not authenticate('nobody', 'a-long-secret', credential_file)['ok']
+
+
+def test_temporary_passwords_are_unique_and_must_be_changed(credential_file):
+    passwords = issue_temporary_passwords(['otsuka', 'hanako.sato', 'kenji.tanaka'], credential_file)
+    assert len(set(passwords.values())) == 3
+    result = authenticate('otsuka', passwords['otsuka'], credential_file)
+    assert result['ok'] and result['must_reset']
+    problem = check_new_password(passwords['otsuka'], passwords['otsuka'], 'otsuka', credential_file)
+    assert problem is not None
+    assert check_new_password('short', 'short') is not None
+    assert check_new_password('a-new-secret', 'another-secret') is not None
+    assert check_new_password('a-new-secret', 'a-new-secret', 'otsuka', credential_file) is None
+    set_password('otsuka', 'a-new-secret', credential_file)
+    result = authenticate('otsuka', 'a-new-secret', credential_file)
+    assert result['ok'] and not result['must_reset']
+    assert not authenticate('otsuka', passwords['otsuka'], credential_file)['ok']
+    # 다른 계정의 임시 비밀번호는 그대로
+    assert authenticate('hanako.sato', passwords['hanako.sato'], credential_file)['must_reset']
+
+
+def test_lockout_after_capacity(credential_file):
+    set_password('otsuka', 'a-long-secret', credential_file)
+    for _ in range(THROTTLE_CAPACITY):
+        assert not authenticate('otsuka', 'wrong-password', credential_file)['throttled']
+    result = authenticate('otsuka', 'a-long-secret', credential_file)
+    assert result['throttled'] and not result['ok']
+    assert 0 < result['retry_after'] <= THROTTLE_REFILL_SECONDS
+    # 다른 계정은 영향 없음
+    assert take_login_token('hanako.sato')[0]
+
+
+def test_bucket_refills_over_time():
+    start = 1_700_000_000.0
+    for _ in range(THROTTLE_CAPACITY):
+        assert take_login_token('otsuka', start)[0]
+    assert not take_login_token('otsuka', start)[0]
+    assert take_login_token('otsuka', start + THROTTLE_REFILL_SECONDS)[0]
+    assert not take_login_token('otsuka', start + THROTTLE_REFILL_SECONDS)[0]
+
+
+def test_success_resets_bucket(credential_file):
+    set_password('otsuka', 'a-long-secret', credential_file)
+    for _ in range(THROTTLE_CAPACITY - 1):
+        authenticate('otsuka', 'wrong-password', credential_file)
+    assert authenticate('otsuka', 'a-long-secret', credential_file)['ok']
+    for _ in range(THROTTLE_CAPACITY):
+        assert take_login_token('otsuka')[0]
+
+
+def test_parallel_attempts_respect_capacity():
+    allowed = []
+
+    def attempt():
+        allowed.append(take_login_token('otsuka', 1_700_000_000.0)[0])
+
+    threads = [threading.Thread(target=attempt) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(allowed) == THROTTLE_CAPACITY
+
+
+def test_verification_does_not_block_caller(credential_file, monkeypatch):
+    set_password('otsuka', 'a-long-secret', credential_file)
+    release = threading.Event()
+
+    def slow_verify(password, encoded):
+        release.wait(5)
+        return verify_password(password, encoded)
+
+    monkeypatch.setattr(credentials, 'verify_password', slow_verify)
+    attempt = begin_authentication('otsuka', 'a-long-secret', credential_file)
+    assert poll_authentication(attempt) is None
+    assert poll_authentication(attempt) is None
+    release.set()
+    assert poll_authentication(attempt, wait=True)['ok']
+    # 결과는 한 번만 확정되고 검증 성공 캐시로 다음 로그인은 즉시 끝남
+    assert poll_authentication(attempt)['ok']
+    assert begin_authentication('otsuka', 'a-long-secret', credential_file)['result']['ok']
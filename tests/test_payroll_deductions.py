@@ -0,0 +1,88 @@
+# tests/test_payroll_deductions.py
+import pandas as pd
+import pytest
+
+from payroll_deductions import (
+    DERIVED_DEDUCTIONS, derive_deductions, fill_payroll_deductions, social_insurance, standard_remuneration,
+    withholding_tax
+)
+from payroll_engine import calculate_payroll_batch, parse_flags, validate_payroll
+
+# 공제액 자동 계산 - 표 조회, 스칼라/배열 일치, nursing_care 열 해석과 검증
+
+
+def payroll_frame(**columns):
+    frame = pd.DataFrame({
+        'basic_salary': [300000, 450000, 180000],
+        'overtime_pay': [50000, 0, 12000],
+        'residence_tax': [15000, 22000, 6000],
+        'other_deduction': [0, 5000, 0]
+    })
+    for column, values in columns.items():
+        frame[column] = values
+    return frame
+
+
+def test_standard_remuneration_brackets():
+    # 보수월액 35만엔 -> 34만~37만 구간 (표준보수월액 36만엔)
+    health, pension, _ = standard_remuneration(350000)
+    assert health == 360000
+    assert pension == 360000
+    assert standard_remuneration(0)[0] == 58000
+
+
+def test_social_insurance_rounding():
+    premiums = social_insurance(350000)
+    # 360000 x 4.955% = 17838 / 360000 x 9.15% = 32940 / 350000 x 0.55% = 1925
+    assert premiums == {'health_insurance': 17838, 'pension': 32940, 'employment_insurance': 1925}
+    assert social_insurance(350000, nursing_care=True)['health_insurance'] == 17838 + 2862
+
+
+def test_withholding_tax_decreases_with_dependents():
+    taxes = [withholding_tax(300000, dependents) for dependents in range(10)]
+    assert taxes == sorted(taxes, reverse=True)
+    assert withholding_tax(0) == 0
+
+
+def test_batch_matches_scalar():
+    basic = [300000, 450000, 180000]
+    overtime = [50000, 0, 12000]
+    dependents = [0, 2, 9]
+    nursing_care = [False, True, False]
+    batch = derive_deductions(basic, overtime, dependents, nursing_care)
+    for i in range(3):
+        scalar = derive_deductions(basic[i], overtime[i], dependents[i], nursing_care[i])
+        for column in DERIVED_DEDUCTIONS:
+            assert int(batch[column][i]) == scalar[column]
+
+
+def test_parse_flags():
+    values = [True, False, 'TRUE', ' no ', 'False', '0', 'はい', 1, 0.0, None, float('nan'), '', 'maybe', 2]
+    parsed, invalid = parse_flags(values)
+    assert parsed.tolist() == [True, False, True, False, False, False, True, True, False, False, False, False, False, False]
+    assert invalid.tolist() == [False] * 12 + [True, True]
+
+
+@pytest.mark.parametrize('false_value', ['False', '0', 'no', 'いいえ', 0, False, None])
+def test_false_strings_do_not_add_care_insurance(false_value):
+    frame = fill_payroll_deductions(payroll_frame(nursing_care=[false_value, 'yes', None]))
+    expected = derive_deductions(
+        frame['basic_salary'].to_numpy(), frame['overtime_pay'].to_numpy(), 0, [False, True, False]
+    )
+    assert frame['health_insurance'].tolist() == expected['health_insurance'].tolist()
+
+
+def test_unknown_flag_is_reported():
+    frame = fill_payroll_deductions(payroll_frame(nursing_care=['no', 'sometimes', 'yes']))
+    issues = validate_payroll(frame)
+    assert issues[['row', 'column', 'value', 'reason']].values.tolist() == [[1, 'nursing_care', 'sometimes', 'not yes/no']]
+    with pytest.raises(ValueError):
+        calculate_payroll_batch(frame)
+
+
+def test_existing_columns_kept_unless_overwrite():
+    frame = payroll_frame(income_tax=[1, 2, 3])
+    assert fill_payroll_deductions(frame)['income_tax'].tolist() == [1, 2, 3]
+    assert fill_payroll_deductions(frame, overwrite=True)['income_tax'].tolist() != [1, 2, 3]
+    result = calculate_payroll_batch(fill_payroll_deductions(frame))
+    assert (result['net_salary'] == result['total_income'] - result['total_deductions']).all()
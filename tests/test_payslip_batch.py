@@ -0,0 +1,87 @@
+# tests/test_payslip_batch.py
+import zipfile
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import payslip_batch
+from payslip_batch import SHARED_STYLESHEET, generate_payslip_archive
+
+# 급여 명세서 ZIP 일괄 발행 - 파일 구성, 잘못된 행 건너뛰기, 병렬/순차 결과 일치
+
+PAY_DATE = date(2025, 10, 24)
+
+
+def payroll_frame(rows=6):
+    return pd.DataFrame({
+        'emp_num': [f"{10000000 + i}" for i in range(rows)],
+        'name': [f"社員 {i}" for i in range(rows)],
+        'department': ['IT事業部'] * rows,
+        'account': [f"098-96586-{6500 + i}" for i in range(rows)],
+        'basic_salary': [250000 + 10000 * i for i in range(rows)],
+        'overtime_pay': [20000] * rows,
+        'residence_tax': [12000] * rows,
+        'other_deduction': [0] * rows
+    }).rename(columns={'emp_num': 'employee_number', 'account': 'account_number'})
+
+
+def read_archive(path):
+    with zipfile.ZipFile(path) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+def test_archive_has_one_payslip_per_row(tmp_path):
+    output = tmp_path / 'payslips.zip'
+    report = generate_payslip_archive(payroll_frame(), PAY_DATE, str(output), workers=1, chunk_size=4)
+    assert report['rows'] == 6 and report['written'] == 6 and report['failed'] == 0
+    files = read_archive(output)
+    assert SHARED_STYLESHEET in files
+    payslips = sorted(name for name in files if name.endswith('.html'))
+    assert payslips == [f"給与明細_20251024_{10000000 + i}.html" for i in range(6)]
+    html = files[payslips[0]].decode('utf-8')
+    assert '社員 0' in html
+    assert SHARED_STYLESHEET in html
+
+
+def test_inline_css_omits_shared_stylesheet(tmp_path):
+    output = tmp_path / 'payslips.zip'
+    generate_payslip_archive(payroll_frame(2), PAY_DATE, str(output), workers=1, inline_css=True)
+    files = read_archive(output)
+    assert SHARED_STYLESHEET not in files
+    assert all(b'<style' in content for content in files.values())
+
+
+def test_invalid_rows_are_skipped_and_reported(tmp_path):
+    frame = payroll_frame(4)
+    frame.loc[1, 'basic_salary'] = -5
+    frame['overtime_pay'] = frame['overtime_pay'].astype(object)
+    frame.loc[2, 'overtime_pay'] = 'n/a'
+    output = tmp_path / 'payslips.zip'
+    report = generate_payslip_archive(frame, PAY_DATE, str(output), workers=1)
+    assert report['written'] == 2
+    assert [row for row, _ in report['failures']] == [1, 2]
+    assert len([name for name in read_archive(output) if name.endswith('.html')]) == 2
+
+
+def test_missing_column_is_an_error(tmp_path):
+    with pytest.raises(ValueError):
+        generate_payslip_archive(payroll_frame().drop(columns='basic_salary'), PAY_DATE, str(tmp_path / 'x.zip'))
+
+
+def test_duplicate_employee_numbers_do_not_overwrite(tmp_path):
+    frame = payroll_frame(3)
+    frame['employee_number'] = '10000000'
+    output = tmp_path / 'payslips.zip'
+    assert generate_payslip_archive(frame, PAY_DATE, str(output), workers=1)['written'] == 3
+    assert len([name for name in read_archive(output) if name.endswith('.html')]) == 3
+
+
+def test_parallel_matches_sequential(tmp_path, monkeypatch):
+    monkeypatch.setattr(payslip_batch, 'MIN_PARALLEL_PAYSLIPS', 1)
+    frame = payroll_frame(9)
+    sequential, parallel = tmp_path / 'sequential.zip', tmp_path / 'parallel.zip'
+    generate_payslip_archive(frame, PAY_DATE, str(sequential), workers=1, chunk_size=2)
+    report = generate_payslip_archive(frame, PAY_DATE, str(parallel), workers=2, chunk_size=2)
+    assert report['workers'] == 2
+    assert read_archive(parallel) == read_archive(sequential)
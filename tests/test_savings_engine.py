@@ -0,0 +1,93 @@
+# tests/test_savings_engine.py
+from datetime import date
+
+import numpy as np
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from savings_engine import (
+    ROUNDING_POLICIES, accumulate_fixed_point, calculate_savings_batch, calculate_savings_schedule, rate_to_basis_points
+)
+
+# 배치 엔진이 예전 월 루프/스칼라 고정소수점 구현과 엔 단위까지 같은지 확인
+
+
+def reference_schedule(monthly_amount, period_years, interest_rate, start_date, adjustments=None):
+    """예전 Savings 페이지의 월 루프 (상태 계산 제외)"""
+    monthly_interest_rate = interest_rate / 100 / 12
+    rows = []
+    current_balance = 0
+    for month in range(1, period_years * 12 + 1):
+        amount = monthly_amount
+        if adjustments and month in adjustments:
+            amount = adjustments[month]
+        monthly_interest = round(current_balance * monthly_interest_rate)
+        current_balance += amount + monthly_interest
+        rows.append((start_date + relativedelta(months=month - 1), amount, monthly_interest, current_balance))
+    return rows
+
+
+PLANS = [
+    (50000, 3, 2.5, date(2024, 1, 31), None),
+    (12345, 5, 0.37, date(2023, 8, 30), {4: 0, 7: 99999}),
+    (100000, 1, 7.25, date(2024, 2, 29), {12: 250000}),
+    (1, 10, 0.01, date(2020, 12, 31), None)
+]
+
+
+@pytest.mark.parametrize('plan', PLANS)
+def test_schedule_matches_reference_loop(plan):
+    monthly_amount, period_years, interest_rate, start_date, adjustments = plan
+    expected = reference_schedule(*plan)
+    schedule = calculate_savings_schedule(monthly_amount, period_years, interest_rate, start_date, adjustments)['schedule']
+    assert schedule['payment_date'].tolist() == [row[0] for row in expected]
+    assert schedule['amount'].tolist() == [row[1] for row in expected]
+    assert schedule['interest'].tolist() == [row[2] for row in expected]
+    assert schedule['balance'].tolist() == [row[3] for row in expected]
+
+
+def test_batch_matches_single_plans():
+    amounts, periods, rates, start_dates, adjustments = zip(*PLANS)
+    batch = calculate_savings_batch(amounts, periods, rates, start_dates, list(adjustments))
+    for i, plan in enumerate(PLANS):
+        expected = reference_schedule(*plan)
+        total_months = batch['total_months'][i]
+        assert batch['balances'][i, :total_months].tolist() == [row[3] for row in expected]
+        assert int(batch['final_balance'][i]) == expected[-1][3]
+
+
+@pytest.mark.parametrize('rounding', ROUNDING_POLICIES)
+def test_fixed_point_batch_matches_scalar(rounding):
+    rng = np.random.default_rng(7)
+    amounts = rng.integers(1000, 500000, size=6)
+    rates = [0.01, 0.5, 1.25, 2.37, 5.0, 14.99]
+    start_dates = [date(2024, 1, 15)] * 6
+    batch = calculate_savings_batch(amounts, [4] * 6, rates, start_dates, rounding=rounding)
+    for i, rate in enumerate(rates):
+        interest, balances = accumulate_fixed_point(batch['amounts'][i], rate_to_basis_points(rate), rounding)
+        assert batch['interest'][i].tolist() == interest
+        assert batch['balances'][i].tolist() == balances
+
+
+def test_totals_follow_paused_deposits():
+    # 13~18회차 입금 중지 - 총입금액/총이자는 실제 입금액 기준
+    rules = [{'kind': 'range', 'start': 13, 'end': 18, 'amount': 0}]
+    calculation = calculate_savings_schedule(50000, 3, 2.0, date(2024, 1, 10), rules=rules)
+    schedule = calculation['schedule']
+    assert schedule['amount'][12:18].tolist() == [0] * 6
+    assert calculation['total_payment'] == 50000 * 30
+    assert calculation['total_payment'] == int(schedule['paid_to_date'][-1])
+    assert calculation['total_interest'] == int(schedule['interest'].sum())
+    assert calculation['total_interest'] > 0
+
+
+def test_total_payment_counts_one_off_adjustments():
+    # 예전 화면은 월 적립액 x 개월 수를 총입금액으로 표시 - 1회성 조정도 이제 실제 입금액으로 합계
+    adjustments = {3: 0, 10: 80000}
+    calculation = calculate_savings_schedule(30000, 1, 1.5, date(2024, 4, 1), adjustments)
+    previous_total = 30000 * 12
+    assert previous_total == 360000
+    assert calculation['total_payment'] == 30000 * 10 + 0 + 80000
+    assert calculation['total_payment'] != previous_total
+    assert calculation['final_balance'] == reference_schedule(30000, 1, 1.5, date(2024, 4, 1), adjustments)[-1][3]
+    assert calculation['total_interest'] == calculation['final_balance'] - calculation['total_payment']
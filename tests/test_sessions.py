@@ -0,0 +1,100 @@
+# tests/test_sessions.py
+import pytest
+
+import shared_state
+from shared_state import (
+    SESSION_IDLE_SECONDS, SESSION_MAX_AGE_SECONDS, MemoryStateBackend, SharedState, create_session, end_session,
+    load_session, rotate_session, touch_session, update_session
+)
+
+# 로그인 세션 생성/복원(토큰 교체)/만료 - 여러 탭이 같은 쿠키를 쓰는 경우 포함
+
+CLIENT = 'browser-a'
+DATA = {'emp_num': '12345678', 'language': 'JP'}
+
+
+@pytest.fixture(autouse=True)
+def memory_state(monkeypatch):
+    state = SharedState(MemoryStateBackend())
+    monkeypatch.setattr(shared_state, 'shared_state', lambda: state)
+    return state
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.time()을 고정하고 앞으로 돌릴 수 있는 시계"""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(shared_state.time, 'time', lambda: now[0])
+
+    def advance(seconds):
+        now[0] += seconds
+    return advance
+
+
+def test_create_and_load():
+    token = create_session(DATA, CLIENT)
+    assert load_session(token, CLIENT) == DATA
+    assert load_session(token, 'browser-b') is None
+    assert load_session('unknown', CLIENT) is None
+
+
+def test_rotate_issues_new_token_and_rejects_replay():
+    token = create_session(DATA, CLIENT)
+    new_token, data = rotate_session(token, CLIENT)
+    assert new_token != token
+    assert data == DATA
+    # 교체된 토큰을 다시 제시하면 (도난 쿠키 재사용) 곧바로 거부
+    assert rotate_session(token, CLIENT) is None
+    assert rotate_session(token, CLIENT) is None
+    assert rotate_session(new_token, CLIENT) is not None
+
+
+def test_rotate_rejects_other_client():
+    token = create_session(DATA, CLIENT)
+    assert rotate_session(token, 'browser-b') is None
+    # 다른 클라이언트의 시도가 토큰을 소모하지 않음
+    assert rotate_session(token, CLIENT) is not None
+
+
+def test_second_tab_does_not_end_first_tab(clock):
+    # 탭 A가 쿠키로 복원한 뒤 탭 B가 같은 쿠키(탭 A의 토큰)로 복원해 토큰을 교체
+    tab_a, _ = rotate_session(create_session(DATA, CLIENT), CLIENT)
+    tab_b, _ = rotate_session(tab_a, CLIENT)
+    for _ in range(10):
+        clock(SESSION_IDLE_SECONDS - 60)
+        assert touch_session(tab_a, CLIENT)
+        assert touch_session(tab_b, CLIENT)
+    # 언어 변경 등 세션 데이터는 두 탭이 공유
+    update_session(tab_a, {**DATA, 'language': 'EN'}, CLIENT)
+    assert load_session(tab_b, CLIENT)['language'] == 'EN'
+
+
+def test_logout_ends_every_tab():
+    tab_a, _ = rotate_session(create_session(DATA, CLIENT), CLIENT)
+    tab_b, _ = rotate_session(tab_a, CLIENT)
+    end_session(tab_a)
+    assert not touch_session(tab_b, CLIENT)
+    assert rotate_session(tab_b, CLIENT) is None
+
+
+def test_idle_expiry(clock):
+    token = create_session(DATA, CLIENT)
+    clock(SESSION_IDLE_SECONDS - 1)
+    assert touch_session(token, CLIENT)
+    clock(SESSION_IDLE_SECONDS - 1)
+    assert load_session(token, CLIENT) == DATA
+    clock(SESSION_IDLE_SECONDS + 1)
+    assert not touch_session(token, CLIENT)
+    assert rotate_session(token, CLIENT) is None
+
+
+def test_absolute_expiry_survives_rotation(clock):
+    token = create_session(DATA, CLIENT)
+    elapsed = 0
+    while elapsed + SESSION_IDLE_SECONDS < SESSION_MAX_AGE_SECONDS:
+        clock(SESSION_IDLE_SECONDS - 60)
+        elapsed += SESSION_IDLE_SECONDS - 60
+        token, _ = rotate_session(token, CLIENT)
+    clock(SESSION_MAX_AGE_SECONDS - elapsed)
+    assert rotate_session(token, CLIENT) is None
+    assert not touch_session(token, CLIENT)
@@ -0,0 +1,124 @@
+# tests/test_shared_state.py
+import sqlite3
+import threading
+
+import pytest
+
+import shared_state
+from shared_state import MemoryStateBackend, SharedState, SQLiteStateBackend
+
+# 공유 상태 캐시 무효화 - 두 SharedState가 같은 SQLite 파일을 쓰면 서로 다른 프로세스와 같음
+
+
+@pytest.fixture
+def database(tmp_path):
+    return str(tmp_path / 'state.sqlite3')
+
+
+@pytest.fixture
+def processes(database):
+    return SharedState(SQLiteStateBackend(database)), SharedState(SQLiteStateBackend(database))
+
+
+def test_overwrite_invalidates_only_that_key(processes):
+    first, second = processes
+    first.set('ns', 'a', 1)
+    first.set('ns', 'b', 2)
+    assert second.get('ns', 'a') == 1
+    assert second.get('ns', 'b') == 2
+    first.set('ns', 'a', 10)
+    hits = second.hits
+    assert second.get('ns', 'b') == 2
+    assert second.hits == hits + 1
+    assert second.get('ns', 'a') == 10
+    assert second.hits == hits + 1
+
+
+def test_overwrite_does_not_bump_generation(processes):
+    first, _ = processes
+    first.set('ns', 'a', 1)
+    first.set('ns', 'a', 2)
+    first.update('ns', 'a', lambda value: (value + 1, None, None))
+    first.delete('ns', 'a')
+    assert first.generation('ns') == 0
+
+
+def test_delete_is_seen_by_other_process(processes):
+    first, second = processes
+    first.set('ns', 'a', 1)
+    assert second.get('ns', 'a') == 1
+    first.delete('ns', 'a')
+    assert second.get('ns', 'a', 'gone') == 'gone'
+    # 지운 뒤 같은 키에 다시 써도 이전 로컬 값을 쓰지 않음
+    first.set('ns', 'a', 1)
+    first.set('ns', 'a', 3)
+    assert second.get('ns', 'a') == 3
+
+
+def test_invalidate_refreshes_whole_namespace(processes):
+    first, second = processes
+    first.set('ns', 'a', 1)
+    first.set('other', 'a', 1)
+    second.get('ns', 'a')
+    second.get('other', 'a')
+    assert first.invalidate('ns') == 1
+    misses = second.misses
+    assert second.get('ns', 'a') == 1
+    assert second.misses == misses + 1
+    assert second.get('other', 'a') == 1
+    assert second.misses == misses + 1
+
+
+def test_update_is_atomic_across_threads(database):
+    state = SharedState(SQLiteStateBackend(database))
+
+    def increment():
+        for _ in range(25):
+            state.update('counter', 'n', lambda value: (value + 1, None, None), default=0)
+
+    threads = [threading.Thread(target=increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert SharedState(SQLiteStateBackend(database)).get('counter', 'n') == 200
+
+
+def test_expired_values_are_swept_periodically(database, monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(shared_state.time, 'time', lambda: now[0])
+    state = SharedState(SQLiteStateBackend(database))
+    for i in range(5):
+        state.set('ns', f'k{i}', i, ttl=10)
+    now[0] += 20
+    assert state.get('ns', 'k0') is None
+    count = "SELECT COUNT(*) FROM state_values"
+    conn = sqlite3.connect(database)
+    # 정리 간격 전에는 쓰기가 있어도 지우지 않음
+    state.set('ns', 'fresh', 1, ttl=10)
+    assert conn.execute(count).fetchone()[0] == 6
+    now[0] += shared_state.SWEEP_INTERVAL_SECONDS
+    state.set('ns', 'fresh', 2, ttl=100)
+    assert conn.execute(count).fetchone()[0] == 1
+
+
+def test_old_schema_gains_version_column(database):
+    conn = sqlite3.connect(database)
+    conn.execute(
+        "CREATE TABLE state_values (namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+        "expires_at REAL, PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+    )
+    conn.commit()
+    state = SharedState(SQLiteStateBackend(database))
+    state.set('ns', 'a', 1)
+    assert state.get('ns', 'a') == 1
+
+
+def test_memory_backend_matches_interface():
+    state = SharedState(MemoryStateBackend())
+    state.set('ns', 'a', 1)
+    assert state.get('ns', 'a') == 1
+    assert state.get('ns', 'a') == 1
+    assert state.hits == 2
+    state.delete('ns', 'a')
+    assert state.get('ns', 'a') is None